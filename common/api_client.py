@@ -0,0 +1,249 @@
+import time
+from collections import OrderedDict, namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common.custom_logger import CustomLogger
+
+# one request as seen by the caller: latency_ms includes every retry and backoff sleep;
+# source is 'network', 'cache' (fresh hit) or 'revalidated' (304 Not Modified)
+ApiCall = namedtuple('ApiCall', ['method', 'path', 'status', 'latency_ms', 'retries', 'source'])
+CacheEntry = namedtuple('CacheEntry', ['state', 'etag', 'expires_at'])
+
+
+def copy_state(state):
+    """
+    copy a response state with its own headers, cookies, request and history, so that
+    changes made through one response never reach the cache or another hit
+    :param state: Response.__getstate__()
+    :return: dict
+    """
+    state = dict(state)
+    state['headers'] = state['headers'].copy()
+    state['cookies'] = state['cookies'].copy()
+    state['history'] = list(state['history'] or [])
+    if state.get('request') is not None:
+        state['request'] = state['request'].copy()
+    return state
+
+
+def copy_response(state):
+    """
+    build an independent, fully read requests.Response from a pickled response state
+    :param state: Response.__getstate__()
+    :return: requests.Response
+    """
+    response = requests.Response()
+    response.__setstate__(copy_state(state))
+    return response
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of GET responses, keyed by method, url, params and Authorization.
+
+    Fresh entries are served without a request. Expired entries that carried an ETag
+    are revalidated with If-None-Match, and a 304 refreshes them without a body
+    transfer. Bodies larger than max_body_bytes are never cached, so big payloads
+    still stream.
+    """
+
+    def __init__(self, ttl=60, max_entries=128, max_body_bytes=1024 * 1024, enabled=True):
+        """
+        :param ttl: seconds an entry is served without revalidation
+        :param max_entries: max number of cached responses, least recently used are evicted
+        :param max_body_bytes: larger responses are not cached
+        :param enabled: False to bypass the cache
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self.enabled = enabled
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(method, url, params, authorization):
+        params = tuple(sorted((str(name), str(value)) for name, value in dict(params or {}).items()))
+        return method.upper(), url, params, authorization
+
+    def get(self, key):
+        """
+        :param key: cache key
+        :return: CacheEntry, possibly expired, or None
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, response):
+        """
+        cache a fully read response
+        :param key: cache key
+        :param response: requests.Response
+        :return: True if cached
+        """
+        if response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', ''):
+            return False
+        if len(response.content) > self.max_body_bytes:
+            return False
+        self._entries[key] = CacheEntry(copy_state(response.__getstate__()), response.headers.get('ETag'),
+                                        time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def refresh(self, key):
+        """
+        the server confirmed the entry with 304 Not Modified: serve it for another ttl
+        :param key: cache key
+        :return: CacheEntry
+        """
+        entry = self._entries[key] = self._entries[key]._replace(expires_at=time.monotonic() + self.ttl)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ApiClient:
+    """
+    HTTP client shared by the API tests.
+
+    One requests.Session with a pooled keep-alive HTTPAdapter, so consecutive calls
+    reuse the TCP/TLS connection. Every request gets a (connect, read) timeout, looked
+    up per endpoint path, and idempotent requests are retried with exponential backoff
+    on connection errors and 5xx responses. The latency of every call is kept in
+    ``calls`` for the report.
+
+    GET responses are kept in a ResponseCache (``cache`` config); pass ``cache=False``
+    to a request to bypass it.
+
+    Defaults are read from the ``Api`` section of ``automation_local.yaml``.
+    """
+
+    DEFAULT_TIMEOUT = (3.05, 10)
+    RETRY_STATUSES = (500, 502, 503, 504)
+    CACHEABLE_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, base_url, headers=None, timeouts=None, retries=3, backoff_factor=0.3,
+                 pool_connections=4, pool_maxsize=16, cache=None):
+        """
+        :param base_url: url prefix of every request path
+        :param headers: headers sent with every request
+        :param timeouts: {endpoint path: (connect, read) timeout(s)}, 'default' for the rest
+        :param retries: max retries on connection errors and 5xx responses
+        :param backoff_factor: retry n sleeps backoff_factor * 2 ** (n - 1) seconds, the first retry goes out at once
+        :param pool_connections: number of hosts kept in the connection pool
+        :param pool_maxsize: max connections kept per host
+        :param cache: ResponseCache arguments, e.g. {'ttl': 60, 'max_entries': 128}; None for no cache
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeouts = {'default': self.DEFAULT_TIMEOUT}
+        self.timeouts.update({path: tuple(timeout) if isinstance(timeout, (list, tuple)) else timeout
+                              for path, timeout in (timeouts or {}).items()})
+        self.calls = []
+        self.cache = ResponseCache(**cache) if cache is not None else None
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries,
+                      backoff_factor=backoff_factor, status_forcelist=self.RETRY_STATUSES,
+                      allowed_methods=Retry.DEFAULT_ALLOWED_METHODS, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(headers or {})
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        build the client from the automation config
+        :param config: automation config
+        :return: ApiClient
+        """
+        return cls(**dict(config.get('Api') or {}))
+
+    def url_for(self, path):
+        return path if path.startswith(('http://', 'https://')) else f'{self.base_url}{path}'
+
+    def timeout_for(self, path):
+        """
+        get the (connect, read) timeout of an endpoint
+        :param path: endpoint path, e.g. '/forecast/daily'
+        :return: timeout(s)
+        """
+        return self.timeouts.get(path, self.timeouts['default'])
+
+    def request(self, method, path, cache=True, **kwargs):
+        """
+        send a request through the pooled session, or answer it from the response cache
+        :param method: http method
+        :param path: endpoint path relative to base_url, or a full url
+        :param cache: False to bypass the response cache for this request
+        :param kwargs: requests arguments (params, headers, json ...); timeout defaults to the endpoint timeout
+        :return: requests.Response
+        """
+        kwargs.setdefault('timeout', self.timeout_for(path))
+        url = self.url_for(path)
+        start = time.perf_counter()
+        status = None
+        retries = 0
+        source = 'network'
+        key = entry = None
+        if cache and self.cache is not None and self.cache.enabled and method.upper() in self.CACHEABLE_METHODS:
+            headers = kwargs.get('headers') or {}
+            authorization = headers.get('Authorization', self.session.headers.get('Authorization'))
+            key = self.cache.key(method, url, kwargs.get('params'), authorization)
+            entry = self.cache.get(key)
+        try:
+            if entry is not None and entry.expires_at > time.monotonic():
+                source = 'cache'
+                response = copy_response(entry.state)
+                status = response.status_code
+                return response
+            if entry is not None and entry.etag:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), 'If-None-Match': entry.etag}
+            response = self.session.request(method, url, **kwargs)
+            status = response.status_code
+            if response.raw is not None and response.raw.retries is not None:
+                retries = len(response.raw.retries.history)
+            if key is None:
+                return response
+            if status == 304 and entry is not None:
+                source = 'revalidated'
+                response.close()
+                response = copy_response(self.cache.refresh(key).state)
+                status = response.status_code
+                return response
+            content_length = response.headers.get('Content-Length')
+            if not kwargs.get('stream') or (content_length and int(content_length) <= self.cache.max_body_bytes):
+                # reading the body here keeps iter_content working for stream=True callers
+                self.cache.put(key, response)
+            return response
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.calls.append(ApiCall(method, path, status, latency_ms, retries, source))
+            CustomLogger.print_log('%s %s -> %s (%s), %.1f ms, %s retries', method, path, status, source, latency_ms,
+                                   retries, duration=latency_ms / 1000)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def drain_calls(self):
+        """
+        get and forget the calls recorded so far
+        :return: list of ApiCall
+        """
+        calls, self.calls = self.calls, []
+        return calls
+
+    def close(self):
+        self.session.close()
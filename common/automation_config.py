@@ -1,59 +1,259 @@
+import os
+import pickle
 from collections import abc
 from pathlib import Path
 
-import yaml
-
 from common.custom_logger import CustomLogger
 
 
+class FrozenConfig(abc.Mapping):
+    """
+    只读配置对象
+
+    既是Mapping（``config.get('Wait')``、``dict(config)``、``**config``照常可用），
+    也支持属性访问（``config.Wait.timeouts.id``）。嵌套的dict会包装成FrozenConfig，
+    list会变成tuple，任何修改都会抛出TypeError。
+    """
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data=None):
+        object.__setattr__(self, '_data', {key: self._freeze(value) for key, value in (data or {}).items()})
+
+    @classmethod
+    def _freeze(cls, value):
+        if isinstance(value, abc.Mapping):
+            return value if isinstance(value, FrozenConfig) else cls(value)
+        if isinstance(value, (list, tuple)):
+            return tuple(cls._freeze(item) for item in value)
+        return value
+
+    @staticmethod
+    def _thaw(value):
+        if isinstance(value, FrozenConfig):
+            return value.to_dict()
+        if isinstance(value, tuple):
+            return [FrozenConfig._thaw(item) for item in value]
+        return value
+
+    def to_dict(self):
+        """
+        get a plain, mutable deep copy of the config
+        :return: dict
+        """
+        return {key: self._thaw(value) for key, value in self._data.items()}
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise TypeError('配置是只读的')
+
+    def __delattr__(self, name):
+        raise TypeError('配置是只读的')
+
+    def __reduce__(self):
+        return FrozenConfig, (self.to_dict(),)
+
+    def __repr__(self):
+        return f'FrozenConfig({self._data!r})'
+
+
 class AutomationConfig:
     """
     自动化测试配置管理类
-    
-    该类负责管理自动化测试的配置信息，按以下顺序读取配置：
-    1. 读取基础配置
-    2. 读取测试环境配置并从系统环境变量覆盖
-    3. 读取测试环境配置文件
-    4. 读取覆盖配置文件
-    
+
+    该类负责管理自动化测试的配置信息，按以下顺序读取配置，后面的层覆盖前面的层：
+    1. 读取基础配置 automation_local.yaml
+    2. 从系统环境变量覆盖，例如 AUTOMATION__Device__serial_no=R5CTA3DJRJA
+    3. 读取测试环境配置文件 automation_<AUTOMATION_ENV>.yaml
+    4. 读取覆盖配置文件 automation_override.yaml（或环境变量 AUTOMATION_OVERRIDE_FILE 指定的文件）
+
+    合并结果以pickle缓存到 config_cache_path，缓存以各配置文件的mtime和环境变量为键，
+    所以pytest-xdist的worker进程直接加载主进程合并好的缓存，不再解析YAML。
+
     属性:
         my_automation_environment_config_file (str): 本地配置文件名
-        config (dict): 存储所有配置信息的字典
+        config (FrozenConfig): 合并后的只读配置
         config_dir (Path): 配置文件目录路径
         config_file_path (Path): 配置文件完整路径
     """
 
     my_automation_environment_config_file = 'automation_local.yaml'
+    override_config_file = 'automation_override.yaml'
+    env_prefix = 'AUTOMATION__'
+    # merged configs already loaded by this process, keyed by the cache key
+    _loaded = {}
 
-    def __init__(self):
+    def __init__(self, config_dir=None):
         """
         初始化配置管理器
-        
+
         设置基础配置路径并加载配置文件
+        :param config_dir: 配置文件目录，默认为项目下的 test_environment_config
         """
-        self.config = dict()
-        self.my_environment = None
-        base_dir = Path(__file__).parents[1]
-        self.config_dir = base_dir / 'test_environment_config'
+        self.config = FrozenConfig()
+        self.my_environment = os.getenv('AUTOMATION_ENV')
+        self.config_dir = Path(config_dir) if config_dir else Path(__file__).parents[1] / 'test_environment_config'
         self.config_file_path = self.config_dir / self.my_automation_environment_config_file
+        self.config_cache_path = self.config_dir / '.automation_config.cache'
         self.configure_automation()
 
+    def source_files(self):
+        """
+        get the config files of layers 1, 3 and 4 that exist
+        :return: list of Path
+        """
+        files = [self.config_file_path]
+        if self.my_environment:
+            files.append(self.config_dir / f'automation_{self.my_environment}.yaml')
+        override = os.getenv('AUTOMATION_OVERRIDE_FILE')
+        files.append(Path(override) if override else self.config_dir / self.override_config_file)
+        return [path for path in files if path == self.config_file_path or path.exists()]
+
+    def env_overrides(self):
+        """
+        get config overrides from environment variables, '__' separates the nested keys
+        :return: sorted list of (key path tuple, raw value)
+        """
+        return sorted((tuple(name[len(self.env_prefix):].split('__')), value)
+                      for name, value in os.environ.items() if name.startswith(self.env_prefix))
+
+    def cache_key(self):
+        sources = []
+        for path in self.source_files():
+            stat = path.stat()
+            sources.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(sources), tuple(self.env_overrides())
+
     def configure_automation(self):
         """
         加载自动化测试配置
-        
-        从配置文件中读取配置信息，并更新到config字典中。
+
+        优先使用本进程已加载的配置或磁盘缓存，缓存失效时按层读取并合并配置文件。
         如果配置文件不存在或读取失败，会记录相应的调试信息。
         """
-        # 加载默认配置文件
         CustomLogger.print_debug('\n开始扫描自动化配置文件目录')
         self.debugIsConfigFileFound = Path(self.config_file_path).exists()
         self.debugFileFoundStr = '找到配置文件' if self.debugIsConfigFileFound else '未找到配置文件'
-        CustomLogger.print_debug('基础目录为: {}'.format(self.config_dir))
-        with open(self.config_file_path) as my_config:
-            # 加载基础配置
-            temp_config = yaml.safe_load(my_config)
-            self.config.update(temp_config)
+        CustomLogger.print_debug('基础目录为: %s', self.config_dir)
+        key = self.cache_key()
+        config = self._loaded.get(key)
+        if config is None:
+            merged = self._load_cache(key)
+            if merged is None:
+                merged = self._merge_layers()
+                self._save_cache(key, merged)
+            config = self._loaded[key] = FrozenConfig(merged)
+        self.config = config
+
+    def _merge_layers(self):
+        config = dict()
+        source_files = self.source_files()
+        # 1. 基础配置
+        update(config, self._read_yaml(source_files[0]))
+        # 2. 环境变量覆盖
+        for key_path, value in self.env_overrides():
+            CustomLogger.print_debug('环境变量覆盖配置: %s', '.'.join(key_path))
+            update(config, self._nest(config, key_path, value))
+        # 3. 测试环境配置文件, 4. 覆盖配置文件
+        for path in source_files[1:]:
+            CustomLogger.print_debug('读取配置文件: %s', path)
+            update(config, self._read_yaml(path))
+        return config
+
+    @staticmethod
+    def _read_yaml(path):
+        import yaml
+
+        with open(path, encoding='utf-8') as my_config:
+            return yaml.safe_load(my_config) or {}
+
+    @classmethod
+    def _nest(cls, config, key_path, value):
+        """
+        build {'Device': {'serial_no': value}} from a key path, matching existing keys case-insensitively
+        (environment variable names are upper case on Windows); the value is converted to the type of
+        the value it replaces
+        """
+        keys = []
+        level = config
+        for key in key_path:
+            if isinstance(level, abc.Mapping):
+                key = next((existing for existing in level if str(existing).lower() == key.lower()), key)
+                level = level.get(key)
+            else:
+                level = None
+            keys.append(key)
+        value = cls._coerce(level, value, '.'.join(keys))
+        for key in reversed(keys):
+            value = {key: value}
+        return value
+
+    @staticmethod
+    def _coerce(current, value, name):
+        """
+        convert an environment variable to the type of the configured value it replaces; new keys and
+        strings stay strings, so AUTOMATION__Device__serial_no=0123 keeps its leading zero
+        :param current: configured value, None if the key is new
+        :param value: environment variable value
+        :param name: dotted key, for the error message
+        :return: converted value
+        """
+        if current is None or isinstance(current, str):
+            return value
+        if isinstance(current, bool):
+            flag = value.strip().lower()
+            if flag in ('true', 'yes', 'on', '1'):
+                return True
+            if flag in ('false', 'no', 'off', '0'):
+                return False
+            raise Exception(f'环境变量覆盖{name}需要布尔值: {value}')
+        if isinstance(current, (int, float)):
+            try:
+                return type(current)(value)
+            except ValueError:
+                raise Exception(f'环境变量覆盖{name}需要{type(current).__name__}: {value}') from None
+        # lists and sections are given as yaml, e.g. AUTOMATION__Logging__queued='[1, 2]'
+        import yaml
+
+        parsed = yaml.safe_load(value)
+        if not isinstance(parsed, type(current)):
+            raise Exception(f'环境变量覆盖{name}需要{type(current).__name__}: {value}')
+        return parsed
+
+    def _load_cache(self, key):
+        try:
+            with open(self.config_cache_path, 'rb') as cache_file:
+                cached = pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if cached.get('key') != key:
+            return None
+        CustomLogger.print_debug('加载配置缓存: %s', self.config_cache_path)
+        return cached['config']
+
+    def _save_cache(self, key, config):
+        # write then rename, so xdist workers never read a half written cache
+        temp_path = self.config_cache_path.with_name(f'{self.config_cache_path.name}.{os.getpid()}')
+        try:
+            with open(temp_path, 'wb') as cache_file:
+                pickle.dump({'key': key, 'config': config}, cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.config_cache_path)
+        except OSError as e:
+            CustomLogger.print_debug('写入配置缓存失败: %s', e)
 
 
 def update(source_config: dict, update_file: dict) -> dict:
@@ -1,13 +1,18 @@
-import inspect
+import atexit
 import logging
 import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
 from colorama import Fore, Style, init
 
 IS_LOGGER_SETUP = False
-# the init call
-init()
+LOG_LISTENER = None
+# logger whose QueueHandler feeds LOG_LISTENER
+QUEUED_LOGGER = None
+LOG_FORMAT = "[%(asctime)s.%(msecs)03d][%(name)s], [%(levelname)s]: %(message)s -<module:%(module)s,line:%(lineno)d >"
+LOG_DATE_FORMAT = '%H:%M:%S'
 LEVEL_COLORS = {
     'DEBUG': Fore.CYAN,
     'INFO': Fore.GREEN,
@@ -15,6 +20,17 @@ LEVEL_COLORS = {
     'ERROR': Fore.RED,
     'CRITICAL': Fore.RED + Style.BRIGHT,
 }
+_PALETTE = {
+    'cyan': Fore.CYAN,
+    'green': Fore.GREEN,
+    'yellow': Fore.YELLOW,
+    'red': Fore.RED,
+    'blue': Fore.BLUE,
+    'magenta': Fore.MAGENTA,
+}
+# color attributes set on a record, computed once per level instead of once per record
+COLOR_ATTRIBUTES = {levelname: {'level_color': color, **_PALETTE} for levelname, color in LEVEL_COLORS.items()}
+NO_COLOR_ATTRIBUTES = {'level_color': '', 'color': '', **dict.fromkeys(_PALETTE, '')}
 
 
 class ColoredFormatter(logging.Formatter):
@@ -32,46 +48,89 @@ class ColoredFormatter(logging.Formatter):
         :param record:
         :return:
         """
-        levelname = record.levelname
-        if not hasattr(record, 'use_color'):
-            record.use_color = True
-        if self.use_color and record.use_color:
-            if not hasattr(record, 'level_color'):
-                record.level_color = LEVEL_COLORS[levelname]
-            if not hasattr(record, 'color'):
-                record.color = LEVEL_COLORS[levelname]
-            record.cyan = Fore.CYAN
-            record.green = Fore.GREEN
-            record.yellow = Fore.YELLOW
-            record.red = Fore.RED
-            record.blue = Fore.BLUE
-            record.magenta = Fore.MAGENTA
+        use_color = self.use_color and getattr(record, 'use_color', True)
+        attributes = record.__dict__
+        if use_color:
+            # colors passed through extra= win over the level defaults
+            color = attributes.get('color') or LEVEL_COLORS[record.levelname]
+            attributes.update(COLOR_ATTRIBUTES[record.levelname])
+            attributes['color'] = color
         else:
-            record.level_color = ''
-            record.color = ''
-            record.cyan = ''
-            record.green = ''
-            record.yellow = ''
-            record.red = ''
-            record.blue = ''
-            record.magenta = ''
+            attributes.update(NO_COLOR_ATTRIBUTES)
         msg = super().format(record)
-        if self.use_color and record.use_color:
+        if use_color:
             return f"{msg}{Style.RESET_ALL}"
         return msg
 
 
-def setup_logger(name=None, format=None, level=None, use_color=True):
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler formats every record in the calling thread; here only msg and
+    args are merged (so later changes to mutable args are not logged), the colored
+    formatting and the stream write happen on the QueueListener thread.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class LazyMessage:
+    """
+    log message built by a callable, only called when a handler formats the record
+    """
+
+    __slots__ = ('build',)
+
+    def __init__(self, build):
+        self.build = build
+
+    def __str__(self):
+        return str(self.build())
+
+
+def lazy(msg):
+    return LazyMessage(msg) if callable(msg) else msg
+
+
+def stop_log_listener():
+    """
+    drain the log queue and stop the background listener, safe to call more than once;
+    the logger writes through the listener's handlers directly afterwards
+    :return:
+    """
+    global LOG_LISTENER, QUEUED_LOGGER
+    if LOG_LISTENER is None:
+        return
+    listener, logger = LOG_LISTENER, QUEUED_LOGGER
+    LOG_LISTENER = QUEUED_LOGGER = None
+    if logger is not None:
+        # swap before stopping: records logged meanwhile are either still drained or written directly
+        for handler in list(logger.handlers):
+            if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+                logger.removeHandler(handler)
+        for handler in listener.handlers:
+            logger.addHandler(handler)
+    listener.stop()
+
+
+def setup_logger(name=None, format=None, level=None, use_color=True, queued=None):
     """
     setup logger
     :param name:
     :param format: log format
     :param level: log level
     :param use_color: log color
+    :param queued: format and write logs on a background thread, defaults to environment variable IS_QUEUE_LOG_ENV=1
     :return: logger
     """
-    global IS_LOGGER_SETUP
+    global IS_LOGGER_SETUP, LOG_LISTENER, QUEUED_LOGGER
     if not IS_LOGGER_SETUP:
+        # the init call
+        init()
         if level is None:
             level = logging.INFO
         # You can turn on debug with --debug=1 in args, or environment variable IS_DEBUG_ENV=1
@@ -84,13 +143,23 @@ def setup_logger(name=None, format=None, level=None, use_color=True):
 
         handler = logging.StreamHandler()
         handler.setLevel(level)
-        logging_format = "%(color)s[%(asctime)s.%(msecs)03d][%(name)s], [%(levelname)s]: %(message)s -<module:%(module)s,line:%(lineno)d >" if not format else format
+        logging_format = "%(color)s" + LOG_FORMAT if not format else format
         formatter = ColoredFormatter(
             fmt=logging_format,
-            datefmt='%H:%M:%S',
+            datefmt=LOG_DATE_FORMAT,
             use_color=use_color
         )
         handler.setFormatter(formatter)
+        if queued is None:
+            queued = os.getenv('IS_QUEUE_LOG_ENV', '0').lower() in ('1', 'true')
+        if queued:
+            # callers only enqueue the record, the listener thread formats and writes it
+            log_queue = queue.SimpleQueue()
+            LOG_LISTENER = QueueListener(log_queue, handler, respect_handler_level=True)
+            LOG_LISTENER.start()
+            atexit.register(stop_log_listener)
+            handler = DeferredQueueHandler(log_queue)
+            handler.setLevel(level)
         # root logger
         name = '' if not name else name
         logger = logging.getLogger(name)
@@ -99,50 +168,74 @@ def setup_logger(name=None, format=None, level=None, use_color=True):
         if logger.hasHandlers():
             logger.handlers.clear()
         logger.addHandler(handler)
+        if queued:
+            QUEUED_LOGGER = logger
 
         IS_LOGGER_SETUP = True
     return logger
 
 
+class _LazyLogger:
+    """
+    sets the logger up on the first access of CustomLogger.logger instead of at import
+    """
+
+    def __get__(self, instance, owner):
+        logger = setup_logger()
+        # replace the descriptor, later accesses are a plain class attribute lookup
+        owner.logger = logger
+        return logger
+
+
 class CustomLogger:
     """
     This class is the log class for print test logs
+
+    Messages can be lazy: pass %-style args (``print_log('found %s', name)``) or a
+    callable (``print_debug(lambda: expensive())``). Nothing is built when the level is
+    disabled, and the message is only formatted when a handler writes the record.
     """
-    logger = setup_logger()
+    logger = _LazyLogger()
 
     @staticmethod
-    def print_step(msg, use_color=True, color=None):
-        CustomLogger.logger.info("Step: " + msg, extra={'use_color': use_color,
-                                                        'color': Fore.GREEN if not color else color})
+    def print_step(msg, *args, use_color=True, color=None):
+        if CustomLogger.logger.isEnabledFor(logging.INFO):
+            extra = {'use_color': use_color, 'color': Fore.GREEN if not color else color}
+            CustomLogger.logger.info("Step: " + msg, *args, extra=extra, stacklevel=2)
 
     @staticmethod
     def print_with_new_line(msg, use_color=True):
-        CustomLogger.logger.info('')
-        CustomLogger.logger.info(msg, extra={'use_color': use_color})
+        CustomLogger.logger.info('', stacklevel=2)
+        CustomLogger.logger.info(msg, extra={'use_color': use_color}, stacklevel=2)
 
     @staticmethod
     def print_start(use_color=True):
-        CustomLogger.logger.info('')
-        CustomLogger.logger.info('TestCase: {}'.format(inspect.stack()[1][3]),
-                                 extra={'use_color': use_color, 'color': Fore.BLUE})
+        CustomLogger.logger.info('', stacklevel=2)
+        CustomLogger.logger.info('TestCase: {}'.format(sys._getframe(1).f_code.co_name),
+                                 extra={'use_color': use_color, 'color': Fore.BLUE}, stacklevel=2)
 
     @staticmethod
     def print_global_msg(msg, use_color=True):
-        CustomLogger.logger.info('')
-        CustomLogger.logger.info(msg, extra={'use_color': use_color, 'color': Fore.BLUE})
+        CustomLogger.logger.info('', stacklevel=2)
+        CustomLogger.logger.info(msg, extra={'use_color': use_color, 'color': Fore.BLUE}, stacklevel=2)
 
     @staticmethod
-    def print_log(msg, use_color=True):
-        CustomLogger.logger.info(msg, extra={'use_color': use_color, 'color': Fore.MAGENTA})
+    def print_log(msg, *args, use_color=True, **extra):
+        if CustomLogger.logger.isEnabledFor(logging.INFO):
+            CustomLogger.logger.info(lazy(msg), *args, extra={'use_color': use_color, 'color': Fore.MAGENTA, **extra},
+                                     stacklevel=2)
 
     @staticmethod
-    def print_debug(msg, use_color=True, error=False, quiet=False):
-        if not quiet:
+    def print_debug(msg, *args, use_color=True, error=False, quiet=False, **extra):
+        if quiet:
+            return
+        level = logging.INFO if error else logging.DEBUG
+        if CustomLogger.logger.isEnabledFor(level):
+            extra = {'use_color': use_color, **extra}
             if error:
-                CustomLogger.logger.info(msg, extra={'use_color': use_color, 'color': LEVEL_COLORS['DEBUG']})
-            else:
-                CustomLogger.logger.debug(msg, extra={'use_color': use_color})
+                extra['color'] = LEVEL_COLORS['DEBUG']
+            CustomLogger.logger.log(level, lazy(msg), *args, extra=extra, stacklevel=2)
 
     @staticmethod
-    def print_error(msg):
-        CustomLogger.logger.error(msg)
+    def print_error(msg, *args):
+        CustomLogger.logger.error(lazy(msg), *args, stacklevel=2)
@@ -0,0 +1,170 @@
+import tempfile
+import time
+from pathlib import Path
+
+from filelock import FileLock, Timeout
+
+from common.custom_logger import CustomLogger
+from common.waiter import Waiter
+
+
+class DeviceLease:
+    """
+    An exclusive lease on one pool device, backed by an OS file lock so that it holds
+    across pytest-xdist worker processes. The OS drops the lock when its process dies,
+    so a crashed worker never leaves a device leased.
+    """
+
+    def __init__(self, serial_no, connect_type, device, lock):
+        self.serial_no = serial_no
+        self.connect_type = connect_type
+        self.device = device
+        self.lock = lock
+
+    def release(self):
+        """
+        release the lease so another worker can pick up the device
+        :return:
+        """
+        self.lock.release(force=True)
+        CustomLogger.print_log(f'释放设备: {self.serial_no}')
+
+    def __repr__(self):
+        return f"<DeviceLease {self.serial_no} ({self.connect_type})>"
+
+
+class DevicePool:
+    """
+    Pool of devices listed in the ``Device`` section of automation_local.yaml.
+
+    Every pytest-xdist worker leases one device for the whole session. Workers start
+    probing at a different offset of the list so they do not race for the same serial,
+    leases are health checked before use, and leases are OS file locks (``filelock``:
+    ``msvcrt.locking`` on Windows, ``fcntl.flock`` elsewhere) released with the process
+    that holds them. Without a ``pool`` list the single ``serial_no`` entry is used::
+
+        Device:
+          pool:
+            - serial_no: R5CTA3DJRJA
+              connect_type: USB
+            - serial_no: 192.168.1.20:5555
+              connect_type: TCP
+    """
+
+    def __init__(self, devices, lock_dir=None, waiter=None):
+        """
+        :param devices: list of {'serial_no': ..., 'connect_type': 'USB' | 'TCP'}
+        :param lock_dir: directory holding the lease lock files
+        :param waiter: Waiter used while every device is leased, None for the shared default
+        """
+        if not devices:
+            raise Exception("设备池为空，请在automation_local.yaml的Device中配置serial_no或pool")
+        self.devices = list(devices)
+        self.lock_dir = Path(lock_dir or Path(tempfile.gettempdir()) / 'qademo_device_locks')
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        self.waiter = waiter or Waiter.default()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        build the pool from the automation config
+        :param config: automation config dict
+        :return: DevicePool
+        """
+        device_config = config.get('Device') or {}
+        devices = device_config.get('pool')
+        if not devices:
+            devices = [{'serial_no': device_config.get('serial_no'),
+                        'connect_type': device_config.get('connect_type', 'USB')}]
+        return cls([entry for entry in devices if entry.get('serial_no')], lock_dir=device_config.get('lock_dir'))
+
+    @staticmethod
+    def worker_index(worker_id):
+        """
+        get numeric index of a pytest-xdist worker id, e.g. 'gw3' -> 3, 'master' -> 0
+        :param worker_id: xdist worker id
+        :return: int
+        """
+        digits = ''.join(ch for ch in str(worker_id) if ch.isdigit())
+        return int(digits) if digits else 0
+
+    def lease(self, worker_id='master', timeout=None):
+        """
+        lease a healthy device, waiting while all devices are taken
+        :param worker_id: xdist worker id
+        :param timeout: timeout(s) to wait for a free device, None for the configured 'ready' timeout
+        :return: DeviceLease
+        """
+        offset = self.worker_index(worker_id) % len(self.devices)
+        candidates = self.devices[offset:] + self.devices[:offset]
+
+        def try_lease():
+            for entry in candidates:
+                lease = self._try_lease(entry)
+                if lease:
+                    return lease
+            return None
+
+        lease = self.waiter.until(try_lease, timeout, 'ready')
+        if not lease:
+            raise Exception(f"没有可用的设备: {[entry['serial_no'] for entry in self.devices]}")
+        CustomLogger.print_log(f'{worker_id} 租用设备: {lease.serial_no}')
+        return lease
+
+    def _try_lease(self, entry):
+        serial_no = entry['serial_no']
+        connect_type = str(entry.get('connect_type', 'USB')).upper()
+        lock = self._acquire_lock(self.lock_dir / (str(serial_no).replace(':', '_') + '.lock'))
+        if lock is None:
+            return None
+        lease = DeviceLease(serial_no, connect_type, None, lock)
+        try:
+            lease.device = self.connect(serial_no, connect_type)
+            self.health_check(lease.device)
+        except Exception as e:
+            CustomLogger.print_log('设备 %s 健康检查失败: %s', serial_no, e)
+            lease.release()
+            return None
+        return lease
+
+    @staticmethod
+    def _acquire_lock(lock_path):
+        """
+        take the lock of a device without waiting
+        :param lock_path: lock file path
+        :return: held FileLock, None if another process holds it
+        """
+        lock = FileLock(str(lock_path))
+        try:
+            lock.acquire(timeout=0)
+        except Timeout:
+            return None
+        return lock
+
+    @staticmethod
+    def connect(serial_no, connect_type='USB'):
+        """
+        connect device over USB or adb-over-TCP (serial_no is "host:port")
+        :param serial_no: device serial or host:port
+        :param connect_type: 'USB' or 'TCP'
+        :return: uiautomator2 device
+        """
+        import uiautomator2 as u2
+        if connect_type == 'TCP':
+            import adbutils
+            adbutils.adb.connect(serial_no, timeout=10)
+            return u2.connect(serial_no)
+        return u2.connect_usb(serial_no)
+
+    @staticmethod
+    def health_check(device):
+        """
+        check the device answers both adb shell and the uiautomator rpc
+        :param device: uiautomator2 device
+        :return:
+        """
+        start = time.monotonic()
+        device.shell('echo ok')
+        if not device.info:
+            raise Exception('uiautomator rpc 无响应')
+        CustomLogger.print_debug(lambda: f'设备健康检查耗时 {(time.monotonic() - start) * 1000:.0f} ms')
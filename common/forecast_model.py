@@ -0,0 +1,187 @@
+import codecs
+import json
+import re
+from functools import lru_cache
+
+CHUNK_SIZE = 64 * 1024
+# start of the forecast.daily array; the entries are decoded one by one after it
+_DAILY_START = re.compile(r'"daily"\s*:\s*\[')
+_SEPARATORS = ' \t\r\n,'
+_DECODER = json.JSONDecoder()
+
+DAILY_ENTRY_SCHEMA = {
+    'type': 'object',
+    'required': ['date', 'humidity', 'temperature'],
+    'properties': {
+        'date': {'type': 'string', 'pattern': r'^\d{4}-\d{2}-\d{2}$'},
+        'location': {'type': 'string'},
+        'humidity': {
+            'type': 'object',
+            'required': ['min', 'max'],
+            'properties': {
+                'min': {'type': 'integer', 'minimum': 0, 'maximum': 100},
+                'max': {'type': 'integer', 'minimum': 0, 'maximum': 100},
+            },
+        },
+        'temperature': {
+            'type': 'object',
+            'required': ['min', 'max'],
+            'properties': {'min': {'type': 'number'}, 'max': {'type': 'number'}},
+        },
+        'description': {'type': 'string'},
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def daily_entry_validator():
+    """
+    validator of one forecast.daily entry, compiled to python code once per process
+    :return: callable raising fastjsonschema.JsonSchemaException on invalid entries
+    """
+    import fastjsonschema
+
+    return fastjsonschema.compile(DAILY_ENTRY_SCHEMA)
+
+
+def iter_daily_entries(chunks):
+    """
+    incrementally decode the entries of the forecast.daily array from a byte stream;
+    only the current entry and the unread tail of the stream are held in memory
+    :param chunks: iterable of bytes, e.g. response.iter_content(CHUNK_SIZE)
+    :return: generator of entry dicts
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    position = None
+    for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        if position is None:
+            match = _DAILY_START.search(buffer)
+            if not match:
+                # keep a tail in case the key is split between two chunks
+                buffer = buffer[-32:]
+                continue
+            position = match.end()
+        while True:
+            while position < len(buffer) and buffer[position] in _SEPARATORS:
+                position += 1
+            if position >= len(buffer):
+                break
+            if buffer[position] == ']':
+                return
+            try:
+                entry, position = _DECODER.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # the entry continues in the next chunk
+                break
+            yield entry
+        buffer = buffer[position:]
+        position = 0
+    raise json.JSONDecodeError('forecast.daily array not found or not terminated', buffer, position or 0)
+
+
+class DailyForecast:
+    """
+    one day of one location
+    """
+
+    __slots__ = ('date', 'location', 'humidity_min', 'humidity_max', 'temperature_min', 'temperature_max',
+                 'description')
+
+    def __init__(self, date, location, humidity_min, humidity_max, temperature_min, temperature_max,
+                 description=None):
+        self.date = date
+        self.location = location
+        self.humidity_min = humidity_min
+        self.humidity_max = humidity_max
+        self.temperature_min = temperature_min
+        self.temperature_max = temperature_max
+        self.description = description
+
+    @classmethod
+    def from_entry(cls, entry):
+        return cls(entry['date'], entry.get('location'),
+                   entry['humidity']['min'], entry['humidity']['max'],
+                   entry['temperature']['min'], entry['temperature']['max'],
+                   entry.get('description'))
+
+    @property
+    def humidity_range(self):
+        return f'{self.humidity_min} - {self.humidity_max}%'
+
+    def __repr__(self):
+        return f'DailyForecast({self.date}, {self.location}, rh {self.humidity_range})'
+
+
+class ForecastResponse:
+    """
+    /forecast/daily response parsed while it streams in, indexed by date and location.
+
+    ``get(date, location)`` is a dict lookup instead of a scan over ``forecast.daily``.
+    Every entry is checked against DAILY_ENTRY_SCHEMA with the validator compiled
+    once; ``dates``/``locations`` keep only the entries a test needs, so memory stays
+    flat however large the payload is.
+    """
+
+    def __init__(self):
+        self.days = []
+        self.by_date = {}
+        self.by_location = {}
+        self._by_key = {}
+
+    @classmethod
+    def parse(cls, chunks, validate=True, dates=None, locations=None):
+        """
+        :param chunks: iterable of bytes
+        :param validate: check every entry against the schema
+        :param dates: only keep these dates ('YYYY-MM-DD'), None for all
+        :param locations: only keep these locations, None for all
+        :return: ForecastResponse
+        """
+        forecast = cls()
+        validator = daily_entry_validator() if validate else None
+        dates = set(dates) if dates else None
+        locations = set(locations) if locations else None
+        for entry in iter_daily_entries(chunks):
+            if validator:
+                validator(entry)
+            if (dates and entry['date'] not in dates) or (locations and entry.get('location') not in locations):
+                continue
+            forecast.add(DailyForecast.from_entry(entry))
+        return forecast
+
+    @classmethod
+    def from_response(cls, response, **kwargs):
+        """
+        parse a requests response sent with stream=True, releasing its connection afterwards
+        :param response: requests.Response
+        :param kwargs: parse arguments
+        :return: ForecastResponse
+        """
+        with response:
+            return cls.parse(response.iter_content(CHUNK_SIZE), **kwargs)
+
+    def add(self, day):
+        self.days.append(day)
+        self.by_date.setdefault(day.date, []).append(day)
+        self.by_location.setdefault(day.location, []).append(day)
+        self._by_key.setdefault((day.date, day.location), day)
+
+    def get(self, date, location=None):
+        """
+        get the forecast of a day
+        :param date: 'YYYY-MM-DD'
+        :param location: location name, None for the first location of that date
+        :return: DailyForecast or None
+        """
+        if location is None:
+            days = self.by_date.get(date)
+            return days[0] if days else None
+        return self._by_key.get((date, location))
+
+    def __len__(self):
+        return len(self.days)
+
+    def __iter__(self):
+        return iter(self.days)
@@ -0,0 +1,211 @@
+import os
+from collections import OrderedDict, namedtuple
+
+# cv2 and numpy are imported at first use, so importing BasePage stays cheap for API-only runs
+from common.automation_config import AutomationConfig
+
+# x, y: match center in screen coordinates; rect: (left, top, right, bottom)
+MatchResult = namedtuple('MatchResult', ['x', 'y', 'confidence', 'rect'])
+
+
+class TemplateCache:
+    """
+    In-memory LRU cache of template image pyramids, keyed by path and modification time
+    so that an edited template file is picked up without restarting the session.
+    """
+
+    def __init__(self, max_size=32, levels=2):
+        self.max_size = max_size
+        self.levels = levels
+        self._items = OrderedDict()
+
+    def get(self, path):
+        """
+        get grayscale pyramid of a template, reading the file only on a cache miss
+        :param path: template image path
+        :return: list of grayscale images, full resolution first
+        """
+        key = (str(path), os.path.getmtime(path))
+        pyramid = self._items.get(key)
+        if pyramid is not None:
+            self._items.move_to_end(key)
+            return pyramid
+        import cv2
+        import numpy as np
+
+        # np.fromfile + imdecode also handles non-ascii paths, same as aircv.imread
+        image = cv2.imdecode(np.fromfile(str(path), dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise Exception(f"无法读取模板图片: {path}")
+        pyramid = build_pyramid(image, self.levels)
+        self._items[key] = pyramid
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+        return pyramid
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+def build_pyramid(image, levels):
+    """
+    build a downscaled pyramid, each level half the size of the previous one
+    :param image: grayscale image
+    :param levels: number of downscaled levels
+    :return: list of images, full resolution first
+    """
+    import cv2
+
+    pyramid = [image]
+    for _ in range(levels):
+        pyramid.append(cv2.pyrDown(pyramid[-1]))
+    return pyramid
+
+
+def to_gray(image):
+    """
+    convert an opencv (BGR) screenshot to grayscale, no-op if it already is
+    :param image: ndarray
+    :return: grayscale ndarray
+    """
+    if image.ndim == 3:
+        import cv2
+
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+class ImageMatcher:
+    """
+    Template matching for BasePage.click_image.
+
+    Screens and templates are matched in grayscale. The best location is searched on
+    a downscaled pyramid level first and then refined level by level inside a small
+    window around the coarse hit, so the expensive full-resolution correlation only
+    runs over a template-sized neighbourhood. ``region`` (fractions of the screen) or
+    ``region_px`` (pixels) limits the search to part of the screen and ``find_all``
+    matches several templates against one screenshot.
+
+    Defaults are read from the ``Image`` section of ``automation_local.yaml``.
+    """
+
+    # coarse levels tolerate a lower score than the final threshold
+    COARSE_TOLERANCE = 0.2
+    # smallest template side worth matching on a downscaled level
+    MIN_TEMPLATE_SIDE = 12
+    _default = None
+
+    def __init__(self, cache_size=32, pyramid_levels=2, refine_margin=4):
+        """
+        :param cache_size: max number of templates kept in memory
+        :param pyramid_levels: number of downscaled levels used for the coarse search
+        :param refine_margin: extra pixels around the upscaled hit searched on each finer level
+        """
+        self.pyramid_levels = pyramid_levels
+        self.refine_margin = refine_margin
+        self.cache = TemplateCache(cache_size, pyramid_levels)
+
+    @classmethod
+    def default(cls):
+        """
+        shared matcher configured from automation_local.yaml, created on first use
+        :return: ImageMatcher
+        """
+        if cls._default is None:
+            cls._default = cls(**dict(AutomationConfig().config.get('Image') or {}))
+        return cls._default
+
+    def find(self, screen, template_path, threshold=0.9, region=None, region_px=None):
+        """
+        find a template on the screen
+        :param screen: opencv screenshot
+        :param template_path: template image path
+        :param threshold: min confidence
+        :param region: (left, top, right, bottom) as fractions of the screen, e.g. (0.5, 0, 1, 0.2)
+        :param region_px: (left, top, right, bottom) in pixels, instead of region
+        :return: MatchResult or None
+        """
+        return self.find_all(screen, [template_path], threshold, region, region_px)[template_path]
+
+    def find_all(self, screen, template_paths, threshold=0.9, region=None, region_px=None):
+        """
+        find several templates on the same screenshot; the screen pyramid is built once
+        :param screen: opencv screenshot
+        :param template_paths: template image paths
+        :param threshold: min confidence
+        :param region: (left, top, right, bottom) as fractions of the screen, e.g. (0.5, 0, 1, 0.2)
+        :param region_px: (left, top, right, bottom) in pixels, instead of region
+        :return: {template path: MatchResult or None}
+        """
+        gray = to_gray(screen)
+        offset_x, offset_y = 0, 0
+        if region or region_px:
+            left, top, right, bottom = self._region_pixels(gray.shape, region, region_px)
+            gray = gray[top:bottom, left:right]
+            offset_x, offset_y = left, top
+        screen_pyramid = build_pyramid(gray, self.pyramid_levels)
+        results = {}
+        for path in template_paths:
+            match = self._match(screen_pyramid, self.cache.get(path), threshold)
+            if match:
+                left, top, confidence, width, height = match
+                left, top = left + offset_x, top + offset_y
+                match = MatchResult(left + width // 2, top + height // 2, confidence,
+                                    (left, top, left + width, top + height))
+            results[path] = match
+        return results
+
+    @staticmethod
+    def _region_pixels(shape, region=None, region_px=None):
+        height, width = shape[:2]
+        if region and region_px:
+            raise Exception('region和region_px只能指定一个')
+        if region:
+            if not all(0 <= value <= 1 for value in region):
+                raise Exception(f'region是屏幕的比例，取值0-1，像素区域请用region_px: {region}')
+            left, top, right, bottom = region
+            left, right = left * width, right * width
+            top, bottom = top * height, bottom * height
+        else:
+            left, top, right, bottom = region_px
+        return (max(int(left), 0), max(int(top), 0),
+                min(int(right), width), min(int(bottom), height))
+
+    def _match(self, screen_pyramid, template_pyramid, threshold):
+        import cv2
+
+        full_height, full_width = template_pyramid[0].shape[:2]
+        if full_height > screen_pyramid[0].shape[0] or full_width > screen_pyramid[0].shape[1]:
+            return None
+        # start from the coarsest level on which the template is still meaningful
+        level = 0
+        for candidate in range(len(template_pyramid) - 1, 0, -1):
+            if min(template_pyramid[candidate].shape[:2]) >= self.MIN_TEMPLATE_SIDE:
+                level = candidate
+                break
+        result = cv2.matchTemplate(screen_pyramid[level], template_pyramid[level], cv2.TM_CCOEFF_NORMED)
+        _, confidence, _, (left, top) = cv2.minMaxLoc(result)
+        tolerance = self.COARSE_TOLERANCE if level else 0
+        if confidence < threshold - tolerance:
+            return None
+        # refine the hit level by level inside a template-sized window
+        while level > 0:
+            level -= 1
+            screen, template = screen_pyramid[level], template_pyramid[level]
+            height, width = template.shape[:2]
+            margin = self.refine_margin
+            x0, y0 = max(left * 2 - margin, 0), max(top * 2 - margin, 0)
+            x1 = min(left * 2 + width + margin, screen.shape[1])
+            y1 = min(top * 2 + height + margin, screen.shape[0])
+            window = screen[y0:y1, x0:x1]
+            if window.shape[0] < height or window.shape[1] < width:
+                return None
+            result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+            _, confidence, _, (left, top) = cv2.minMaxLoc(result)
+            left, top = left + x0, top + y0
+        if confidence < threshold:
+            return None
+        return left, top, confidence, full_width, full_height
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram: log-linear buckets over integer microseconds.
+
+    Values below ``2 ** sub_bucket_bits`` get exact buckets; above that every power of
+    two is split into ``2 ** (sub_bucket_bits - 1)`` linear sub-buckets, so any recorded
+    value is reported within a relative error of ``2 ** -(sub_bucket_bits - 1)`` (1.6%
+    with the default 7 bits) while memory stays bounded whatever the range.
+    """
+
+    def __init__(self, sub_bucket_bits=7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = Counter()
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def _index(self, value):
+        shift = max(value.bit_length() - self.sub_bucket_bits, 0)
+        return (shift << self.sub_bucket_bits) + (value >> shift)
+
+    def _highest_equivalent(self, index):
+        shift = index >> self.sub_bucket_bits
+        mantissa = index & ((1 << self.sub_bucket_bits) - 1)
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, latency_s):
+        """
+        record one latency
+        :param latency_s: latency(s)
+        :return:
+        """
+        # round, int() would put e.g. 29 us (0.000029 * 1e6 = 28.999...) into the 28 us bucket
+        value = max(round(latency_s * 1_000_000), 0)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total_us += value
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = max(self.max_us, value)
+
+    def percentile(self, percent):
+        """
+        latency at a percentile, the highest value equivalent to its bucket like HdrHistogram
+        :param percent: 0-100
+        :return: latency(ms)
+        """
+        if not self.count:
+            return 0.0
+        target = max(int(self.count * percent / 100 + 0.5), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self):
+        """
+        :return: {'count', 'min_ms', 'mean_ms', 'p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms'}
+        """
+        return {
+            'count': self.count,
+            'min_ms': (self.min_us or 0) / 1000,
+            'mean_ms': self.total_us / self.count / 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_us / 1000,
+        }
+
+
+class LoadResult:
+    """
+    outcome of a load run: latency histogram, status counts and errors
+    """
+
+    def __init__(self, mode, target):
+        self.mode = mode
+        self.target = target
+        self.histogram = LatencyHistogram()
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.duration = 0.0
+
+    @property
+    def requests(self):
+        return sum(self.statuses.values()) + sum(self.errors.values())
+
+    @property
+    def error_rate(self):
+        failed = sum(self.errors.values()) + sum(count for status, count in self.statuses.items() if status >= 400)
+        return failed / self.requests if self.requests else 0.0
+
+    def to_dict(self):
+        return {
+            'mode': self.mode,
+            'target': self.target,
+            'duration_s': round(self.duration, 3),
+            'requests': self.requests,
+            'throughput_rps': round(self.requests / self.duration, 1) if self.duration else 0.0,
+            'error_rate': round(self.error_rate, 4),
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'errors': dict(self.errors),
+            'latency': {key: round(value, 3) for key, value in self.histogram.summary().items()},
+        }
+
+    def summary_line(self):
+        data = self.to_dict()
+        latency = data['latency']
+        return (f"{self.mode} {self.target}: {data['requests']} requests in {data['duration_s']}s "
+                f"({data['throughput_rps']} rps), errors {data['error_rate']:.2%}, "
+                f"p50 {latency['p50_ms']} ms, p95 {latency['p95_ms']} ms, p99 {latency['p99_ms']} ms, "
+                f"max {latency['max_ms']} ms")
+
+    def check(self, thresholds):
+        """
+        compare the result with thresholds such as {'p95_ms': 200, 'p99_ms': 500, 'error_rate': 0.01}
+        :param thresholds: max allowed values, keys are latency summary keys or 'error_rate'
+        :return: list of violations, empty if the run passed
+        """
+        data = self.to_dict()
+        violations = []
+        for key, limit in (thresholds or {}).items():
+            value = data['error_rate'] if key == 'error_rate' else data['latency'].get(key)
+            if value is None:
+                raise Exception(f'未知的压测阈值: {key}')
+            if value > limit:
+                violations.append(f'{key} {value} > {limit}')
+        return violations
+
+    def write_json(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding='utf-8')
+        return path
+
+
+class LoadDriver:
+    """
+    asyncio load driver over one pooled httpx.AsyncClient.
+
+    - closed loop: ``concurrency`` workers each send the next request as soon as the
+      previous one answered, which measures the capacity at a fixed concurrency
+    - open loop: requests start at a constant ``rate`` whether or not earlier ones
+      answered; latency is measured from the scheduled start, so a stalled server
+      shows up in the tail instead of silently slowing the arrival rate
+      (coordinated omission)
+    """
+
+    def __init__(self, url, headers=None, params=None, timeout=10.0, max_connections=100):
+        self.url = url
+        self.headers = headers or {}
+        self.params = params or {}
+        self.timeout = timeout
+        self.max_connections = max_connections
+
+    def run(self, mode='closed', duration=10.0, concurrency=10, rate=50.0):
+        """
+        run a load test
+        :param mode: 'closed' or 'open'
+        :param duration: run time(s)
+        :param concurrency: closed loop workers
+        :param rate: open loop arrivals per second
+        :return: LoadResult
+        """
+        if mode == 'closed':
+            coroutine = self._closed_loop(duration, concurrency)
+        elif mode == 'open':
+            coroutine = self._open_loop(duration, rate)
+        else:
+            raise Exception(f'不支持的压测模式: {mode}')
+        return asyncio.run(coroutine)
+
+    def _client(self, connections):
+        import httpx
+
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        return httpx.AsyncClient(headers=self.headers, timeout=self.timeout, limits=limits)
+
+    async def _send(self, client, result, started):
+        try:
+            response = await client.get(self.url, params=self.params)
+            await response.aread()
+            result.statuses[response.status_code] += 1
+        except Exception as e:
+            result.errors[type(e).__name__] += 1
+        result.histogram.record(time.perf_counter() - started)
+
+    async def _closed_loop(self, duration, concurrency):
+        result = LoadResult('closed', f'{concurrency} concurrent')
+        start = time.perf_counter()
+        deadline = start + duration
+        async with self._client(concurrency) as client:
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await self._send(client, result, time.perf_counter())
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        result.duration = time.perf_counter() - start
+        return result
+
+    async def _open_loop(self, duration, rate):
+        result = LoadResult('open', f'{rate} rps')
+        interval = 1.0 / rate
+        start = time.perf_counter()
+        tasks = []
+        async with self._client(self.max_connections) as client:
+            for arrival in range(int(duration * rate)):
+                scheduled = start + arrival * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(self._send(client, result, scheduled)))
+            await asyncio.gather(*tasks)
+        result.duration = time.perf_counter() - start
+        return result
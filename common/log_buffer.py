@@ -0,0 +1,64 @@
+import logging
+from collections import deque
+
+from common.custom_logger import ColoredFormatter, LOG_DATE_FORMAT, LOG_FORMAT
+
+
+class LogRingBuffer(logging.Filter):
+    """
+    Quiet logging mode: holds a test's log records in a bounded ring buffer instead of
+    writing them, and writes them out only when asked to (i.e. when the test failed).
+
+    Installed as a filter on the CustomLogger (root) logger, so while it is active no
+    handler runs at all: no formatting, no console or file I/O, no pytest capture. Records
+    of child loggers (uiautomator2, urllib3 ...) are not affected.
+    """
+
+    def __init__(self, capacity=2000):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.active = False
+        self.dropped = 0
+
+    def filter(self, record):
+        if not self.active:
+            return True
+        if len(self.records) == self.records.maxlen:
+            self.dropped += 1
+        self.records.append(record)
+        return False
+
+    def start(self):
+        """
+        drop what is buffered and start buffering the next test
+        :return:
+        """
+        self.records.clear()
+        self.dropped = 0
+        self.active = True
+
+    def stop(self):
+        """
+        stop buffering, later records are written as usual
+        :return:
+        """
+        self.active = False
+
+    def flush(self, logger):
+        """
+        write the buffered records to the handlers of logger and empty the buffer
+        :param logger: logger the buffer is installed on
+        :return: the buffered records as text, for the report
+        """
+        records = list(self.records)
+        self.records.clear()
+        for record in records:
+            for handler in logger.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        formatter = ColoredFormatter(fmt=LOG_FORMAT, datefmt=LOG_DATE_FORMAT, use_color=False)
+        lines = [formatter.format(record) for record in records]
+        if self.dropped:
+            lines.insert(0, f'... {self.dropped} earlier record(s) dropped, ring buffer holds {self.records.maxlen}')
+            self.dropped = 0
+        return '\n'.join(lines)
@@ -0,0 +1,264 @@
+import base64
+import gzip
+import io
+import json
+import threading
+from collections import defaultdict, deque
+
+from common.custom_logger import CustomLogger
+
+# attribute names never forwarded through the proxies (pytest/pickle/IPython probes)
+_IGNORED_ATTRIBUTES = ('__', '_ipython', '_repr')
+
+
+def _shell_response():
+    from uiautomator2 import ShellResponse
+    return ShellResponse
+
+
+# named tuples replayed with their type, by name; any other named tuple is replayed as a plain tuple.
+# only these are ever rebuilt, so a session file cannot name a callable to run
+NAMED_TUPLES = {
+    'ShellResponse': _shell_response,
+}
+
+
+def call_key(path, args, kwargs):
+    """
+    deterministic key of a call, e.g. "d.xpath('//x').exists"
+    :param path: proxy path
+    :param args: positional arguments
+    :param kwargs: keyword arguments
+    :return: str
+    """
+    arguments = [repr(arg) for arg in args] + [f'{name}={value!r}' for name, value in sorted(kwargs.items())]
+    return f"{path}({', '.join(arguments)})"
+
+
+def _is_plain(value):
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_is_plain(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_plain(item) for key, item in value.items())
+    return _image_kind(value) is not None
+
+
+def _image_kind(value):
+    module = type(value).__module__
+    if module.startswith('PIL.'):
+        return 'image'
+    if module == 'numpy' and type(value).__name__ == 'ndarray':
+        return 'ndarray'
+    return None
+
+
+def encode(value):
+    """
+    encode a plain value (json types, bytes, tuples, named tuples, PIL images, opencv images) to json
+    :param value: plain value
+    :return: json-compatible value
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode()}
+    named_type = NAMED_TUPLES.get(type(value).__name__)
+    if named_type is not None and type(value) is named_type():
+        # e.g. uiautomator2's ShellResponse, so replayed results keep .output/.exit_code
+        return {'__namedtuple__': type(value).__name__, 'values': [encode(item) for item in value]}
+    if isinstance(value, tuple):
+        return {'__tuple__': [encode(item) for item in value]}
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    if isinstance(value, dict):
+        return {'__dict__': {key: encode(item) for key, item in value.items()}}
+    kind = _image_kind(value)
+    if kind == 'image':
+        buffer = io.BytesIO()
+        value.save(buffer, format='PNG')
+        return {'__image__': base64.b64encode(buffer.getvalue()).decode()}
+    if kind == 'ndarray':
+        import cv2
+        _, data = cv2.imencode('.png', value)
+        return {'__ndarray__': base64.b64encode(data.tobytes()).decode()}
+    raise TypeError(f'cannot encode {type(value)}')
+
+
+def decode(value):
+    """
+    decode a value produced by encode
+    :param value: json value
+    :return: python value
+    """
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if '__bytes__' in value:
+        return base64.b64decode(value['__bytes__'])
+    if '__tuple__' in value:
+        return tuple(decode(item) for item in value['__tuple__'])
+    if '__namedtuple__' in value:
+        named_type = NAMED_TUPLES.get(value['__namedtuple__'])
+        if named_type is None:
+            raise ValueError(f"named tuple not allowed in a session: {value['__namedtuple__']}")
+        return named_type()(*(decode(item) for item in value['values']))
+    if '__dict__' in value:
+        return {key: decode(item) for key, item in value['__dict__'].items()}
+    if '__image__' in value:
+        from PIL import Image
+        return Image.open(io.BytesIO(base64.b64decode(value['__image__'])))
+    if '__ndarray__' in value:
+        import cv2
+        import numpy as np
+        return cv2.imdecode(np.frombuffer(base64.b64decode(value['__ndarray__']), dtype=np.uint8), cv2.IMREAD_COLOR)
+    raise ValueError(f'unknown encoded value: {list(value)}')
+
+
+class RecordingDevice:
+    """
+    Proxy around a uiautomator2 device that records every call and response.
+
+    Plain results (hierarchy dumps, window size, info dicts, screenshots ...) are stored
+    in the session file; objects such as xpath selectors or UiObjects are wrapped in
+    another proxy so their calls are recorded too. The session is a gzip'd JSON-lines
+    file of ``[kind, key, value]`` entries that ReplayDevice serves back in order.
+    """
+
+    def __init__(self, device, session_path, _path='d', _session=None):
+        self._target = device
+        self._path = _path
+        if _session is None:
+            _session = {'file': gzip.open(session_path, 'wt', encoding='utf-8'), 'lock': threading.Lock()}
+            CustomLogger.print_log(f'录制设备会话到 {session_path}')
+        self._session = _session
+
+    def close(self):
+        """
+        close the session file
+        :return:
+        """
+        self._session['file'].close()
+
+    def _record(self, kind, key, value):
+        line = json.dumps([kind, key, value], ensure_ascii=False, separators=(',', ':'))
+        with self._session['lock']:
+            self._session['file'].write(line + '\n')
+
+    def _wrap(self, kind, key, value):
+        if _is_plain(value):
+            self._record(kind, key, encode(value))
+            return value
+        if isinstance(value, (list, tuple)):
+            self._record(kind, key, {'__proxy_list__': len(value)})
+            return [self._wrap_child(f'{key}[{index}]', item) for index, item in enumerate(value)]
+        self._record(kind, key, {'__proxy__': True})
+        return RecordingDevice(value, None, key, self._session)
+
+    def _wrap_child(self, key, value):
+        if _is_plain(value):
+            self._record('get', key, encode(value))
+            return value
+        self._record('get', key, {'__proxy__': True})
+        return RecordingDevice(value, None, key, self._session)
+
+    def _call(self, key, func, *args, **kwargs):
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._record('call', key, {'__error__': type(e).__name__, 'message': str(e)})
+            raise
+        return self._wrap('call', key, result)
+
+    def __getattr__(self, name):
+        if name.startswith(_IGNORED_ATTRIBUTES):
+            raise AttributeError(name)
+        value = getattr(self._target, name)
+        key = f'{self._path}.{name}'
+        if callable(value) and not isinstance(value, type):
+            return RecordingDevice(value, None, key, self._session)
+        return self._wrap('get', key, value)
+
+    def __call__(self, *args, **kwargs):
+        return self._call(call_key(self._path, args, kwargs), self._target, *args, **kwargs)
+
+    def __getitem__(self, index):
+        return self._call(f'{self._path}[{index!r}]', self._target.__getitem__, index)
+
+    def __bool__(self):
+        return self._call(f'{self._path}.__bool__()', lambda: bool(self._target))
+
+    def __len__(self):
+        return self._call(f'{self._path}.__len__()', lambda: len(self._target))
+
+
+class ReplaySession:
+    """
+    Recorded responses grouped per key, served in recording order. Once a key is
+    exhausted its last response is repeated, so polling loops that run a few more
+    rounds than during recording still get a deterministic answer.
+    """
+
+    def __init__(self, session_path):
+        self.responses = defaultdict(deque)
+        self.last = {}
+        with gzip.open(session_path, 'rt', encoding='utf-8') as session_file:
+            for line in session_file:
+                kind, key, value = json.loads(line)
+                self.responses[(kind, key)].append(value)
+        CustomLogger.print_log(f'加载回放会话 {session_path}, 共{sum(map(len, self.responses.values()))}条记录')
+
+    def has(self, kind, key):
+        return (kind, key) in self.responses
+
+    def next(self, kind, key):
+        queue = self.responses.get((kind, key))
+        if queue is None:
+            raise Exception(f"回放会话中没有记录: {kind} {key}")
+        if queue:
+            self.last[(kind, key)] = queue.popleft()
+        value = self.last[(kind, key)]
+        if isinstance(value, dict):
+            if '__error__' in value:
+                raise Exception(f"{value['__error__']}: {value['message']}")
+            if '__proxy__' in value:
+                return ReplayDevice(self, key)
+            if '__proxy_list__' in value:
+                return [self.next('get', f'{key}[{index}]') for index in range(value['__proxy_list__'])]
+        return decode(value)
+
+
+class ReplayDevice:
+    """
+    Device stand-in that serves the responses of a RecordingDevice session, so page
+    objects and BDD scenarios run deterministically without a phone attached.
+    """
+
+    def __init__(self, session, _path='d'):
+        self._session = session if isinstance(session, ReplaySession) else ReplaySession(session)
+        self._path = _path
+
+    def __getattr__(self, name):
+        if name.startswith(_IGNORED_ATTRIBUTES):
+            raise AttributeError(name)
+        key = f'{self._path}.{name}'
+        if self._session.has('get', key):
+            return self._session.next('get', key)
+        return ReplayDevice(self._session, key)
+
+    def __call__(self, *args, **kwargs):
+        return self._session.next('call', call_key(self._path, args, kwargs))
+
+    def __getitem__(self, index):
+        return self._session.next('call', f'{self._path}[{index!r}]')
+
+    def __bool__(self):
+        return self._session.next('call', f'{self._path}.__bool__()')
+
+    def __len__(self):
+        return self._session.next('call', f'{self._path}.__len__()')
+
+    def close(self):
+        pass
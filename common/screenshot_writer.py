@@ -0,0 +1,123 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+from common.automation_config import AutomationConfig
+from common.custom_logger import CustomLogger
+
+
+class ScreenshotWriter:
+    """
+    Background writer for screenshots.
+
+    The image is captured on the test thread; encoding and disk I/O run on a small
+    thread pool. ``submit`` returns as soon as the work is queued, and blocks only when
+    ``max_pending`` screenshots are already in flight so memory stays bounded.
+    Call ``flush`` (done at session end by conftest) before reading the files.
+
+    Defaults are read from the ``Screenshot`` section of ``automation_local.yaml``.
+    """
+
+    # encoder name -> (PIL format, file suffix)
+    ENCODERS = {
+        'png': ('PNG', '.png'),
+        'webp': ('WEBP', '.webp'),
+        'jpeg': ('JPEG', '.jpg'),
+    }
+    _default = None
+
+    def __init__(self, image_dir=None, encoder='png', quality=85, workers=2, max_pending=16):
+        """
+        :param image_dir: directory screenshots are written to, created once here
+        :param encoder: 'png', 'webp' or 'jpeg'
+        :param quality: quality for the lossy encoders (webp, jpeg)
+        :param workers: encoder threads
+        :param max_pending: max screenshots queued or being written at the same time
+        """
+        if encoder not in self.ENCODERS:
+            raise Exception(f"不支持的截图编码: {encoder}, 可选: {list(self.ENCODERS)}")
+        self.image_dir = Path(image_dir or Path(__file__).parents[1] / 'image')
+        self.image_dir.mkdir(parents=True, exist_ok=True)
+        self.encoder = encoder
+        self.quality = quality
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='screenshot-writer')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    @classmethod
+    def default(cls):
+        """
+        shared writer configured from automation_local.yaml, created on first use
+        :return: ScreenshotWriter
+        """
+        if cls._default is None:
+            cls._default = cls(**dict(AutomationConfig().config.get('Screenshot') or {}))
+        return cls._default
+
+    @classmethod
+    def flush_default(cls, timeout=None):
+        """
+        flush the shared writer if it was ever used
+        :param timeout: timeout(s)
+        :return:
+        """
+        if cls._default is not None:
+            cls._default.flush(timeout)
+
+    def path_for(self, prefix='screen_img_'):
+        """
+        get a unique file path for a new screenshot
+        :param prefix: file name prefix
+        :return: Path
+        """
+        pic_time = datetime.now().strftime("%Y%m%d%H%M%S")
+        suffix = self.ENCODERS[self.encoder][1]
+        return self.image_dir / f"{prefix}{pic_time}_{next(self._counter):04d}{suffix}"
+
+    def submit(self, image, path=None):
+        """
+        queue a PIL image to be encoded and written in the background
+        :param image: PIL image
+        :param path: target path, None for a new unique path
+        :return: (path, Future)
+        """
+        path = Path(path) if path else self.path_for()
+        self._slots.acquire()
+        future = self._executor.submit(self._write, image, path)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return path, future
+
+    def flush(self, timeout=None):
+        """
+        wait until every queued screenshot is on disk
+        :param timeout: timeout(s)
+        :return:
+        """
+        with self._lock:
+            pending = list(self._pending)
+        if pending:
+            CustomLogger.print_debug('等待%s张截图写入磁盘', len(pending))
+            wait(pending, timeout=timeout)
+
+    def _write(self, image, path):
+        image_format = self.ENCODERS[self.encoder][0]
+        if image_format == 'PNG':
+            image.save(path, format=image_format)
+        else:
+            if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            image.save(path, format=image_format, quality=self.quality)
+        return path
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+        if future.exception():
+            CustomLogger.print_error(f'截图写入失败: {future.exception()}')
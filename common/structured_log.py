@@ -0,0 +1,106 @@
+import json
+import logging
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+# what the test run is doing right now, stamped on every JSONL record;
+# conftest updates it as tests, bdd steps and devices change
+LOG_CONTEXT = {'test_id': None, 'step': None, 'serial': None}
+_STEP_START = [None]
+
+
+def set_log_context(**fields):
+    """
+    update the fields stamped on structured log records
+    :param fields: test_id, step and/or serial
+    :return:
+    """
+    LOG_CONTEXT.update(fields)
+    if 'step' in fields:
+        _STEP_START[0] = time.time() if fields['step'] else None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    one JSON object per record: time, level, logger, message, source location, the
+    current test id, bdd step and device serial, and a duration in ms.
+
+    The duration is the ``duration`` passed with the record (seconds, e.g.
+    ``CustomLogger.print_log('ready', duration=latency)``) or else the time since the
+    current step started.
+    """
+
+    def format(self, record):
+        duration = getattr(record, 'duration', None)
+        if duration is None and _STEP_START[0] is not None:
+            duration = record.created - _STEP_START[0]
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'test_id': LOG_CONTEXT['test_id'],
+            'step': LOG_CONTEXT['step'],
+            'serial': LOG_CONTEXT['serial'],
+            'duration_ms': None if duration is None else round(duration * 1000, 3),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class JsonLinesHandler(RotatingFileHandler):
+    """
+    JSONL file sink rotated by size and by age, whichever comes first.
+
+    :param path: log file
+    :param max_bytes: rotate when the file reaches this size, 0 to disable
+    :param rotate_seconds: rotate when the file is older than this, 0 to disable
+    :param backup_count: number of rotated files kept
+    """
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, rotate_seconds=0, backup_count=5):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        self.rotate_seconds = rotate_seconds
+        self.rollover_at = time.time() + rotate_seconds if rotate_seconds else None
+        self.setFormatter(JsonLinesFormatter())
+
+    def shouldRollover(self, record):
+        # compare the current file size instead of formatting the record a second time
+        if self.rollover_at and record.created >= self.rollover_at:
+            return True
+        if self.maxBytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            return self.stream.tell() >= self.maxBytes
+        return False
+
+    def doRollover(self):
+        super().doRollover()
+        if self.rotate_seconds:
+            self.rollover_at = time.time() + self.rotate_seconds
+
+
+def setup_jsonl_handler(logger, config):
+    """
+    attach a JsonLinesHandler to logger as configured in the Logging.jsonl config section
+    :param logger: logger, usually CustomLogger.logger
+    :param config: the Logging.jsonl config dict, e.g. {'enabled': True, 'path': 'log/automation.jsonl'}
+    :return: handler, or None if disabled
+    """
+    if not config or not config.get('enabled'):
+        return None
+    path = Path(config.get('path', 'log/automation.jsonl'))
+    if not path.is_absolute():
+        path = Path(__file__).parents[1] / path
+    handler = JsonLinesHandler(path,
+                               max_bytes=config.get('max_bytes', 10 * 1024 * 1024),
+                               rotate_seconds=config.get('rotate_seconds', 0),
+                               backup_count=config.get('backup_count', 5))
+    handler.setLevel(config.get('level', 'DEBUG'))
+    logger.addHandler(handler)
+    return handler
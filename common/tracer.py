@@ -0,0 +1,245 @@
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class Span:
+    """
+    One timed operation: a scenario, a bdd step, a page action, a wait or a device RPC.
+    """
+
+    __slots__ = ('span_id', 'parent_id', 'name', 'cat', 'args', 'start_ns', 'end_ns', 'thread_id')
+
+    def __init__(self, span_id, parent_id, name, cat, args):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+
+    def set(self, **args):
+        self.args.update(args)
+
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.perf_counter_ns()) - self.start_ns) / 1e6
+
+
+class _NullSpan:
+    """
+    returned by begin while tracing is disabled; hot paths (traced, Waiter.until) check
+    TRACER.enabled first and skip the span and its attributes altogether
+    """
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Collects nested spans per test and exports them as Chrome trace JSON (open in
+    chrome://tracing or Perfetto) or as OpenTelemetry-style JSON lines.
+
+    Disabled by default; conftest enables it with ``--trace-dir``.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # perf_counter is monotonic but has no epoch; keep the offset for exported timestamps
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+        self._local.stack = []
+
+    def begin(self, name, cat='action', **args):
+        """
+        open a span nested under the current span of this thread
+        :param name: span name
+        :param cat: category, e.g. 'scenario', 'step', 'action', 'wait', 'rpc'
+        :param args: span attributes
+        :return: Span, or NULL_SPAN while disabled
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        stack = self._stack()
+        span = Span(next(self._ids), stack[-1].span_id if stack else None, name, cat, args)
+        stack.append(span)
+        return span
+
+    def end(self, span, **args):
+        """
+        close a span opened with begin
+        :param span: Span, NULL_SPAN or None (the hook that would have opened it never ran)
+        :param args: extra span attributes
+        :return:
+        """
+        if span is None or span is NULL_SPAN:
+            return
+        span.end_ns = time.perf_counter_ns()
+        span.args.update(args)
+        stack = self._stack()
+        if span in stack:
+            del stack[stack.index(span):]
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name, cat='action', **args):
+        span = self.begin(name, cat, **args)
+        try:
+            yield span
+        except Exception as e:
+            span.set(error=f'{type(e).__name__}: {e}')
+            raise
+        finally:
+            self.end(span)
+
+    def step_summary(self):
+        """
+        one-line latency summary of the bdd steps traced so far
+        :return: e.g. "Given 1.20s | When 3.41s | Then 0.02s"
+        """
+        steps = sorted((span for span in self.spans if span.cat == 'step'), key=lambda span: span.start_ns)
+        return ' | '.join(f"{span.name} {span.duration_ms / 1000:.2f}s" for span in steps)
+
+    def export_chrome(self, path):
+        """
+        export spans as Chrome trace event JSON
+        :param path: output file
+        :return: path
+        """
+        pid = os.getpid()
+        events = [{
+            'name': span.name,
+            'cat': span.cat,
+            'ph': 'X',
+            'ts': (span.start_ns + self._epoch_offset_ns) / 1000,
+            'dur': (span.end_ns - span.start_ns) / 1000,
+            'pid': pid,
+            'tid': span.thread_id,
+            'args': {key: str(value) for key, value in span.args.items()},
+        } for span in self.spans]
+        Path(path).write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, ensure_ascii=False),
+                              encoding='utf-8')
+        return path
+
+    def export_jsonl(self, path, trace_id=None):
+        """
+        export spans as OpenTelemetry-style JSON lines
+        :param path: output file
+        :param trace_id: trace id shared by all spans, e.g. the test node id
+        :return: path
+        """
+        with open(path, 'w', encoding='utf-8') as trace_file:
+            for span in self.spans:
+                trace_file.write(json.dumps({
+                    'trace_id': trace_id,
+                    'span_id': span.span_id,
+                    'parent_span_id': span.parent_id,
+                    'name': span.name,
+                    'kind': span.cat,
+                    'start_time_unix_nano': span.start_ns + self._epoch_offset_ns,
+                    'end_time_unix_nano': span.end_ns + self._epoch_offset_ns,
+                    'attributes': {key: str(value) for key, value in span.args.items()},
+                }, ensure_ascii=False) + '\n')
+        return path
+
+
+TRACER = Tracer()
+
+
+def traced(name=None, cat='action', describe=None):
+    """
+    decorator wrapping a function call in a span
+    :param name: span name, defaults to the function name
+    :param cat: span category
+    :param describe: optional callable(args) returning extra span attributes from the call arguments
+    :return: decorator
+    """
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            attributes = describe(args[1:]) if describe else {}
+            with TRACER.span(span_name, cat, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracingDevice:
+    """
+    Proxy around a uiautomator2 device that records every RPC (method calls and
+    property reads such as ``info`` or ``exists``) as an 'rpc' span. Selector objects
+    returned by the device are wrapped as well.
+    """
+
+    def __init__(self, target, path='d'):
+        self._target = target
+        self._path = path
+
+    @staticmethod
+    def _wrap(value, path):
+        if type(value).__module__.startswith('uiautomator2'):
+            return TracingDevice(value, path)
+        return value
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        path = f'{self._path}.{name}'
+        if isinstance(getattr(type(self._target), name, None), (property, functools.cached_property)):
+            # properties such as info or exists talk to the device
+            with TRACER.span(path, 'rpc'):
+                value = getattr(self._target, name)
+        else:
+            value = getattr(self._target, name)
+        if callable(value) and not isinstance(value, type):
+            return TracingDevice(value, path)
+        return self._wrap(value, path)
+
+    def __call__(self, *args, **kwargs):
+        with TRACER.span(f'{self._path}()', 'rpc'):
+            result = self._target(*args, **kwargs)
+        return self._wrap(result, f'{self._path}()')
+
+    def __getitem__(self, index):
+        return self._wrap(self._target[index], f'{self._path}[{index}]')
+
+    def __bool__(self):
+        with TRACER.span(f'{self._path}.__bool__', 'rpc'):
+            return bool(self._target)
+
+    def __len__(self):
+        return len(self._target)
@@ -0,0 +1,119 @@
+import time
+
+from common.automation_config import AutomationConfig
+from common.custom_logger import CustomLogger
+from common.tracer import TRACER
+
+
+class Waiter:
+    """
+    Central wait/poll engine used by every locate, exist and image call.
+
+    The condition is checked immediately, so elements that are already present come
+    back without sleeping. Misses are retried with a growing interval (short polls
+    first, longer ones later) and every sleep is clipped to the remaining deadline,
+    so a wait never overruns its budget and a long miss does not hammer the device RPC.
+
+    Defaults are read from the ``Wait`` section of ``automation_local.yaml``::
+
+        Wait:
+          initial_interval: 0.05
+          backoff_factor: 1.6
+          max_interval: 1.0
+          timeouts:
+            xpath: 5
+            exist: 1
+    """
+
+    DEFAULT_TIMEOUTS = {
+        'default': 5,
+        'id': 5,
+        'xpath': 5,
+        'text': 5,
+        'text_contains': 5,
+        'exist': 1,
+        'image': 3,
+        'ready': 15,
+        'route': 5,
+    }
+    _default = None
+
+    def __init__(self, initial_interval=0.05, backoff_factor=1.6, max_interval=1.0, timeouts=None):
+        """
+        :param initial_interval: sleep after the first miss (s)
+        :param backoff_factor: growth of the sleep after every further miss
+        :param max_interval: upper bound of a single sleep (s)
+        :param timeouts: default timeout per locate type (s), overrides DEFAULT_TIMEOUTS
+        """
+        self.initial_interval = initial_interval
+        self.backoff_factor = backoff_factor
+        self.max_interval = max_interval
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+
+    @classmethod
+    def default(cls):
+        """
+        shared waiter configured from automation_local.yaml, created on first use
+        :return: Waiter
+        """
+        if cls._default is None:
+            wait_config = dict(AutomationConfig().config.get('Wait') or {})
+            cls._default = cls(**wait_config)
+        return cls._default
+
+    def timeout_for(self, kind):
+        """
+        get default timeout of a locate type
+        :param kind: locate type, e.g. 'xpath', 'exist', 'image'
+        :return: timeout(s)
+        """
+        return self.timeouts.get(kind, self.timeouts['default'])
+
+    def intervals(self):
+        """
+        generate backoff intervals: initial, initial * factor, ... capped at max_interval
+        :return: generator of intervals(s)
+        """
+        interval = self.initial_interval
+        while True:
+            yield interval
+            interval = min(interval * self.backoff_factor, self.max_interval)
+
+    def until(self, condition, timeout=None, kind='default'):
+        """
+        poll condition until it returns a truthy value or the deadline passes
+        :param condition: callable without arguments; exceptions count as a miss
+        :param timeout: timeout(s), None for the default timeout of kind
+        :param kind: locate type used to pick the default timeout
+        :return: the truthy value returned by condition, or None on timeout
+        """
+        if timeout is None:
+            timeout = self.timeout_for(kind)
+        if not TRACER.enabled:
+            return self._poll(condition, timeout, kind)[0]
+        with TRACER.span('wait', 'wait', kind=kind, timeout=timeout) as span:
+            result, attempts = self._poll(condition, timeout, kind)
+            span.set(retries=attempts - 1, found=result is not None)
+            return result
+
+    def _poll(self, condition, timeout, kind):
+        """
+        :return: (truthy result or None, number of attempts)
+        """
+        deadline = time.monotonic() + timeout
+        attempts = 0
+        for interval in self.intervals():
+            attempts += 1
+            try:
+                result = condition()
+            except Exception as e:
+                CustomLogger.print_debug('第%s次轮询出现异常: %s', attempts, e)
+                result = None
+            if result:
+                return result, attempts
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                CustomLogger.print_debug('等待超时(%ss, %s)，共轮询%s次', timeout, kind, attempts)
+                return None, attempts
+            time.sleep(min(interval, remaining))
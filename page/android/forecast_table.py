@@ -0,0 +1,139 @@
+import re
+from array import array
+from datetime import date
+
+# '10月18日', '2026年10月18日10时30分', '更新时间: 2026年10月18日...'; the year is optional
+_DATE_PATTERN = re.compile(r'(?:(\d{4})\s*年\s*)?(\d{1,2})\s*月\s*(\d{1,2})\s*日')
+# '20 - 26°C', '55 - 85%', '-2 - 5°C'; a single value is a range of one
+_RANGE_PATTERN = re.compile(r'(-?\d+)(?:\s*[-~至]\s*(-?\d+))?')
+
+
+def parse_forecast_date(text, after=None):
+    """
+    parse the first chinese date in a text
+    :param text: e.g. '10月18日' or '更新时间: 2026年10月18日10时30分'
+    :param after: for dates without a year, the first such date on or after this date is returned,
+                  so forecast rows roll over into the next year; defaults to the current year
+    :return: datetime.date
+    """
+    match = _DATE_PATTERN.search(text or '')
+    if not match:
+        raise Exception(f'无法解析日期: {text}')
+    year, month, day = match.groups()
+    if year:
+        return date(int(year), int(month), int(day))
+    if after is None:
+        return date(date.today().year, int(month), int(day))
+    parsed = date(after.year, int(month), int(day))
+    return parsed if parsed >= after else date(after.year + 1, int(month), int(day))
+
+
+def format_forecast_date(value):
+    """
+    :param value: datetime.date
+    :return: 'MM月DD日'
+    """
+    return f'{value.month:02d}月{value.day:02d}日'
+
+
+def parse_range(text):
+    """
+    parse a 'min - max' range such as '20 - 26°C'
+    :param text: range text
+    :return: (min, max) ints
+    """
+    match = _RANGE_PATTERN.search(text or '')
+    if not match:
+        raise Exception(f'无法解析范围: {text}')
+    low, high = match.groups()
+    return int(low), int(high if high is not None else low)
+
+
+class ForecastTable:
+    """
+    All rows of the nine-day forecast as parallel columns.
+
+    Dates are kept as ordinals and the temperature/RH ranges as ints in ``array``
+    columns, so checks over every day are column operations, e.g.
+    ``all(low <= high for low, high in zip(table.rh_min, table.rh_max))``.
+    Rows are keyed by date: the same row seen again at another scroll position is ignored.
+    """
+
+    __slots__ = ('date_ordinal', 'day_of_week', 'temp_min', 'temp_max', 'rh_min', 'rh_max', 'psr',
+                 'description', '_rows')
+
+    def __init__(self):
+        self.date_ordinal = array('l')
+        self.day_of_week = []
+        self.temp_min = array('h')
+        self.temp_max = array('h')
+        self.rh_min = array('h')
+        self.rh_max = array('h')
+        self.psr = []
+        self.description = []
+        self._rows = {}
+
+    @property
+    def dates(self):
+        return [date.fromordinal(ordinal) for ordinal in self.date_ordinal]
+
+    def add(self, forecast_date, day_of_week, temp, rh, psr, description):
+        """
+        append a row unless its date is already in the table
+        :param forecast_date: datetime.date
+        :param day_of_week: day of the week text
+        :param temp: temperature text, e.g. '20 - 26°C'
+        :param rh: relative humidity text, e.g. '55 - 85%'
+        :param psr: probability of significant rain text
+        :param description: weather description
+        :return: True if the row was added
+        """
+        ordinal = forecast_date.toordinal()
+        if ordinal in self._rows:
+            return False
+        temp_min, temp_max = parse_range(temp)
+        rh_min, rh_max = parse_range(rh)
+        self._rows[ordinal] = len(self.date_ordinal)
+        self.date_ordinal.append(ordinal)
+        self.day_of_week.append(day_of_week)
+        self.temp_min.append(temp_min)
+        self.temp_max.append(temp_max)
+        self.rh_min.append(rh_min)
+        self.rh_max.append(rh_max)
+        self.psr.append(psr)
+        self.description.append(description)
+        return True
+
+    def index_of(self, forecast_date):
+        """
+        :param forecast_date: datetime.date
+        :return: row index or None
+        """
+        return self._rows.get(forecast_date.toordinal())
+
+    def row(self, index):
+        """
+        one row as a dict, e.g. for the report
+        :param index: row index, negative counts from the end
+        :return: dict
+        """
+        return {
+            'date': date.fromordinal(self.date_ordinal[index]),
+            'day_of_week': self.day_of_week[index],
+            'temp': (self.temp_min[index], self.temp_max[index]),
+            'rh': (self.rh_min[index], self.rh_max[index]),
+            'psr': self.psr[index],
+            'description': self.description[index],
+        }
+
+    def __len__(self):
+        return len(self.date_ordinal)
+
+    def __iter__(self):
+        return (self.row(index) for index in range(len(self)))
+
+    def __repr__(self):
+        if not self:
+            return 'ForecastTable(0 days)'
+        first, last = self.dates[0], self.dates[-1]
+        return f'ForecastTable({len(self)} days, {format_forecast_date(first)} - {format_forecast_date(last)})'
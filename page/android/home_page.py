@@ -1,4 +1,3 @@
-from common.locate_type import LocateBy
 from page.common.base_page import BasePage
 
 
@@ -19,6 +18,8 @@ class HomePage(BasePage):
         """
         super().__init__(driver)
 
+    APP_PACKAGE = 'hko.MyObservatory_v1_0'
+
     # Page element locators
     DRAWER_LAYOUT = {'xpath': '//android.widget.ImageButton'}  # Drawer menu button
     expand_forcast_and_alarm = {'xpath': '//*[@resource-id="hko.MyObservatory_v1_0:id/header_layout"]'}  # Expand forecast and alarm panel
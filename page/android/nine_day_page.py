@@ -1,9 +1,7 @@
-import time
-from datetime import datetime
-
 from common.custom_logger import CustomLogger
+from page.android.forecast_table import ForecastTable, format_forecast_date, parse_forecast_date
 from page.android.home_page import HomePage
-from page.common.base_page import BasePage
+from page.common.readiness import ElementVisible, UiStable
 
 
 class NineDayPage(HomePage):
@@ -23,21 +21,39 @@ class NineDayPage(HomePage):
             driver: WebDriver instance for UI automation
         """
         super().__init__(driver)
-        self.drawer_layout = {'xpath': rf'//*[@resource-id="hko.MyObservatory_v1_0:id/drawer_layout"]'}
-        self.quote_page_xpath = {
-            'xpath': '//*[@resource-id="com.tdx.AndroidNewXN:id/main_tab"]/android.widget.LinearLayout[2]'}
-        self.update_time = {'xpath': '//*[@resource-id="hko.MyObservatory_v1_0:id/mainAppSevenDayUpdateTime"]'}
+
+    # Page element locators
+    drawer_layout = {'xpath': '//*[@resource-id="hko.MyObservatory_v1_0:id/drawer_layout"]'}
+    quote_page_xpath = {
+        'xpath': '//*[@resource-id="com.tdx.AndroidNewXN:id/main_tab"]/android.widget.LinearLayout[2]'}
+    update_time = {'xpath': '//*[@resource-id="hko.MyObservatory_v1_0:id/mainAppSevenDayUpdateTime"]'}
+    # Direct entry, configured in the Routes section
+    ENTRY_ROUTE = 'nine_day_forecast'
+
+    # Forecast row fields, resolved together against one hierarchy snapshot
+    FORECAST_FIELDS = {
+        'temp': {'id': 'hko.MyObservatory_v1_0:id/sevenday_forecast_temp'},  # Temperature
+        'rh': {'id': 'hko.MyObservatory_v1_0:id/sevenday_forecast_rh'},  # Relative humidity
+        'date': {'id': 'hko.MyObservatory_v1_0:id/sevenday_forecast_date'},  # Forecast date
+        'day_of_week': {'id': 'hko.MyObservatory_v1_0:id/sevenday_forecast_day_of_week'},  # Day of the week
+        'psr': {'id': 'hko.MyObservatory_v1_0:id/psrText'},  # Probability of significant rain
+    }
 
     def go_to_nine_page(self):
         """
         Navigate to the nine-day forecast page
 
-        Opens the drawer layout and navigates to the nine-day forecast section
+        Opens the configured entry route when there is one, otherwise (or when the
+        route does not land on the page, after restarting the app on its home screen)
+        opens the drawer layout and navigates to the nine-day forecast section
         """
         CustomLogger.print_step("Navigating to Nine-day Forecast")
+        if self.enter_by_route(ElementVisible(self.update_time)):
+            return
         self.navigate_to_drawer_layout()
         self.click(self.expand_forcast_and_alarm)
-        time.sleep(5)
+        # Wait for the expanded drawer to settle instead of sleeping
+        self.wait_until_ready(ElementVisible(self.nine_day_forcast_in_drawer_layout), UiStable(300))
         self.click(self.nine_day_forcast_in_drawer_layout)
 
     def get_nine_day_weather_day_info(self):
@@ -56,73 +72,109 @@ class NineDayPage(HomePage):
         CustomLogger.print_step("Retrieving ninth day weather information")
 
         # Scroll to the bottom to ensure all elements are visible
-        self.scroll_to_end()
-
-        # Get temperature information
-        self.temp_xpath = {'xpath': '//*[@resource-id="hko.MyObservatory_v1_0:id/sevenday_forecast_temp"]'}
-        temp_list = self.find_element(self.temp_xpath).all()
-        nine_day_temp = temp_list[-1].text if temp_list is not None else None
-
-        # Get humidity information
-        self.rh_xpath = {
-            'xpath': '//*[@resource-id="hko.MyObservatory_v1_0:id/sevenday_forecast_rh"]'}
-        rh_list = self.find_element(self.rh_xpath).all()
-        nine_day_rh = rh_list[-1].text if rh_list is not None else None
-
-        # Get date information
-        self.date_xpath = {
-            'xpath': '//*[@resource-id="hko.MyObservatory_v1_0:id/sevenday_forecast_date"]'}
-        date_list = self.find_element(self.date_xpath).all()
-        nine_day_date = date_list[-1].text if date_list is not None else None
-
-        # Get day of week information
-        self.day_of_week_xpath = {
-            'xpath': '//*[@resource-id="hko.MyObservatory_v1_0:id/sevenday_forecast_day_of_week"]'}
-        day_of_week_list = self.find_element(self.day_of_week_xpath).all()
-        nine_day_week_date = day_of_week_list[-1].text if day_of_week_list is not None else None
-
-        # Get UV index information
-        self.psr_xpath = {
-            'xpath': '//*[@resource-id="hko.MyObservatory_v1_0:id/psrText"]'}
-        psr_list = self.find_element(self.psr_xpath).all()
-        nine_day_psr = psr_list[-1].text if psr_list is not None else None
-
-        # Get weather description
-        self.description_xpath = {
-            'xpath': f'//android.widget.LinearLayout'}
-        weather_description = self.find_element(self.description_xpath).xpath(
-            f'//*[contains(@content-desc, "{nine_day_date}")]').all()
-        nine_day_description = weather_description[-1].info.get('contentDescription') if weather_description is not None else None
+        snapshot = self.scroll_to_end()
+
+        # Resolve every field against the final hierarchy dump
+        fields = self.locate_many(self.FORECAST_FIELDS, snapshot=snapshot)
+
+        def last_text(key):
+            nodes = fields[key]
+            return nodes[-1].text if nodes else None
+
+        nine_day_temp = last_text('temp')
+        nine_day_rh = last_text('rh')
+        nine_day_date = last_text('date')
+        nine_day_week_date = last_text('day_of_week')
+        nine_day_psr = last_text('psr')
+
+        # Get weather description from the row whose content description mentions the date
+        weather_description = snapshot.xpath(
+            f'//*[contains(@content-desc, "{nine_day_date}")]') if nine_day_date else []
+        nine_day_description = weather_description[-1].info.get('contentDescription') if weather_description else None
 
         return nine_day_temp, nine_day_rh, nine_day_date, nine_day_week_date, nine_day_psr, nine_day_description
 
+    def get_all_days(self):
+        """
+        Retrieve every forecast row in a single pass down the list
+
+        Rows are read from each snapshot taken while scrolling, so no extra hierarchy
+        dumps are needed; rows seen at several scroll positions are kept once.
+
+        Returns:
+            ForecastTable: One row per forecast day, in list order
+        """
+        CustomLogger.print_step("Retrieving all forecast days")
+        table = ForecastTable()
+        update_date = None
+
+        def collect(snapshot):
+            nonlocal update_date
+            if update_date is None:
+                update_text = snapshot.locate(self.update_time)
+                if update_text:
+                    update_date = parse_forecast_date(update_text[0].text)
+            for date_node in snapshot.locate(self.FORECAST_FIELDS['date']):
+                self._collect_row(table, date_node, update_date)
+
+        self.scroll_until_stable('up', visit=collect)
+        CustomLogger.print_log('已获取%s天的天气预报', len(table))
+        return table
+
+    def get_day(self, forecast_date):
+        """
+        Retrieve one forecast day, scrolling only until its row is in view
+
+        Args:
+            forecast_date (datetime.date): Day to retrieve
+
+        Returns:
+            dict: ForecastTable row, or None if the day is not in the list
+        """
+        CustomLogger.print_step(f"Retrieving forecast of {format_forecast_date(forecast_date)}")
+        date_text = f'{forecast_date.month}月{forecast_date.day}日'
+        date_node = self.scroll_until(
+            {'xpath': f'//*[@resource-id="{self.FORECAST_FIELDS["date"]["id"]}" and @text="{date_text}"]'})
+        table = ForecastTable()
+        if date_node is not None:
+            self._collect_row(table, date_node, forecast_date)
+        return table.row(0) if table else None
+
+    def _collect_row(self, table, date_node, update_date):
+        """
+        Add the forecast row containing a date node to the table
+
+        Rows cut off at the edge of the list are skipped; they are read again
+        once a swipe brings them fully into view. Rows whose date or ranges cannot be
+        parsed (e.g. placeholders while the forecast loads) are skipped and logged.
+        """
+        date_text = date_node.text
+        rows = date_node.xpath(f'ancestor::*[contains(@content-desc, "{date_text}")][1]')
+        if not date_text or not rows:
+            return
+        row = rows[0]
+        values = {}
+        for key in ('day_of_week', 'temp', 'rh', 'psr'):
+            nodes = row.xpath(f'.//*[@resource-id="{self.FORECAST_FIELDS[key]["id"]}"]')
+            if not nodes:
+                return
+            values[key] = nodes[0].text
+        try:
+            table.add(parse_forecast_date(date_text, after=update_date), values['day_of_week'], values['temp'],
+                      values['rh'], values['psr'], row.info.get('contentDescription'))
+        except Exception as e:
+            CustomLogger.print_log('跳过无法解析的预报行%s: %s', date_text, e)
+
     def scroll_to_end(self):
         """
         Scroll to the bottom of the page
 
-        Uses screen hierarchy comparison to determine when the bottom is reached.
-        Implements smooth scrolling using relative screen dimensions.
-        """
-        while True:
-            # Get page layout before scrolling
-            before_scroll = self.driver.driver.dump_hierarchy()
-            width, height = self.driver.driver.window_size()
-            
-            # Perform scroll action
-            self.swipe(
-                start_x=0.5 * width, 
-                start_y=0.8 * height,
-                end_x=0.5 * width, 
-                end_y=0.5 * height, 
-                duration=0.1
-            )
-            
-            # Get page layout after scrolling
-            after_scroll = self.driver.driver.dump_hierarchy()
-            
-            # Check if bottom is reached
-            if before_scroll == after_scroll:
-                break
+        Swipes until two consecutive screens have the same structural fingerprint.
+
+        Returns:
+            UiSnapshot: Snapshot of the bottom of the page
+        """
+        return self.scroll_until_stable('up')
 
     def get_update_date(self):
         """
@@ -131,12 +183,5 @@ class NineDayPage(HomePage):
         Returns:
             str: Formatted date string in "MM月DD日" format
         """
-        update_time = self.find_element(self.update_time).text
-        date_part = update_time.split(":")[1].strip()
-        
-        # Convert date string to datetime object
-        date_obj = datetime.strptime(date_part, "%Y年%m月%d日%H时%M分")
-        
-        # Format date as required
-        formatted_date = date_obj.strftime("%m月%d日")
-        return formatted_date
+        update_time = self.find_element(self.update_time).get_text()
+        return format_forecast_date(parse_forecast_date(update_time))
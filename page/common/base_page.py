@@ -1,12 +1,28 @@
-import os
-import time
-from datetime import datetime
 from pathlib import Path
 
-import aircv as ac
-
 from common.custom_logger import CustomLogger
+from common.image_matcher import ImageMatcher
 from common.locate_type import LocateBy
+from common.screenshot_writer import ScreenshotWriter
+from common.tracer import traced
+from common.waiter import Waiter
+from page.common.element_cache import ElementCache
+from page.common.entry_route import EntryRoute
+from page.common.locator import compile_class_locators, compile_locator
+from page.common.readiness import AppInForeground, UiStable, wait_until_ready
+from page.common.ui_snapshot import UiSnapshot
+
+
+def describe_locator(args):
+    """
+    span attributes of a page action whose first argument is a locator
+    :param args: call arguments without self
+    :return: dict
+    """
+    if args and isinstance(args[0], dict):
+        locator = compile_locator(args[0])
+        return {'locator': f'{locator.method}={locator.value}', 'strategy': locator.strategy}
+    return {}
 
 
 class BasePage:
@@ -14,10 +30,52 @@ class BasePage:
     基础页面类，包含常用的Appium操作方法，支持Android和iOS
     """
 
+    # relative (start_x, start_y, end_x, end_y) of the finger for each swipe direction
+    SWIPE_VECTORS = {
+        'up': (0.5, 0.8, 0.5, 0.5),
+        'down': (0.5, 0.5, 0.5, 0.8),
+        'left': (0.8, 0.5, 0.5, 0.5),
+        'right': (0.5, 0.5, 0.8, 0.5),
+    }
+    # name of the page's entry in the Routes config section, None for pages reached only through the UI
+    ENTRY_ROUTE = None
+    # app the page belongs to, restarted when an entry route opens a screen the UI navigation cannot start from
+    APP_PACKAGE = None
+    # scroll_until: swipe length as a fraction of the screen, fast swipes fling the list further
+    SCROLL_MAX_SCALE = 0.6
+    SCROLL_MIN_SCALE = 0.15
+    SCROLL_FAST_DURATION = 0.05
+    SCROLL_SLOW_DURATION = 0.3
+    # targets whose center is this close to the edge the list scrolls in from get a corrective swipe
+    SCROLL_EDGE = 0.1
+
     def __init__(self, driver):
         self.driver = driver
         self.operation_count = 0
+        self._window_size = None
+        self.waiter = Waiter.default()
+        # page objects wrapping another page object share its element cache
+        self.element_cache = driver.element_cache if isinstance(driver, BasePage) else ElementCache()
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        compile the locator dicts declared on page classes once, at class definition time
+        """
+        super().__init_subclass__(**kwargs)
+        compile_class_locators(cls)
+
+    @property
+    def device(self):
+        """
+        the underlying uiautomator2 device; page objects may be built on top of another page object
+        :return: device
+        """
+        driver = self.driver
+        while isinstance(driver, BasePage):
+            driver = driver.driver
+        return driver
 
+    @traced()
     def start_app(self, package, wait=True):
         """
         start app
@@ -25,109 +83,168 @@ class BasePage:
         :param wait: if wait app start
         :return:
         """
+        self.invalidate()
         self.driver.app_start(package, wait=wait)
 
+    @traced()
     def stop_app(self, package):
         """
         stop app
         :param package: package code to stop
         :return:
         """
+        self.invalidate()
         self.driver.app_stop(package)
 
+    @traced()
+    def restart_app(self, package=None, timeout=None):
+        """
+        stop and start the app, so it is back on its launch screen
+        :param package: package code to restart, None for APP_PACKAGE
+        :param timeout: readiness timeout(s), None for the configured default
+        :return:
+        """
+        package = package or self.APP_PACKAGE
+        self.invalidate()
+        self.device.app_start(package, stop=True, wait=True)
+        self.wait_until_ready(AppInForeground(package), UiStable(300), timeout=timeout)
+
+    @traced()
     def click_home(self):
         """
         click home button
         :return:
         """
+        self.invalidate()
         self.driver.press("home")
 
-    def find_element_by_xpath(self, xpath, timeout=5):
+    def find_element_by_xpath(self, xpath, timeout=None):
         """
         通过xpath定位元素
         :param xpath: xpath表达式
+        :param timeout: 超时时间，None使用配置的默认值
         :return: 元素对象
         """
-        end_time = time.time() + timeout
-        while time.time() < end_time:
-            try:
-                return self.driver.driver.xpath(xpath)
-            except Exception:
-                time.sleep(0.1)  # 每次重试间隔0.1秒
+        selector = self.device.xpath(xpath)
+        if self.waiter.until(lambda: selector.exists, timeout, LocateBy.XPATH.value):
+            return selector
         # 超时后抛出异常
-        raise Exception(f"在 {timeout} 秒内通过xpath定位元素失败: {xpath}")
+        raise Exception(f"在 {timeout or self.waiter.timeout_for(LocateBy.XPATH.value)} 秒内通过xpath定位元素失败: {xpath}")
 
-    def find_element_by_id(self, resource_id, timeout=5):
+    def find_element_by_selector(self, selector, timeout=None, kind='default'):
         """
-        通过id定位元素（Android使用resource-id，iOS使用accessibility id）
-        :param resource_id: 元素id
-        :param timeout: 超时时间
+        通过原生UiSelector定位元素
+        :param selector: UiSelector参数, 例如 {'resourceId': ...}
+        :param timeout: 超时时间，None使用配置的默认值
+        :param kind: 定位方式，用于选择默认超时时间
         :return: 元素对象
         """
-        try:
-            # Android使用resource-id
-            element = self.driver.find_element_by_id(resource_id)
-            if not element:
-                # iOS尝试使用accessibility id
-                element = self.driver.find_element_by_accessibility_id(resource_id)
+        element = self.device(**selector)
+        if self.waiter.until(lambda: element.exists, timeout, kind):
             return element
-        except Exception as e:
-            CustomLogger.print_log(f"通过id定位元素失败: {e}")
-            return None
+        CustomLogger.print_log("通过UiSelector定位元素失败: %s", selector)
+        return None
 
-    def find_element_by_text(self, class_name, text, index, timeout=5):
-        """
-        get element class name and text
-        :param class_name: class name of element
-        :param text: element text
-        :param index: index
-        :return: element
-        """
-        self.driver(className=class_name, text=text).wait(timeout=timeout)
-        return self.driver(className=class_name, text=text)[index]
-
-    def find_element_by_text_contains(self, class_name, text_contains, index, timeout=5):
-        """
-        get element class name and contains text
-        :param class_name: class name of element
-        :param text_contains: matched text
-        :param index: index
-        :return: element
-        """
-        self.driver(className=class_name, textContains=text_contains).wait(timeout=timeout)
-        return self.driver(className=class_name, textContains=text_contains)[index]
-
-    def find_element(self, locator, timeout=5):
+    @traced(describe=describe_locator)
+    def find_element(self, locator, timeout=None):
         """
         统一的元素定位方法
         :param locator: 定位器字典，格式为 {定位方式: 定位值}
-        :param timeout: 超时时间
+        :param timeout: 超时时间，None使用配置的默认值
         :return: 元素对象
         """
-        (locate_method, locate_value), = locator.items()
+        locator = compile_locator(locator)
+        element = self.element_cache.get(locator)
+        if element is not None:
+            return element
+        locate_method, locate_value = locator.method, locator.value
         try:
-            if locate_method == LocateBy.ID.value:
-                element = self.find_element_by_id(locate_value, timeout)
+            if locator.native:
+                # id, text, text_contains, accessibility_id and simple xpaths, compiled to a native selector
+                element = self.find_element_by_selector(locator.native, timeout, locate_method)
             elif locate_method == LocateBy.XPATH.value:
                 element = self.find_element_by_xpath(locate_value, timeout)
             elif locate_method == LocateBy.IOS_PREDICATE.value:
                 element = self.driver.find_element_by_ios_predicate(locate_value)
             elif locate_method == LocateBy.IOS_CLASS_CHAIN.value:
                 element = self.driver.find_element_by_ios_class_chain(locate_value)
-            elif locate_method == LocateBy.ACCESSIBILITY_ID.value:
-                element = self.driver.find_element_by_accessibility_id(locate_value)
-            elif locate_method == LocateBy.TEXT.value:
-                element = self.find_element_by_text(locate_value[0], locate_value[1], 0, timeout)
-            elif locate_method == LocateBy.TEXT_CONTAINS.value:
-                element = self.find_element_by_text_contains(locate_value[0], locate_value[1], 0, timeout)
             else:
                 raise Exception("不支持的定位方法")
 
+            if element is not None:
+                self.element_cache.put(locator, element)
             return element
         except Exception as e:
-            CustomLogger.print_log(f"元素定位失败: {e}")
+            CustomLogger.print_log("元素定位失败: %s", e)
             return None
 
+    @traced()
+    def snapshot(self) -> UiSnapshot:
+        """
+        dump the ui hierarchy once and parse it on the host
+        :return: UiSnapshot
+        """
+        return UiSnapshot(self.device.dump_hierarchy())
+
+    @traced()
+    def locate_many(self, locators, snapshot=None):
+        """
+        resolve a dict of locators against one hierarchy snapshot (one device call for all keys)
+        :param locators: {key: locator dict}
+        :param snapshot: reuse an existing snapshot instead of dumping a new one
+        :return: {key: list of all matched nodes}
+        """
+        if snapshot is None:
+            snapshot = self.snapshot()
+        return snapshot.locate_many(locators)
+
+    @traced()
+    def wait_until_ready(self, *conditions, timeout=None):
+        """
+        wait for readiness conditions instead of sleeping, e.g. AppInForeground, ElementVisible, UiStable
+        :param conditions: page.common.readiness conditions, checked in order
+        :param timeout: total timeout(s), None for the configured default
+        :return: readiness latency(s)
+        """
+        return wait_until_ready(self.device, *conditions, timeout=timeout, waiter=self.waiter)
+
+    @traced()
+    def enter_by_route(self, *conditions, timeout=None):
+        """
+        open the page through its direct entry route (ENTRY_ROUTE in the Routes config) and verify the landing
+        :param conditions: readiness conditions that hold once the page is shown
+        :param timeout: readiness timeout(s), None for the configured 'route' timeout
+        :return: True if the page was reached, False if it has to be reached through the UI
+        """
+        if not self.ENTRY_ROUTE or self.ENTRY_ROUTE in EntryRoute.failed:
+            return False
+        route = None
+        launched = False
+        try:
+            # a malformed route config falls back to the UI like a route that does not land
+            route = EntryRoute.from_config(self.ENTRY_ROUTE)
+            if route is None:
+                return False
+            if timeout is None:
+                timeout = self.waiter.timeout_for('route')
+            self.invalidate()
+            launched = True
+            route.launch(self.device)
+            self.wait_until_ready(*conditions, timeout=timeout)
+        except Exception as e:
+            EntryRoute.failed.add(self.ENTRY_ROUTE)
+            CustomLogger.print_log('入口路由%s不可用，改用界面导航: %s', route or self.ENTRY_ROUTE, e)
+            package = (route.package or self.APP_PACKAGE) if launched else None
+            if package:
+                # the route may have opened any screen, the UI navigation starts from the launch screen
+                self.restart_app(package)
+            return False
+        finally:
+            self.invalidate()
+        CustomLogger.print_log('已通过入口路由%s打开页面', route)
+        return True
+
+    @traced(describe=describe_locator)
     def click(self, locator):
         """
         点击元素
@@ -137,8 +254,10 @@ class BasePage:
         if element:
             self.operation_count_print()
             CustomLogger.print_log('正在点击元素')
+            self.invalidate()
             element.click()
 
+    @traced(describe=describe_locator)
     def long_click(self, locator, duration=3):
         """
         long click element
@@ -149,9 +268,11 @@ class BasePage:
         element = self.find_element(locator)
         if element:
             self.operation_count_print()
-            CustomLogger.print_log(f'正在进行元素长按')
+            CustomLogger.print_log('正在进行元素长按')
+            self.invalidate()
             element.long_click(duration)
 
+    @traced()
     def swipe_by_screen(self, direction):
         """
         swipe screen
@@ -161,8 +282,154 @@ class BasePage:
         if direction not in ['left', 'right', 'up', 'down']:
             raise Exception("Error direction, please input on of 'left', 'right', 'up', 'down'")
         self.operation_count_print()
+        self.invalidate()
         self.driver.swipe_ext(direction)
 
+    def window_size(self):
+        """
+        get screen size, queried from the device only once per page object
+        :return: (width, height)
+        """
+        if self._window_size is None:
+            self._window_size = self.device.window_size()
+        return self._window_size
+
+    def swipe_in_direction(self, direction, duration=0.1):
+        """
+        swipe with relative screen coordinates using the cached window size
+        :param direction: direction，including ['left', 'right', 'up', 'down']
+        :param duration: swipe duration
+        :return:
+        """
+        if direction not in self.SWIPE_VECTORS:
+            raise Exception("Error direction, please input on of 'left', 'right', 'up', 'down'")
+        width, height = self.window_size()
+        start_x, start_y, end_x, end_y = self.SWIPE_VECTORS[direction]
+        self.swipe(start_x * width, start_y * height, end_x * width, end_y * height, duration=duration)
+
+    def swipe_by_distance(self, direction, distance, duration=0.1):
+        """
+        swipe through the middle of the screen by a given number of pixels
+        :param direction: direction，including ['left', 'right', 'up', 'down']
+        :param distance: finger travel(px), capped at 90% of the screen
+        :param duration: swipe duration
+        :return:
+        """
+        if direction not in self.SWIPE_VECTORS:
+            raise Exception("Error direction, please input on of 'left', 'right', 'up', 'down'")
+        width, height = self.window_size()
+        start_x, start_y, end_x, end_y = self.SWIPE_VECTORS[direction]
+        step_x, step_y = (end_x > start_x) - (end_x < start_x), (end_y > start_y) - (end_y < start_y)
+        half = min(distance, 0.9 * (height if step_y else width)) / 2
+        self.swipe(width / 2 - step_x * half, height / 2 - step_y * half,
+                   width / 2 + step_x * half, height / 2 + step_y * half, duration=duration)
+
+    def _edge_correction(self, node, direction):
+        """
+        distance of a corrective swipe bringing a node found at the incoming edge to the middle of the screen
+        :param node: SnapshotNode
+        :param direction: scroll direction
+        :return: distance(px), 0 if the node is well inside the screen
+        """
+        width, height = self.window_size()
+        vertical = direction in ('up', 'down')
+        length = height if vertical else width
+        center = node.center()[1 if vertical else 0]
+        # swiping up/left brings content in from the bottom/right edge
+        if direction in ('up', 'left'):
+            return center - length / 2 if center > (1 - self.SCROLL_EDGE) * length else 0
+        return length / 2 - center if center < self.SCROLL_EDGE * length else 0
+
+    @traced(describe=describe_locator)
+    def scroll_until(self, locator, direction='up', max_swipes=20, snapshot=None):
+        """
+        swipe until the locator matches in the post-swipe snapshot, with one hierarchy dump per swipe.
+        The swipe length adapts: long fast flings first; when the measured scroll shows the list
+        moved further than the finger, later swipes are slow (no fling) and then shorter; when a
+        fling lost sight of the previous screen, the skipped part is searched backwards.
+        A target found at the incoming edge of the screen gets one short corrective swipe.
+        :param locator: locator dict of the target
+        :param direction: direction，including ['left', 'right', 'up', 'down']
+        :param max_swipes: upper bound on swipes
+        :param snapshot: snapshot of the current screen if the caller already has one
+        :return: SnapshotNode of the target, None if the end of the list was reached without it
+        """
+        if direction not in self.SWIPE_VECTORS:
+            raise Exception("Error direction, please input on of 'left', 'right', 'up', 'down'")
+        reverse = {'up': 'down', 'down': 'up', 'left': 'right', 'right': 'left'}[direction]
+        vertical = direction in ('up', 'down')
+        length = self.window_size()[1 if vertical else 0]
+        scale, duration = self.SCROLL_MAX_SCALE, self.SCROLL_FAST_DURATION
+        current = snapshot if snapshot is not None else self.snapshot()
+        # while backing off: the last screen seen before a fling skipped past it
+        lost = None
+        corrected = False
+        for swipes in range(max_swipes + 1):
+            nodes = current.locate(locator)
+            if nodes:
+                correction = 0 if corrected else self._edge_correction(nodes[0], direction)
+                if not correction or swipes == max_swipes:
+                    return nodes[0]
+                self.swipe_by_distance(direction, correction, duration=self.SCROLL_SLOW_DURATION)
+                current = self.snapshot()
+                corrected = True
+                continue
+            if swipes == max_swipes:
+                break
+            distance = scale * length
+            self.swipe_by_distance(reverse if lost is not None else direction, distance, duration=duration)
+            after = self.snapshot()
+            if lost is not None:
+                if after.scroll_offset(lost, vertical) is not None:
+                    # the skipped part has been searched, carry on forwards with the slower swipes
+                    lost = None
+            elif after.fingerprint == current.fingerprint:
+                CustomLogger.print_log('已滑动到底部，未找到元素: %s', locator)
+                return None
+            else:
+                moved = after.scroll_offset(current, vertical)
+                overshoot = moved is None or abs(moved) > 1.5 * distance
+                if overshoot and duration != self.SCROLL_SLOW_DURATION:
+                    # the list kept moving after the finger lifted: slow swipes move it by the finger travel
+                    duration = self.SCROLL_SLOW_DURATION
+                elif overshoot:
+                    scale = max(scale / 2, self.SCROLL_MIN_SCALE)
+                if moved is None:
+                    CustomLogger.print_log('滑动超出一屏，回退查找')
+                    lost = current
+            current = after
+        CustomLogger.print_log('已达到最大滑动次数%s，未找到元素: %s', max_swipes, locator)
+        return None
+
+    @traced()
+    def scroll_until_stable(self, direction='up', max_swipes=20, duration=0.1, snapshot=None,
+                            visit=None) -> UiSnapshot:
+        """
+        keep swiping until the screen stops changing, i.e. the end of a list is reached.
+        Each swipe costs a single hierarchy dump: the post-swipe snapshot is reused as the
+        pre-swipe snapshot of the next round and screens are compared by fingerprint.
+        :param direction: direction，including ['left', 'right', 'up', 'down']
+        :param max_swipes: upper bound on swipes, guards against endlessly changing content
+        :param duration: swipe duration
+        :param snapshot: snapshot of the current screen if the caller already has one
+        :param visit: optional callable receiving every distinct snapshot, the first one included
+        :return: snapshot of the final screen
+        """
+        before = snapshot if snapshot is not None else self.snapshot()
+        if visit:
+            visit(before)
+        for _ in range(max_swipes):
+            self.swipe_in_direction(direction, duration=duration)
+            after = self.snapshot()
+            if after.fingerprint == before.fingerprint:
+                return after
+            if visit:
+                visit(after)
+            before = after
+        CustomLogger.print_log('已达到最大滑动次数%s，停止滑动', max_swipes)
+        return before
+
+    @traced(describe=describe_locator)
     def send_keys(self, locator, text):
         """
         输入文本
@@ -172,10 +439,12 @@ class BasePage:
         element = self.find_element(locator)
         if element:
             self.operation_count_print()
-            CustomLogger.print_log(f'输入文本: {text}')
+            CustomLogger.print_log('输入文本: %s', text)
+            self.invalidate()
             element.clear()
             element.send_keys(text)
 
+    @traced(describe=describe_locator)
     def clear_text(self, locator, index=0):
         """
         clear text
@@ -186,8 +455,10 @@ class BasePage:
         element = self.find_element(locator, index)
         if element:
             self.operation_count_print()
+            self.invalidate()
             element.clear_text()
 
+    @traced(describe=describe_locator)
     def get_text(self, locator, index=0):
         """
         get element text
@@ -198,71 +469,93 @@ class BasePage:
         element = self.find_element(locator, index)
         if element:
             self.operation_count_print()
-            element.get_text()
+            return element.get_text()
 
-    def element_screenshot(self, locator=None, index=0) -> Path:
+    @traced(describe=describe_locator)
+    def element_screenshot(self, locator=None, index=0, wait=False) -> Path:
         """
-        get screenshot
+        get screenshot; encoding and saving run in the background unless wait is True
         :param locator: locator dict
         :param index: index
+        :param wait: block until the file is written
         :return: image filepath
         """
-        image_path = Path(__file__).parents[1]
-        pic_time = datetime.now().strftime("%Y%m%d%H%M%S")
-        screen_image_name = image_path / 'image' / ("screen_img_" + pic_time + ".png")
-        if not os.path.exists(image_path):
-            os.makedirs(image_path)
+        writer = ScreenshotWriter.default()
+        screen_image_name = writer.path_for()
         self.operation_count_print()
-        CustomLogger.print_log(f'截图并保存到{screen_image_name}')
+        CustomLogger.print_log('截图并保存到%s', screen_image_name)
         if locator:
-            self.find_element(locator, index).screenshot().save(screen_image_name)
+            image = self.find_element(locator, index).screenshot()
         else:
-            self.driver.screenshot().save(screen_image_name)
+            image = self.device.screenshot()
+        _, future = writer.submit(image, screen_image_name)
+        if wait:
+            future.result()
         return screen_image_name
 
-    def is_exist(self, locator, timeout=1):
+    @traced(describe=describe_locator)
+    def is_exist(self, locator, timeout=None):
         """
         if element exists
         :param locator: locator dict
-        :param timeout: timeout(s)
-        :param index: index
+        :param timeout: timeout(s), None for the configured default
         :return: if element exists
         """
-        (locate_method, locate_value), = locator.items()
-        if locate_method == LocateBy.ID.value:
-            return self.driver(resourceId=locate_value).wait(timeout=timeout)
-        elif locate_method == LocateBy.XPATH.value:
-            a = self.driver.xpath(locate_value).wait(timeout=timeout)
-            return True if self.driver.xpath(locate_value).wait(timeout=timeout) else False
-        elif locate_method == LocateBy.TEXT.value:
-            return self.driver(className=locate_value[0], text=locate_value[1]).wait(timeout=timeout)
-        elif locate_method == LocateBy.TEXT_CONTAINS.value:
-            return self.driver(className=locate_value[0], textContains=locate_value[1]).wait(timeout=timeout)
+        locator = compile_locator(locator)
+        if locator.native:
+            selector = self.device(**locator.native)
+        elif locator.method == LocateBy.XPATH.value:
+            selector = self.device.xpath(locator.value)
         else:
             raise Exception("locate method not supported")
+        return bool(self.waiter.until(lambda: selector.exists, timeout, 'exist'))
 
-    def click_image(self, image_name=None, threshold=0.9):
+    @traced()
+    def click_image(self, image_name=None, threshold=0.9, timeout=None, region=None, region_px=None):
         """
-        click image based on aircv
+        click image based on template matching
         :param image_name: target image to identify
         :param threshold: threshold to identify
-        :return: str
+        :param timeout: timeout(s), None for the configured default
+        :param region: only search this part of the screen, (left, top, right, bottom) as fractions of the screen
+        :param region_px: only search this part of the screen, (left, top, right, bottom) in pixels
+        :return: (x, y) clicked, None if the image was not found
         """
-        target_img = ac.imread(image_name)
-        for i in range(2):
+        matcher = ImageMatcher.default()
+
+        def match_on_screen():
             # current screen
-            screen_image = self.driver.screenshot(format='opencv')
-            position = ac.find_template(screen_image, target_img, threshold)
-            if position and 'result' in position:
-                x, y = position['result']
-                self.operation_count_print()
-                self.driver.click(x, y)
-                self.operation_count_print()
-                CustomLogger.print_log("点击了目标图像")
-                return x, y
-            else:
-                CustomLogger.print_log("未找到目标图像")
-                time.sleep(1)
+            screen_image = self.device.screenshot(format='opencv')
+            return matcher.find(screen_image, image_name, threshold, region, region_px)
+
+        result = self.waiter.until(match_on_screen, timeout, 'image')
+        if result:
+            self.operation_count_print()
+            self.invalidate()
+            self.device.click(result.x, result.y)
+            CustomLogger.print_log("点击了目标图像")
+            return result.x, result.y
+        CustomLogger.print_log("未找到目标图像")
+
+    @traced()
+    def find_images(self, image_names, threshold=0.9, region=None, region_px=None):
+        """
+        locate several images with a single screenshot
+        :param image_names: target images to identify
+        :param threshold: threshold to identify
+        :param region: only search this part of the screen, (left, top, right, bottom) as fractions of the screen
+        :param region_px: only search this part of the screen, (left, top, right, bottom) in pixels
+        :return: {image name: MatchResult or None}
+        """
+        screen_image = self.device.screenshot(format='opencv')
+        return ImageMatcher.default().find_all(screen_image, image_names, threshold, region, region_px)
+
+    def invalidate(self):
+        """
+        mark the ui hierarchy as changed so cached elements are located again
+        :return:
+        """
+        self.element_cache.invalidate()
 
     def operation_count_print(self):
         """
@@ -270,12 +563,13 @@ class BasePage:
         :return:
         """
         self.operation_count += 1
-        CustomLogger.print_log(f'正在进行第{self.operation_count}次元素点击|输入|信息获取')
+        CustomLogger.print_log('正在进行第%s次元素点击|输入|信息获取', self.operation_count)
 
     def reset_operation_count(self):
-        CustomLogger.print_debug(f'重置操作计数')
+        CustomLogger.print_debug('重置操作计数')
         self.operation_count += 0
 
+    @traced()
     def swipe(self, start_x, start_y, end_x, end_y, duration=None):
         """
         滑动操作
@@ -286,4 +580,5 @@ class BasePage:
         :param duration: 持续时间（毫秒）
         """
         self.operation_count_print()
+        self.invalidate()
         self.driver.swipe(start_x, start_y, end_x, end_y, duration)
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+
+class ElementCache:
+    """
+    Cache of located elements keyed by locator and hierarchy version.
+
+    Every mutating action (click, swipe, send_keys, app start/stop ...) bumps the
+    version through ``invalidate()``, so an entry is only served while the screen it
+    was found on is unchanged. Page objects built on top of each other share one cache.
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    @staticmethod
+    def key(locator):
+        return locator.method, locator.value
+
+    def get(self, locator):
+        """
+        get cached element located on the current hierarchy version
+        :param locator: compiled Locator
+        :return: element or None
+        """
+        entry = self._items.get(self.key(locator))
+        if entry is None or entry[0] != self.version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, locator, element):
+        """
+        cache an element for the current hierarchy version
+        :param locator: compiled Locator
+        :param element: located element
+        :return:
+        """
+        key = self.key(locator)
+        self._items[key] = (self.version, element)
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def invalidate(self):
+        """
+        the screen may have changed: bump the hierarchy version and drop all entries
+        :return:
+        """
+        self.version += 1
+        self._items.clear()
@@ -0,0 +1,67 @@
+from common.automation_config import AutomationConfig
+
+
+class EntryRoute:
+    """
+    Direct way into a page, skipping the UI navigation that normally leads to it.
+
+    Either an activity started with ``app_start`` or a deep-link uri opened with an
+    ``android.intent.action.VIEW`` intent. Routes depend on the app version, so they are
+    not hard coded: they are read from the ``Routes`` section of ``automation_local.yaml``,
+    keyed by the ``ENTRY_ROUTE`` name a page class declares::
+
+        Routes:
+          nine_day_forecast:
+            package: hko.MyObservatory_v1_0
+            uri: <deep link of the page>
+    """
+
+    _routes = None
+    # names of routes that failed once; they are not tried again in this process
+    failed = set()
+
+    def __init__(self, name, package=None, activity=None, uri=None):
+        """
+        :param name: route name
+        :param package: app package, required for activities
+        :param activity: activity to start, e.g. '.NineDayForecastActivity'
+        :param uri: deep-link uri, used instead of the activity when both are given
+        """
+        if not uri and not (package and activity):
+            raise Exception(f'入口路由{name}需要配置uri，或package和activity')
+        self.name = name
+        self.package = package
+        self.activity = activity
+        self.uri = uri
+
+    @classmethod
+    def from_config(cls, name):
+        """
+        get a route from the Routes config section
+        :param name: route name
+        :return: EntryRoute or None if the route is not configured
+        """
+        if cls._routes is None:
+            cls._routes = dict(AutomationConfig().config.get('Routes') or {})
+        route = cls._routes.get(name)
+        return cls(name, **dict(route)) if route else None
+
+    def launch(self, device):
+        """
+        open the route on the device; landing on the page is checked by the caller
+        :param device: uiautomator2 device
+        :return:
+        """
+        if not self.uri:
+            device.app_start(self.package, self.activity, wait=True)
+            return
+        command = ['am', 'start', '-W', '-a', 'android.intent.action.VIEW', '-d', self.uri]
+        if self.package:
+            command += ['-p', self.package]
+        result = device.shell(command)
+        output = getattr(result, 'output', result) or ''
+        if getattr(result, 'exit_code', 0) or 'Error' in output:
+            raise Exception(f'深链接打开失败: {output.strip()}')
+
+    def __str__(self):
+        return self.uri or f'{self.package}/{self.activity}'
@@ -0,0 +1,168 @@
+import argparse
+import importlib
+import inspect
+import pkgutil
+import re
+import sys
+from functools import lru_cache
+
+from common.locate_type import LocateBy
+
+_QUOTED = r'''(?P<quote>["'])(?P<value>[^"']+)(?P=quote)'''
+_CLASS = r'(?P<class_name>[A-Za-z_][\w.$-]*)'
+
+# simple xpath shapes that have an exact native UiSelector equivalent
+XPATH_REWRITES = [
+    (re.compile(rf'^//\*\[@resource-id={_QUOTED}\]$'), lambda m: {'resourceId': m['value']}),
+    (re.compile(rf'^//{_CLASS}\[@resource-id={_QUOTED}\]$'),
+     lambda m: {'className': m['class_name'], 'resourceId': m['value']}),
+    (re.compile(rf'^//\*\[@text={_QUOTED}\]$'), lambda m: {'text': m['value']}),
+    (re.compile(rf'^//\*\[contains\(@text,\s*{_QUOTED}\)\]$'), lambda m: {'textContains': m['value']}),
+    (re.compile(rf'^//\*\[@content-desc={_QUOTED}\]$'), lambda m: {'description': m['value']}),
+    (re.compile(rf'^//\*\[contains\(@content-desc,\s*{_QUOTED}\)\]$'), lambda m: {'descriptionContains': m['value']}),
+    (re.compile(rf'^//{_CLASS}$'), lambda m: {'className': m['class_name']}),
+]
+
+# locate methods that always map to a native selector
+NATIVE_METHODS = {
+    LocateBy.ID.value: lambda value: {'resourceId': value},
+    LocateBy.TEXT.value: lambda value: {'className': value[0], 'text': value[1]},
+    LocateBy.TEXT_CONTAINS.value: lambda value: {'className': value[0], 'textContains': value[1]},
+    LocateBy.ACCESSIBILITY_ID.value: lambda value: {'description': value},
+}
+
+
+class Locator(dict):
+    """
+    A precompiled ``{locate method: locate value}`` locator.
+
+    Still a one-item dict, so everything that unpacks ``locator.items()`` keeps working,
+    but it also carries the strategy picked at compile time:
+
+    - ``native``: UiSelector kwargs (e.g. ``{'resourceId': ...}``) or None
+    - ``strategy``: 'native', 'xpath' (host-side xpath, slow) or the platform locate method
+    - ``reason``: why a locator stays on the slow path
+    """
+
+    __slots__ = ('method', 'value', 'native', 'strategy', 'reason')
+
+    def __init__(self, method, value, native=None, strategy=None, reason=''):
+        super().__init__({method: value})
+        self.method = method
+        self.value = value
+        self.native = native
+        self.strategy = strategy or ('native' if native else method)
+        self.reason = reason
+
+    @property
+    def is_slow(self):
+        return self.strategy == LocateBy.XPATH.value
+
+    def __repr__(self):
+        return f"Locator({self.method}={self.value!r}, strategy={self.strategy})"
+
+
+def compile_locator(locator):
+    """
+    compile a locator dict into a Locator, rewriting simple xpaths to native selectors
+    :param locator: locator dict or Locator
+    :return: Locator
+    """
+    if isinstance(locator, Locator):
+        return locator
+    (locate_method, locate_value), = locator.items()
+    if isinstance(locate_value, list):
+        locate_value = tuple(locate_value)
+    return _compile(locate_method, locate_value)
+
+
+@lru_cache(maxsize=1024)
+def _compile(locate_method, locate_value):
+    if locate_method in NATIVE_METHODS:
+        return Locator(locate_method, locate_value, native=NATIVE_METHODS[locate_method](locate_value))
+    if locate_method != LocateBy.XPATH.value:
+        return Locator(locate_method, locate_value)
+    expression = locate_value.strip()
+    for pattern, to_native in XPATH_REWRITES:
+        match = pattern.match(expression)
+        if match:
+            return Locator(locate_method, locate_value, native=to_native(match))
+    if expression.startswith('/hierarchy') or (expression.startswith('/') and not expression.startswith('//')):
+        reason = f'absolute xpath with {expression.count("/") - 1} steps'
+    else:
+        reason = 'xpath has no native equivalent'
+    return Locator(locate_method, locate_value, reason=reason)
+
+
+def is_locator(value):
+    """
+    if value looks like a locator dict: a single item keyed by a LocateBy value
+    :param value: any object
+    :return: bool
+    """
+    if not isinstance(value, dict) or len(value) != 1:
+        return False
+    locate_method = next(iter(value))
+    return locate_method in {locate_by.value for locate_by in LocateBy}
+
+
+def compile_class_locators(cls):
+    """
+    replace locator dicts (and dicts of locator dicts) defined on a page class with Locators
+    :param cls: page class
+    :return:
+    """
+    for name, value in list(vars(cls).items()):
+        if is_locator(value):
+            setattr(cls, name, compile_locator(value))
+        elif isinstance(value, dict) and value and all(is_locator(item) for item in value.values()):
+            setattr(cls, name, {key: compile_locator(item) for key, item in value.items()})
+
+
+def iter_page_locators(package='page'):
+    """
+    import every module of a page package and yield the compiled locators of its page classes;
+    locators are recognised by shape, so this also works when this file runs as __main__ and the
+    page classes were compiled with the Locator class of the imported module
+    :param package: package name
+    :return: generator of (qualified name, Locator)
+    """
+    root = importlib.import_module(package)
+    for module_info in pkgutil.walk_packages(root.__path__, prefix=f'{package}.'):
+        module = importlib.import_module(module_info.name)
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for name, value in vars(cls).items():
+                qualified = f'{module.__name__}.{cls_name}.{name}'
+                if is_locator(value):
+                    yield qualified, compile_locator(value)
+                elif isinstance(value, dict) and value and all(is_locator(item) for item in value.values()):
+                    for key, item in value.items():
+                        yield f'{qualified}[{key!r}]', compile_locator(item)
+
+
+def main(argv=None):
+    """
+    report which page locators are on the slow host-side xpath path
+    usage: python -m page.common.locator [--package page] [--all] [--strict]
+    """
+    parser = argparse.ArgumentParser(description='Report page locators that are on the slow xpath path')
+    parser.add_argument('--package', default='page', help='page package to scan')
+    parser.add_argument('--all', action='store_true', help='also list locators on the native path')
+    parser.add_argument('--strict', action='store_true', help='exit with status 1 if any slow locator is found')
+    args = parser.parse_args(argv)
+
+    slow = 0
+    for qualified, locator in iter_page_locators(args.package):
+        if locator.is_slow:
+            slow += 1
+            print(f'SLOW    {qualified}: {locator.reason}')
+        elif args.all:
+            print(f'{locator.strategy.upper():<8}{qualified}: {locator.native or locator.value}')
+    print(f'{slow} slow locator(s)')
+    return 1 if slow and args.strict else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
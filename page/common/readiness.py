@@ -0,0 +1,108 @@
+import time
+
+from common.custom_logger import CustomLogger
+from common.waiter import Waiter
+from page.common.ui_snapshot import UiSnapshot
+
+
+class ReadinessCondition:
+    """
+    Base class of a declarative readiness condition.
+
+    A condition is called with the uiautomator2 device and returns True once it holds.
+    ``reset()`` is called before every wait so stateful conditions start from scratch.
+    """
+
+    description = 'ready'
+
+    def reset(self):
+        pass
+
+    def __call__(self, device):
+        raise NotImplementedError
+
+    def __str__(self):
+        return self.description
+
+
+class AppInForeground(ReadinessCondition):
+    """
+    app package (and optionally activity) is in the foreground
+    """
+
+    def __init__(self, package, activity=None):
+        self.package = package
+        self.activity = activity
+        self.description = f'app in foreground: {package}' + (f'/{activity}' if activity else '')
+
+    def __call__(self, device):
+        current = device.app_current()
+        if current.get('package') != self.package:
+            return False
+        return self.activity is None or current.get('activity', '').endswith(self.activity)
+
+
+class ElementVisible(ReadinessCondition):
+    """
+    element matching the locator dict is present in the ui hierarchy
+    """
+
+    def __init__(self, locator):
+        self.locator = locator
+        self.description = f'element visible: {locator}'
+
+    def __call__(self, device):
+        return bool(UiSnapshot(device.dump_hierarchy()).locate(self.locator))
+
+
+class UiStable(ReadinessCondition):
+    """
+    ui hierarchy fingerprint has not changed for at least stable_ms milliseconds
+    """
+
+    def __init__(self, stable_ms=500):
+        self.stable_ms = stable_ms
+        self.description = f'ui stable for {stable_ms} ms'
+        self._fingerprint = None
+        self._since = None
+
+    def reset(self):
+        self._fingerprint = None
+        self._since = None
+
+    def __call__(self, device):
+        fingerprint = UiSnapshot(device.dump_hierarchy()).fingerprint
+        now = time.monotonic()
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self._since = now
+            return False
+        return (now - self._since) * 1000 >= self.stable_ms
+
+
+def wait_until_ready(device, *conditions, timeout=None, waiter=None):
+    """
+    wait until all conditions hold, in order, sharing one deadline; log the latency of each one
+    :param device: uiautomator2 device
+    :param conditions: ReadinessCondition instances
+    :param timeout: total timeout(s), None for the configured 'ready' timeout
+    :param waiter: Waiter, None for the shared default
+    :return: total readiness latency(s)
+    """
+    waiter = waiter or Waiter.default()
+    if timeout is None:
+        timeout = waiter.timeout_for('ready')
+    start = time.monotonic()
+    deadline = start + timeout
+    for condition in conditions:
+        condition.reset()
+        condition_start = time.monotonic()
+        remaining = max(deadline - condition_start, 0)
+        if not waiter.until(lambda: condition(device), remaining, 'ready'):
+            raise Exception(f"在 {timeout} 秒内未达到就绪条件: {condition}")
+        condition_latency = time.monotonic() - condition_start
+        CustomLogger.print_log('就绪条件已满足: %s, 耗时 %.0f ms', condition, condition_latency * 1000,
+                               duration=condition_latency)
+    latency = time.monotonic() - start
+    CustomLogger.print_log('页面就绪总耗时 %.0f ms', latency * 1000, duration=latency)
+    return latency
@@ -0,0 +1,241 @@
+from collections import Counter
+from functools import lru_cache
+
+from common.locate_type import LocateBy
+
+
+@lru_cache(maxsize=256)
+def _compile_xpath(expression):
+    """
+    compile xpath expression once and reuse it for every snapshot
+    :param expression: xpath expression
+    :return: compiled lxml XPath object
+    """
+    from lxml import etree
+
+    return etree.XPath(expression)
+
+
+def _parse_bounds(bounds):
+    """
+    parse uiautomator bounds string, e.g. "[0,63][1080,210]"
+    :param bounds: bounds string
+    :return: (left, top, right, bottom)
+    """
+    if not bounds:
+        return 0, 0, 0, 0
+    left_top, right_bottom = bounds.lstrip('[').rstrip(']').split('][')
+    left, top = left_top.split(',')
+    right, bottom = right_bottom.split(',')
+    return int(left), int(top), int(right), int(bottom)
+
+
+class SnapshotNode:
+    """
+    A read-only element resolved from a UiSnapshot.
+
+    Exposes the same read attributes page objects already use on uiautomator2
+    xpath elements (``text``, ``info``, ``bounds``, ``center()``) without any
+    further device round trip.
+    """
+
+    __slots__ = ('elem',)
+
+    def __init__(self, elem):
+        self.elem = elem
+
+    @property
+    def attrib(self):
+        return self.elem.attrib
+
+    @property
+    def text(self):
+        return self.elem.attrib.get('text', '')
+
+    @property
+    def resource_id(self):
+        return self.elem.attrib.get('resource-id', '')
+
+    @property
+    def content_desc(self):
+        return self.elem.attrib.get('content-desc', '')
+
+    @property
+    def class_name(self):
+        return self.elem.attrib.get('class', self.elem.tag)
+
+    @property
+    def bounds(self):
+        return _parse_bounds(self.elem.attrib.get('bounds'))
+
+    def center(self):
+        """
+        get element center point
+        :return: (x, y)
+        """
+        left, top, right, bottom = self.bounds
+        return (left + right) // 2, (top + bottom) // 2
+
+    @property
+    def info(self):
+        """
+        element info in the same key format as uiautomator2 ``UiObject.info``
+        :return: dict
+        """
+        attrib = self.elem.attrib
+        left, top, right, bottom = self.bounds
+        return {
+            'text': attrib.get('text', ''),
+            'resourceName': attrib.get('resource-id', ''),
+            'contentDescription': attrib.get('content-desc', ''),
+            'className': self.class_name,
+            'packageName': attrib.get('package', ''),
+            'bounds': {'left': left, 'top': top, 'right': right, 'bottom': bottom},
+            'checked': attrib.get('checked') == 'true',
+            'enabled': attrib.get('enabled') == 'true',
+            'selected': attrib.get('selected') == 'true',
+        }
+
+    def xpath(self, expression):
+        """
+        resolve a relative xpath from this node
+        :param expression: xpath expression
+        :return: list of SnapshotNode
+        """
+        return [SnapshotNode(elem) for elem in _compile_xpath(expression)(self.elem)]
+
+    def __repr__(self):
+        return f"<SnapshotNode {self.class_name} id={self.resource_id!r} text={self.text!r}>"
+
+
+class UiSnapshot:
+    """
+    Host-side view of one ``dump_hierarchy()`` result.
+
+    The hierarchy is fetched and parsed once; any number of locators can then be
+    resolved against it without touching the device again. Node tags are renamed
+    to their ``class`` attribute the same way uiautomator2's xpath plugin does, so
+    existing xpath locators such as ``//android.widget.ImageButton`` keep working.
+    """
+
+    def __init__(self, xml):
+        self.xml = xml
+        self._fingerprint = None
+        if isinstance(xml, str):
+            xml = xml.encode('utf-8')
+        from lxml import etree
+
+        self.root = etree.fromstring(xml)
+        for elem in self.root.iter('node'):
+            class_name = elem.attrib.get('class')
+            if class_name:
+                elem.tag = class_name.replace('$', '-')
+
+    @property
+    def fingerprint(self):
+        """
+        compact structural hash of the visible screen: resource ids, texts and content descriptions
+        of the visible nodes, in document order. Bounds and other attributes are ignored so that
+        animations do not make two otherwise identical screens look different.
+        :return: int
+        """
+        if self._fingerprint is None:
+            self._fingerprint = hash(tuple(
+                (attrib.get('resource-id', ''), attrib.get('text', ''), attrib.get('content-desc', ''))
+                for attrib in (elem.attrib for elem in self.root.iter())
+                if attrib.get('visible-to-user', 'true') == 'true'
+                and (attrib.get('resource-id') or attrib.get('text') or attrib.get('content-desc'))
+            ))
+        return self._fingerprint
+
+    def _layout(self, vertical):
+        """
+        nodes identified by resource id, text or content description, in document order
+        :param vertical: measure along the y axis, else the x axis
+        :return: list of ((resource id, text, content description), start, size)
+        """
+        layout = []
+        for attrib in (elem.attrib for elem in self.root.iter()):
+            key = (attrib.get('resource-id', ''), attrib.get('text', ''), attrib.get('content-desc', ''))
+            if not (key[1] or key[2]) or 'bounds' not in attrib:
+                continue
+            left, top, right, bottom = _parse_bounds(attrib['bounds'])
+            start, end = (top, bottom) if vertical else (left, right)
+            layout.append((key, start, end - start))
+        return layout
+
+    def scroll_offset(self, previous, vertical=True):
+        """
+        how far the content moved since a previous snapshot of the same screen.
+
+        Nodes at the same place in both snapshots (toolbars, headers) are left out; the moving
+        nodes of one snapshot must then continue the other like overlapping pages, which keeps
+        repeated texts such as weekdays from matching the wrong row. The offset is read from
+        the overlapping nodes whose size did not change (nodes clipped at the edges do).
+        :param previous: earlier UiSnapshot
+        :param vertical: measure along the y axis, else the x axis
+        :return: pixels the content moved towards the top (left), negative towards the bottom (right);
+                 0 if nothing moved; None if the snapshots do not overlap, i.e. the content moved
+                 by more than a screen
+        """
+        before, after = previous._layout(vertical), self._layout(vertical)
+        static = set(before) & set(after)
+        before = [node for node in before if node not in static]
+        after = [node for node in after if node not in static]
+        if not before and not after:
+            return 0
+        before_keys, after_keys = [node[0] for node in before], [node[0] for node in after]
+        for length in range(min(len(before), len(after)), 0, -1):
+            if before_keys[-length:] == after_keys[:length]:
+                pairs = zip(before[-length:], after[:length])
+            elif before_keys[:length] == after_keys[-length:]:
+                pairs = zip(before[:length], after[-length:])
+            else:
+                continue
+            moves = Counter(old[1] - new[1] for old, new in pairs if old[2] == new[2])
+            return moves.most_common(1)[0][0] if moves else None
+        return None
+
+    def xpath(self, expression):
+        """
+        resolve xpath expression against the snapshot
+        :param expression: xpath expression
+        :return: list of SnapshotNode
+        """
+        return [SnapshotNode(elem) for elem in _compile_xpath(expression)(self.root)]
+
+    def locate(self, locator):
+        """
+        resolve a single locator dict ({locate method: locate value}) against the snapshot
+        :param locator: locator dict
+        :return: list of SnapshotNode, empty if nothing matched
+        """
+        (locate_method, locate_value), = locator.items()
+        if locate_method == LocateBy.XPATH.value:
+            return self.xpath(locate_value)
+        if locate_method == LocateBy.ID.value:
+            return self._match('//*[@resource-id=$value]', value=locate_value)
+        if locate_method == LocateBy.ACCESSIBILITY_ID.value:
+            return self._match('//*[@content-desc=$value]', value=locate_value)
+        if locate_method in (LocateBy.TEXT.value, LocateBy.TEXT_CONTAINS.value):
+            # text locators are (class name, text) tuples, same as BasePage.find_element
+            if isinstance(locate_value, (tuple, list)):
+                class_name, text = locate_value[0], locate_value[1]
+            else:
+                class_name, text = None, locate_value
+            predicate = '@text=$text' if locate_method == LocateBy.TEXT.value else 'contains(@text, $text)'
+            if class_name:
+                return self._match(f'//*[@class=$class_name and {predicate}]', class_name=class_name, text=text)
+            return self._match(f'//*[{predicate}]', text=text)
+        raise Exception(f"快照不支持的定位方法: {locate_method}")
+
+    def locate_many(self, locators):
+        """
+        resolve a dict of locators against the same snapshot
+        :param locators: {key: locator dict}
+        :return: {key: list of SnapshotNode}
+        """
+        return {key: self.locate(locator) for key, locator in locators.items()}
+
+    def _match(self, expression, **variables):
+        return [SnapshotNode(elem) for elem in _compile_xpath(expression)(self.root, **variables)]
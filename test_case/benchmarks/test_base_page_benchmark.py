@@ -0,0 +1,89 @@
+"""
+BasePage benchmarks against the in-process FakeDevice, measuring framework overhead
+apart from phone latency.
+
+--benchmark-only runs are compared with the committed baseline recorded on the same cpu and
+fail on regressions (see configure_benchmark_baseline in test_case/conftest.py); on a new CI
+runner save one from a clean checkout with:
+
+    pytest test_case/benchmarks --benchmark-only --benchmark-min-rounds=30 --benchmark-save=baseline
+"""
+import pytest
+
+from page.android.home_page import HomePage
+from page.android.nine_day_page import NineDayPage
+from test_case.fakes.fake_device import RESOURCE_PREFIX, FakeDevice, NineDayForecastScreen
+
+pytest.importorskip('pytest_benchmark')
+
+LOCATORS = {
+    'id': {'id': RESOURCE_PREFIX + 'psrText'},
+    'xpath_native': {'xpath': f'//*[@resource-id="{RESOURCE_PREFIX}psrText"]'},
+    'xpath_host': {'xpath': '//androidx.recyclerview.widget.RecyclerView/android.widget.LinearLayout[1]'},
+    'text': {'text': ('android.widget.TextView', '20 - 26°C')},
+    'text_contains': {'text_contains': ('android.widget.TextView', '°C')},
+}
+
+
+@pytest.fixture
+def fake_device():
+    return FakeDevice()
+
+
+@pytest.fixture
+def page(fake_device):
+    return NineDayPage(HomePage(fake_device))
+
+
+@pytest.mark.parametrize('locate_type', list(LOCATORS))
+def test_find_element(benchmark, page, locate_type):
+    locator = LOCATORS[locate_type]
+
+    def find_uncached():
+        page.invalidate()
+        return page.find_element(locator)
+
+    assert benchmark(find_uncached) is not None
+
+
+def test_is_exist(benchmark, page):
+    assert benchmark(page.is_exist, LOCATORS['id'])
+
+
+def test_scroll_to_end(benchmark, page, fake_device):
+    snapshot = benchmark.pedantic(page.scroll_to_end, setup=fake_device.screen.reset, rounds=20)
+    assert fake_device.screen.offset == fake_device.screen.max_offset
+    assert snapshot.locate(LOCATORS['id'])
+
+
+def test_click_image(benchmark, page, fake_device, tmp_path):
+    template = fake_device.save_icon_template(tmp_path / 'icon.png')
+    assert benchmark(page.click_image, str(template)) is not None
+
+
+def test_get_nine_day_weather_day_info(benchmark, page, fake_device):
+    info = benchmark.pedantic(page.get_nine_day_weather_day_info, setup=fake_device.screen.reset, rounds=20)
+    assert info[2] == fake_device.screen.row(fake_device.screen.days - 1)['date']
+
+
+def test_get_nine_day_weather_day_info_device_calls(page, fake_device):
+    page.get_nine_day_weather_day_info()
+    swipes = len(range(0, fake_device.screen.max_offset, int(0.3 * fake_device.height))) + 1
+    # one dump before scrolling, one per swipe and a single window size query
+    assert fake_device.rpc_count <= 2 * swipes + 2
+
+
+def test_get_all_days(benchmark, page, fake_device):
+    table = benchmark.pedantic(page.get_all_days, setup=fake_device.screen.reset, rounds=20)
+    screen = fake_device.screen
+    assert len(table) == screen.days
+    assert [f'{day.month}月{day.day}日' for day in table.dates] == [screen.row(i)['date'] for i in range(screen.days)]
+    assert list(table.rh_min) == [int(screen.row(i)['rh'].split(' - ')[0]) for i in range(screen.days)]
+
+
+def test_scroll_until(benchmark):
+    fake_device = FakeDevice(screen=NineDayForecastScreen(days=60))
+    page = NineDayPage(HomePage(fake_device))
+    node = benchmark.pedantic(page.scroll_until, args=(fake_device.screen.date_locator(25),),
+                              setup=fake_device.screen.reset, rounds=20)
+    assert node is not None
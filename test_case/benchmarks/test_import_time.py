@@ -0,0 +1,54 @@
+"""
+Startup budget: importing the framework in a fresh interpreter must stay under
+``Startup.import_budget_ms`` and must not pull in heavy optional dependencies
+(OpenCV, numpy, uiautomator2 ...), so ``pytest --collect-only`` and API-only runs stay fast.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+from common.automation_config import AutomationConfig
+
+ROOT = Path(__file__).parents[2]
+FRAMEWORK_MODULES = [
+    'common.custom_logger',
+    'common.automation_config',
+    'page.common.base_page',
+    'page.android.home_page',
+    'page.android.nine_day_page',
+]
+FRAMEWORK_PACKAGES = ('common', 'page')
+
+
+def measure_import(modules, forbidden):
+    """
+    import modules in a fresh interpreter with -X importtime
+    :param modules: module names
+    :param forbidden: module names that must not be imported
+    :return: (framework import time in ms, forbidden modules that were imported)
+    """
+    code = (f"import sys, {', '.join(modules)}; "
+            f"print(','.join(name for name in {list(forbidden)!r} if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # only top level framework imports, their cumulative time covers everything they import
+        if name.startswith('  ') or name.strip().split('.')[0] not in FRAMEWORK_PACKAGES:
+            continue
+        total_us += int(cumulative)
+    return total_us / 1000, [name for name in result.stdout.strip().split(',') if name]
+
+
+def test_framework_import_time():
+    startup = AutomationConfig().config.get('Startup') or {}
+    budget_ms = startup.get('import_budget_ms', 150)
+    forbidden = startup.get('forbidden_modules', ())
+    # best of three, the first run also pays for cold file system caches
+    runs = [measure_import(FRAMEWORK_MODULES, forbidden) for _ in range(3)]
+    import_ms = min(run[0] for run in runs)
+    assert not runs[0][1], f'framework import pulled in heavy modules: {runs[0][1]}'
+    assert import_ms <= budget_ms, f'framework import took {import_ms:.1f} ms, budget is {budget_ms} ms'
@@ -1,15 +1,175 @@
-import time
+import json
+import os
+import re
 from pathlib import Path
 
 import pytest
-import uiautomator2 as u2
 
+from common.api_client import ApiClient
 from common.automation_config import AutomationConfig
-from common.custom_logger import CustomLogger
+from common.custom_logger import CustomLogger, stop_log_listener
+from common.device_pool import DevicePool
+from common.log_buffer import LogRingBuffer
+from common.replay_device import RecordingDevice, ReplayDevice
+from common.screenshot_writer import ScreenshotWriter
+from common.structured_log import set_log_context, setup_jsonl_handler
+from common.tracer import TRACER, TracingDevice
 from page.android.home_page import HomePage
 from page.android.nine_day_page import NineDayPage
+from page.common.readiness import AppInForeground, UiStable, wait_until_ready
+from test_case.fakes.forecast_server import ForecastServer
 
-images_path = Path(__file__).parents[1] / 'image'
+ROOT = Path(__file__).parents[1]
+images_path = ROOT / 'image'
+APP_PACKAGE = 'hko.MyObservatory_v1_0'
+
+
+def pytest_addoption(parser):
+    parser.addoption('--record', action='store', default=None,
+                     help='record every device call and response to this session file')
+    parser.addoption('--replay', action='store', default=None,
+                     help='serve device responses from a recorded session file, no device needed')
+    parser.addoption('--trace-dir', action='store', default=None,
+                     help='trace every page action, wait and device rpc; write one trace file per test here')
+    parser.addoption('--trace-format', action='store', default='chrome', choices=['chrome', 'jsonl'],
+                     help='trace file format: chrome trace json or OpenTelemetry-style json lines')
+    parser.addoption('--live-api', action='store_true', default=False,
+                     help='send API tests to Api.base_url instead of the local mock forecast server')
+    parser.addoption('--load', action='store', default=None, choices=['closed', 'open'],
+                     help='run the API load tests: closed loop (N concurrent) or open loop (constant arrival rate)')
+    parser.addoption('--load-duration', action='store', type=float, default=None, help='load test duration(s)')
+    parser.addoption('--load-concurrency', action='store', type=int, default=None,
+                     help='closed loop concurrent requests')
+    parser.addoption('--load-rate', action='store', type=float, default=None, help='open loop requests per second')
+    parser.addoption('--quiet-logs', action='store_true', default=False,
+                     help='buffer each test\'s logs in memory and write them out only if the test fails')
+    parser.addoption('--quiet-log-capacity', action='store', type=int, default=2000,
+                     help='number of log records kept per test in --quiet-logs mode')
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    configure_benchmark_baseline(config)
+    TRACER.enabled = bool(config.getoption('--trace-dir'))
+    config.log_buffer = None
+    if config.getoption('--quiet-logs'):
+        config.log_buffer = LogRingBuffer(config.getoption('--quiet-log-capacity'))
+        CustomLogger.logger.addFilter(config.log_buffer)
+    setup_jsonl_handler(CustomLogger.logger, (AutomationConfig().config.get('Logging') or {}).get('jsonl'))
+
+
+def configure_benchmark_baseline(config):
+    """
+    keep pytest-benchmark runs in the committed baseline store (Benchmark.storage) and, for
+    --benchmark-only runs the command line does not compare otherwise, compare with the baseline
+    saved on the same cpu, failing the run when a benchmark regresses by more than
+    Benchmark.compare_fail. Runs before pytest-benchmark reads its options.
+    """
+    if not config.pluginmanager.hasplugin('benchmark'):
+        return
+    from pytest_benchmark.plugin import get_cpu_info
+    from pytest_benchmark.utils import get_machine_id, parse_compare_fail
+
+    benchmark_config = AutomationConfig().config.get('Benchmark') or {}
+    option = config.option
+    storage = ROOT / benchmark_config.get('storage', 'test_case/benchmarks/baselines')
+    if option.benchmark_storage == 'file://./.benchmarks':
+        option.benchmark_storage = f'file://{storage}'
+    if not option.benchmark_only or option.benchmark_compare or option.benchmark_save or option.benchmark_autosave:
+        return
+    baselines = sorted((storage / get_machine_id()).glob('*_baseline.json'))
+    if not baselines:
+        return
+    # the machine id only names os and python, timings are comparable on the same cpu alone
+    baseline_cpu = json.loads(baselines[-1].read_text(encoding='utf-8'))['machine_info']['cpu']
+    cpu = get_cpu_info()
+    if (baseline_cpu.get('brand_raw'), baseline_cpu.get('count')) != (cpu.get('brand_raw'), cpu.get('count')):
+        config.issue_config_time_warning(pytest.PytestConfigWarning(
+            f'跳过基准对比: {baselines[-1].name}录制于{baseline_cpu.get("brand_raw")} x{baseline_cpu.get("count")}, '
+            f'当前为{cpu.get("brand_raw")} x{cpu.get("count")}'), stacklevel=2)
+        return
+    option.benchmark_compare = str(baselines[-1])
+    if not option.benchmark_compare_fail:
+        option.benchmark_compare_fail = [parse_compare_fail(expr) for expr in benchmark_config.get('compare_fail', ())]
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    set_log_context(test_id=item.nodeid, step=None)
+    if item.config.log_buffer:
+        item.config.log_buffer.start()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """
+    trace each test (setup, call and teardown) and export its spans
+    """
+    if not TRACER.enabled:
+        yield
+        return
+    TRACER.reset()
+    span = TRACER.begin(item.nodeid, 'test')
+    yield
+    TRACER.end(span)
+    trace_dir = Path(item.config.getoption('--trace-dir'))
+    trace_dir.mkdir(parents=True, exist_ok=True)
+    file_name = re.sub(r'[^\w.-]+', '_', item.nodeid)
+    if item.config.getoption('--trace-format') == 'jsonl':
+        TRACER.export_jsonl(trace_dir / f'{file_name}.jsonl', trace_id=item.nodeid)
+    else:
+        TRACER.export_chrome(trace_dir / f'{file_name}.json')
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    attach the per-step latency summary and, in --quiet-logs mode, the logs of a failed test to the html report
+    """
+    outcome = yield
+    report = outcome.get_result()
+    log_buffer = item.config.log_buffer
+    if log_buffer and log_buffer.active and report.failed:
+        # the test failed: write its buffered logs and stop buffering for the rest of it
+        log_buffer.stop()
+        report.sections.append((f'Buffered log {report.when}', log_buffer.flush(CustomLogger.logger)))
+    if log_buffer and call.when == 'teardown':
+        # only now, a failing teardown still gets the records of the whole test
+        log_buffer.stop()
+    if TRACER.enabled and report.when == 'call':
+        summary = TRACER.step_summary()
+        if summary:
+            report.sections.append(('Step latency', summary))
+    api_client = getattr(item, 'funcargs', {}).get('api_client')
+    if api_client and report.when == 'call':
+        calls = api_client.drain_calls()
+        if calls:
+            report.sections.append(('API latency', '\n'.join(
+                f'{call.method} {call.path} -> {call.status} ({call.source}), {call.latency_ms:.1f} ms, '
+                f'{call.retries} retries'
+                for call in calls)))
+
+
+def pytest_bdd_before_scenario(request, feature, scenario):
+    request.node.scenario_span = TRACER.begin(scenario.name, 'scenario', feature=feature.name)
+
+
+def pytest_bdd_after_scenario(request, feature, scenario):
+    TRACER.end(getattr(request.node, 'scenario_span', None))
+
+
+def pytest_bdd_before_step(request, feature, scenario, step, step_func):
+    request.node.step_span = TRACER.begin(f'{step.keyword} {step.name}', 'step')
+    set_log_context(step=f'{step.keyword} {step.name}')
+
+
+def pytest_bdd_after_step(request, feature, scenario, step, step_func, step_func_args):
+    TRACER.end(getattr(request.node, 'step_span', None))
+    set_log_context(step=None)
+
+
+def pytest_bdd_step_error(request, feature, scenario, step, step_func, step_func_args, exception):
+    TRACER.end(getattr(request.node, 'step_span', None), error=f'{type(exception).__name__}: {exception}')
 
 
 @pytest.fixture(autouse=True)
@@ -19,20 +179,60 @@ def print_start_and_end(request):
     CustomLogger.print_with_new_line(f"---------- End test {request.node.name}---------------")
 
 
+@pytest.fixture(scope="session")
+def device_lease(automation_config):
+    """
+    lease one device of the pool for this (xdist worker) session, released on teardown
+    :return: DeviceLease
+    """
+    lease = DevicePool.from_config(automation_config).lease(os.environ.get('PYTEST_XDIST_WORKER', 'master'))
+    yield lease
+    lease.release()
+
+
+@pytest.fixture(scope="session")
+def device(request):
+    """
+    uiautomator2 device: a leased device, optionally recorded with --record, or a replay of --replay
+    :return: device
+    """
+    replay_path = request.config.getoption('--replay')
+    record_path = request.config.getoption('--record')
+    recording = None
+    if replay_path:
+        device = ReplayDevice(replay_path)
+        set_log_context(serial=f'replay:{Path(replay_path).name}')
+    else:
+        lease = request.getfixturevalue('device_lease')
+        device = lease.device
+        set_log_context(serial=lease.serial_no)
+    if record_path and not replay_path:
+        worker_id = os.environ.get('PYTEST_XDIST_WORKER')
+        if worker_id:
+            # one session file per xdist worker
+            record_path = Path(record_path).with_name(f'{worker_id}_{Path(record_path).name}')
+        device = recording = RecordingDevice(device, record_path)
+    if TRACER.enabled:
+        device = TracingDevice(device)
+    yield device
+    if recording:
+        recording.close()
+
+
 @pytest.fixture(scope="class")
-def driver(automation_config):
+def driver(device):
     """
     uiautomator2 driver
     :return:
     """
-    driver = u2.connect_usb(automation_config.get('serial_no'))
+    driver = device
     CustomLogger.print_log(driver.device_info)
     CustomLogger.print_log('Open MyObservatory APP')
-    driver.app_start('hko.MyObservatory_v1_0', wait=True)
-    time.sleep(10)
+    driver.app_start(APP_PACKAGE, wait=True)
+    wait_until_ready(driver, AppInForeground(APP_PACKAGE), UiStable(1000))
     yield driver
     CustomLogger.print_log('close APP')
-    driver.app_stop('hko.MyObservatory_v1_0')
+    driver.app_stop(APP_PACKAGE)
 
 
 @pytest.fixture(scope="class")
@@ -56,7 +256,7 @@ def nine_day_page(home_page):
     # nine_day_temp,nine_day_rh,nine_day_date,nine_day_week_date,nine_day_psr = nine_day_page.get_nine_day_weather_day_info()
     # update_date = nine_day_page.get_update_date()
     yield nine_day_page
-    time.sleep(2)
+    nine_day_page.wait_until_ready(UiStable(500))
 
 
 @pytest.fixture(scope='session')
@@ -68,6 +268,59 @@ def automation_config():
     return AutomationConfig().config
 
 
+@pytest.fixture(scope='session')
+def forecast_server(automation_config):
+    """
+    local mock forecast API on localhost, configured from Api.mock_server
+    :return: ForecastServer
+    """
+    server_config = dict((automation_config.get('Api') or {}).get('mock_server') or {})
+    with ForecastServer(**server_config) as server:
+        yield server
+
+
+@pytest.fixture(scope='session')
+def api_client(request, automation_config):
+    """
+    pooled, retrying http client shared by the API tests, pointed at the local mock server unless --live-api
+    :return: ApiClient
+    """
+    api_config = dict(automation_config.get('Api') or {})
+    api_config.pop('mock_server', None)
+    if not request.config.getoption('--live-api'):
+        api_config['base_url'] = request.getfixturevalue('forecast_server').url + '/v1'
+    client = ApiClient(**api_config)
+    yield client
+    client.close()
+
+
+@pytest.fixture(autouse=True)
+def api_cache_opt_out(request):
+    """
+    bypass the api_client response cache in tests marked no_api_cache
+    """
+    if not request.node.get_closest_marker('no_api_cache') or 'api_client' not in request.fixturenames:
+        yield
+        return
+    cache = request.getfixturevalue('api_client').cache
+    enabled = cache is not None and cache.enabled
+    if cache is not None:
+        cache.enabled = False
+    yield
+    if cache is not None:
+        cache.enabled = enabled
+
+
+def pytest_sessionfinish(session):
+    """
+    make sure every background screenshot and queued log line is written before the session ends
+    :param session:
+    :return:
+    """
+    ScreenshotWriter.flush_default()
+    stop_log_listener()
+
+
 def pytest_html_report_title(report):
     """
     change html_report title
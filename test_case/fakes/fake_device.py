@@ -0,0 +1,311 @@
+import time
+from datetime import date, timedelta
+from xml.sax.saxutils import quoteattr
+
+from uiautomator2 import ShellResponse
+
+from page.common.ui_snapshot import UiSnapshot
+
+APP_PACKAGE = 'hko.MyObservatory_v1_0'
+RESOURCE_PREFIX = f'{APP_PACKAGE}:id/'
+WEEKDAYS = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
+
+# UiSelector kwargs -> xpath predicates evaluated by UiSnapshot
+_SELECTOR_XPATH = {
+    'resourceId': '@resource-id="{}"',
+    'className': '@class="{}"',
+    'text': '@text="{}"',
+    'textContains': 'contains(@text, "{}")',
+    'description': '@content-desc="{}"',
+    'descriptionContains': 'contains(@content-desc, "{}")',
+}
+
+
+def _node(class_name, bounds, resource_id='', text='', content_desc='', children=''):
+    left, top, right, bottom = bounds
+    return (f'<node class={quoteattr(class_name)} package="{APP_PACKAGE}" '
+            f'resource-id={quoteattr(resource_id)} text={quoteattr(text)} content-desc={quoteattr(content_desc)} '
+            f'visible-to-user="true" enabled="true" bounds="[{left},{top}][{right},{bottom}]">{children}</node>')
+
+
+class NineDayForecastScreen:
+    """
+    Simulated nine-day forecast RecyclerView: only rows inside the viewport are dumped
+    and swipes move the list until its end is reached.
+    """
+
+    def __init__(self, days=9, start=None, width=1080, height=2340, header_height=300, row_height=260):
+        self.start = start or date.today()
+        self.days = days
+        self.width = width
+        self.height = height
+        self.header_height = header_height
+        self.row_height = row_height
+        self.offset = 0
+
+    @property
+    def max_offset(self):
+        return max(self.days * self.row_height - (self.height - self.header_height), 0)
+
+    def reset(self):
+        self.offset = 0
+
+    def scroll(self, distance):
+        self.offset = min(max(self.offset + int(distance), 0), self.max_offset)
+
+    def row(self, index):
+        """
+        values of one forecast row
+        :param index: day index, 0 is tomorrow
+        :return: dict
+        """
+        day = self.start + timedelta(days=index + 1)
+        return {
+            'date': f'{day.month}月{day.day}日',
+            'day_of_week': WEEKDAYS[day.weekday()],
+            'temp': f'{20 + index % 4} - {26 + index % 3}°C',
+            'rh': f'{55 + index} - {85 + index % 10}%',
+            'psr': ['低', '中低', '中', '中高', '高'][index % 5],
+            'description': ['大致天晴', '部分時間有陽光', '多雲', '有幾陣驟雨', '天晴乾燥'][index % 5],
+        }
+
+    def date_locator(self, index):
+        """
+        :param index: day index, may be past the last row
+        :return: xpath locator of the date label of that row
+        """
+        day = self.start + timedelta(days=index + 1)
+        return {'xpath': f'//*[@resource-id="{RESOURCE_PREFIX}sevenday_forecast_date" and @text="{day.month}月{day.day}日"]'}
+
+    def dump(self):
+        update_time = f'更新时间: {self.start.year}年{self.start.month:02d}月{self.start.day:02d}日10时30分'
+        rows = []
+        for index in range(self.days):
+            top = self.header_height + index * self.row_height - self.offset
+            bottom = top + self.row_height
+            if bottom <= self.header_height or top >= self.height:
+                continue
+            top, bottom = max(top, self.header_height), min(bottom, self.height)
+            values = self.row(index)
+            children = ''.join(
+                _node('android.widget.TextView', (40 + 200 * column, top, 220 + 200 * column, bottom),
+                      resource_id=RESOURCE_PREFIX + resource, text=values[key])
+                for column, (key, resource) in enumerate([
+                    ('date', 'sevenday_forecast_date'),
+                    ('day_of_week', 'sevenday_forecast_day_of_week'),
+                    ('temp', 'sevenday_forecast_temp'),
+                    ('rh', 'sevenday_forecast_rh'),
+                    ('psr', 'psrText'),
+                ]))
+            rows.append(_node('android.widget.LinearLayout', (0, top, self.width, bottom),
+                              content_desc=f"{values['date']} {values['day_of_week']} {values['description']}",
+                              children=children))
+        header = _node('android.widget.LinearLayout', (0, 0, self.width, self.header_height),
+                       resource_id=RESOURCE_PREFIX + 'header_layout', children=''.join([
+                           _node('android.widget.ImageButton', (0, 0, 150, 150), content_desc='Navigate up'),
+                           _node('android.widget.TextView', (160, 150, self.width, 300),
+                                 resource_id=RESOURCE_PREFIX + 'mainAppSevenDayUpdateTime', text=update_time),
+                       ]))
+        recycler = _node('androidx.recyclerview.widget.RecyclerView', (0, self.header_height, self.width, self.height),
+                         resource_id=RESOURCE_PREFIX + 'sevenday_forecast_list', children=''.join(rows))
+        root = _node('android.widget.FrameLayout', (0, 0, self.width, self.height),
+                     resource_id=RESOURCE_PREFIX + 'drawer_layout', children=header + recycler)
+        return ("<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>"
+                f'<hierarchy rotation="0">{root}</hierarchy>')
+
+
+class FakeElement:
+    """
+    element returned by FakeSelector.all(), like uiautomator2's XMLElement
+    """
+
+    def __init__(self, device, node):
+        self._device = device
+        self._node = node
+
+    @property
+    def text(self):
+        return self._node.text
+
+    @property
+    def info(self):
+        return self._node.info
+
+    def center(self):
+        return self._node.center()
+
+    def click(self):
+        self._device.click(*self.center())
+
+    def long_click(self, duration=None):
+        self._device.click(*self.center())
+
+    def screenshot(self):
+        left, top, right, bottom = self._node.bounds
+        return self._device.screenshot().crop((left, top, right, bottom))
+
+
+class FakeSelector:
+    """
+    lazy selector over the current fake hierarchy, standing in for both uiautomator2's
+    XPathSelector (``d.xpath(...)``) and UiObject (``d(resourceId=...)``)
+    """
+
+    def __init__(self, device, locator, index=0):
+        self._device = device
+        self._locator = locator
+        self._index = index
+
+    def all(self):
+        return [FakeElement(self._device, node) for node in self._device.snapshot().locate(self._locator)]
+
+    def _get(self):
+        elements = self.all()
+        if len(elements) <= self._index:
+            raise Exception(f'element not found: {self._locator}')
+        return elements[self._index]
+
+    @property
+    def exists(self):
+        return len(self.all()) > self._index
+
+    def wait(self, timeout=None):
+        return self.exists
+
+    @property
+    def info(self):
+        return self._get().info
+
+    def get_text(self):
+        return self._get().text
+
+    def click(self, timeout=None):
+        self._get().click()
+
+    def long_click(self, duration=None):
+        self._get().long_click(duration)
+
+    def screenshot(self):
+        return self._get().screenshot()
+
+    def __getitem__(self, index):
+        return FakeSelector(self._device, self._locator, index)
+
+
+class FakeDevice:
+    """
+    In-process stand-in for a uiautomator2 device.
+
+    Serves a configurable hierarchy (a fixed xml string or a simulated screen such as
+    NineDayForecastScreen), injects a fixed latency into every device RPC and counts
+    the RPCs, so BasePage overhead can be measured apart from phone latency.
+    """
+
+    def __init__(self, screen=None, hierarchy=None, latency=0.0, width=1080, height=2340, fling=1.0):
+        self.screen = screen if screen is not None or hierarchy is not None else NineDayForecastScreen(
+            width=width, height=height)
+        self.hierarchy = hierarchy
+        self.latency = latency
+        # swipes faster than 0.1s move the list this many times the finger travel, like a real fling
+        self.fling = fling
+        self.width = width
+        self.height = height
+        self.rpc_count = 0
+        self.clicks = []
+        self.shell_commands = []
+        self.app_starts = []
+        self.current_app = {'package': APP_PACKAGE, 'activity': '.Homepage', 'pid': 1}
+        self._screen_image = None
+
+    def _rpc(self):
+        self.rpc_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def snapshot(self):
+        return UiSnapshot(self.dump_hierarchy())
+
+    # uiautomator2 device api used by the page objects
+    @property
+    def info(self):
+        self._rpc()
+        return {'displayWidth': self.width, 'displayHeight': self.height, 'sdkInt': 34}
+
+    @property
+    def device_info(self):
+        return {'serial': 'fake', 'model': 'FakeDevice', 'sdk': 34}
+
+    def dump_hierarchy(self, *args, **kwargs):
+        self._rpc()
+        return self.hierarchy if self.hierarchy is not None else self.screen.dump()
+
+    def window_size(self):
+        self._rpc()
+        return self.width, self.height
+
+    def swipe(self, start_x, start_y, end_x, end_y, duration=None):
+        self._rpc()
+        if self.screen is not None and hasattr(self.screen, 'scroll'):
+            fast = duration is not None and duration < 0.1
+            self.screen.scroll((start_y - end_y) * (self.fling if fast else 1))
+
+    def swipe_ext(self, direction, scale=0.9):
+        distance = {'up': 0.5, 'down': -0.5}.get(direction, 0) * self.height * scale
+        self.swipe(self.width / 2, self.height / 2 + distance / 2, self.width / 2, self.height / 2 - distance / 2)
+
+    def click(self, x, y):
+        self._rpc()
+        self.clicks.append((x, y))
+
+    def press(self, key):
+        self._rpc()
+
+    def shell(self, command, timeout=60):
+        self._rpc()
+        self.shell_commands.append(command)
+        return ShellResponse('ok', 0)
+
+    def app_start(self, package, activity=None, wait=False, stop=False):
+        self._rpc()
+        self.app_starts.append((package, activity, stop))
+        self.current_app = {'package': package, 'activity': activity or '.Homepage', 'pid': 1}
+
+    def app_stop(self, package):
+        self._rpc()
+
+    def app_current(self):
+        self._rpc()
+        return dict(self.current_app)
+
+    def screenshot(self, filename=None, format='pillow'):
+        self._rpc()
+        from PIL import Image, ImageDraw
+        if self._screen_image is None:
+            image = Image.new('RGB', (self.width, self.height), (235, 240, 245))
+            draw = ImageDraw.Draw(image)
+            # a distinctive "icon" to match against
+            draw.rectangle((860, 60, 1020, 220), fill=(20, 90, 200))
+            draw.ellipse((890, 90, 990, 190), fill=(250, 200, 30))
+            draw.line((860, 60, 1020, 220), fill=(0, 0, 0), width=6)
+            self._screen_image = image
+        if format == 'opencv':
+            import numpy as np
+            return np.array(self._screen_image)[:, :, ::-1].copy()
+        return self._screen_image.copy()
+
+    def save_icon_template(self, path):
+        """
+        write the icon drawn on the fake screen to path, for click_image
+        :param path: template path
+        :return: path
+        """
+        self.screenshot().crop((850, 50, 1030, 230)).save(path)
+        self.rpc_count -= 1
+        return path
+
+    def xpath(self, expression):
+        return FakeSelector(self, {'xpath': expression})
+
+    def __call__(self, **kwargs):
+        conditions = [_SELECTOR_XPATH[name].format(value) for name, value in kwargs.items()]
+        return FakeSelector(self, {'xpath': f"//*[{' and '.join(conditions)}]"})
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FORECAST_PATH = '/forecast/daily'
+DESCRIPTIONS = ['Sunny', 'Sunny periods', 'Cloudy', 'A few showers', 'Fine and dry']
+
+
+def build_forecast(locations, days, start=None, pad=0):
+    """
+    build a /forecast/daily payload
+    :param locations: location names
+    :param days: number of days per location, starting today
+    :param start: first date, defaults to today
+    :param pad: length of the filler ``details`` text per entry, to grow the payload
+    :return: dict
+    """
+    start = start or date.today()
+    daily = []
+    for location_index, location in enumerate(locations):
+        for index in range(days):
+            entry = {
+                'date': (start + timedelta(days=index)).isoformat(),
+                'location': location,
+                'humidity': {'min': 55 + (index + location_index) % 10, 'max': 80 + index % 15},
+                'temperature': {'min': 18 + index % 5, 'max': 24 + (index + location_index) % 6},
+                'description': DESCRIPTIONS[(index + location_index) % len(DESCRIPTIONS)],
+            }
+            if pad:
+                entry['details'] = 'x' * pad
+            daily.append(entry)
+    return {'location': locations[0], 'generated_at': time.time(), 'forecast': {'daily': daily}}
+
+
+class _ForecastHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'MockForecast/1.0'
+
+    def do_GET(self):
+        server = self.server.forecast
+        with server._lock:
+            server.requests_served += 1
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        latency = float(query.get('latency_ms', server.latency * 1000)) / 1000
+        if latency:
+            time.sleep(latency)
+        if not url.path.endswith(FORECAST_PATH):
+            return self._send(404, {'error': f'unknown path {url.path}'})
+        if not self.headers.get('Authorization'):
+            return self._send(401, {'error': 'missing Authorization header'})
+        error_status = server.next_error()
+        if error_status:
+            return self._send(error_status, {'error': 'injected error'})
+        locations = [name.strip() for name in query.get('location', server.location).split(',') if name.strip()]
+        days, pad = int(query.get('days', server.days)), int(query.get('pad', server.pad))
+        # the forecast only changes with its parameters and the date
+        etag = '"{}"'.format(hashlib.sha1(f'{locations}|{days}|{pad}|{date.today()}'.encode()).hexdigest()[:16])
+        if self.headers.get('If-None-Match') == etag:
+            with server._lock:
+                server.not_modified += 1
+            return self._send(304, None, {'ETag': etag})
+        self._send(200, build_forecast(locations, days, pad=pad), {'ETag': etag})
+
+    def _send(self, status, payload, headers=None):
+        body = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        extra_headers = ''.join(f'{name}: {value}\r\n' for name, value in (headers or {}).items())
+        # one write for status line, headers and body: separate small writes stall on delayed ACKs
+        head = (f'HTTP/1.1 {status} {self.responses.get(status, ("",))[0]}\r\n'
+                f'Server: {self.server_version}\r\n'
+                'Content-Type: application/json\r\n'
+                f'{extra_headers}'
+                f'Content-Length: {len(body)}\r\n'
+                '\r\n').encode('latin-1')
+        self.wfile.write(head + body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ForecastHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default listen backlog of 5 drops connection bursts from load tests (1s SYN retry)
+    request_queue_size = 128
+
+
+class ForecastServer:
+    """
+    Local mock of the weather forecast API, serving ``/forecast/daily`` (under any
+    prefix, e.g. ``/v1/forecast/daily``) on localhost with HTTP/1.1 keep-alive.
+
+    ``days``, ``location`` (comma separated for several locations) and ``pad`` (filler
+    bytes per entry) shape the payload; ``latency`` delays every response and
+    ``error_rate``/``fail_next`` inject ``error_status`` responses. The query parameters
+    ``days``, ``location``, ``pad`` and ``latency_ms`` override the defaults per request.
+    Forecasts carry an ETag and ``If-None-Match`` is answered with 304 Not Modified.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, days=9, location='Hong Kong', pad=0, latency=0.0,
+                 error_rate=0.0, error_status=503, seed=None):
+        self.days = days
+        self.location = location
+        self.pad = pad
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_next = 0
+        self.requests_served = 0
+        self.not_modified = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _ForecastHTTPServer((host, port), _ForecastHandler)
+        self._httpd.forecast = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def next_error(self):
+        """
+        status of the injected error for the next response, or None
+        :return: int or None
+        """
+        with self._lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return self.error_status
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status
+        return None
+
+    def start(self):
+        # a short poll interval keeps stop() fast for per-test servers
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05},
+                                        name='forecast-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
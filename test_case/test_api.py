@@ -4,7 +4,11 @@ import pytest
 from pytest_bdd import given, when, then, scenario
 import requests
 import json
+from pathlib import Path
 from common.custom_logger import CustomLogger
+from common.forecast_model import ForecastResponse
+from common.load_driver import LoadDriver
+from page.android.forecast_table import format_forecast_date, parse_forecast_date
 
 
 @pytest.fixture
@@ -46,18 +50,14 @@ def when_check_ninth_day(nine_day_page, context):
 @then('我应该看到的最后一个预报的日期是当前更新日期的九天后')
 def then_verify_temperature(context, nine_day_page):
     """验证温度范围"""
-    update_date = nine_day_page.get_update_date()
-    # 将字符串转换为datetime对象
-    date_obj = datetime.strptime(update_date, "%m月%d日")
+    update_date = parse_forecast_date(nine_day_page.get_update_date())
 
     # 加上9天
-    new_date_obj = date_obj + timedelta(days=9)
+    new_date = update_date + timedelta(days=9)
 
-    # 将结果转换回字符串
-    new_date_str = new_date_obj.strftime("%m月%d日")
-    nineth_date = "0" + context['weather_info']['date'] if len(context['weather_info']['date']) == 5 else \
-    context['weather_info']['date']
-    assert nineth_date == new_date_str
+    # 预报日期没有年份，跨年时取更新日期之后的日期
+    nineth_date = parse_forecast_date(context['weather_info']['date'], after=update_date)
+    assert nineth_date == new_date, f"{format_forecast_date(nineth_date)} != {format_forecast_date(new_date)}"
     print("执行Then步骤：验证温度范围")
 
 
@@ -75,10 +75,8 @@ def then_verify_weather_info(context):
 
 
 class TestWeatherAPI:
-    """Test class for Weather Forecast API endpoints"""
+    """Test class for Weather Forecast API endpoints, sent through the shared api_client (base url in Api.base_url)"""
     
-    # Mock API endpoint
-    BASE_URL = "https://api.weather-forecast.mock/v1"
     FORECAST_ENDPOINT = "/forecast/daily"
     
     def setup_method(self):
@@ -92,23 +90,21 @@ class TestWeatherAPI:
             "days": 7
         }
     
-    def test_capture_forecast_endpoint(self):
+    def test_capture_forecast_endpoint(self, api_client):
         """
         Test Case 1: Verify the forecast API endpoint is correctly captured
         """
-        endpoint = f"{self.BASE_URL}{self.FORECAST_ENDPOINT}"
+        endpoint = api_client.url_for(self.FORECAST_ENDPOINT)
         CustomLogger.print_log(f"Captured API endpoint: {endpoint}")
         assert self.FORECAST_ENDPOINT in endpoint, "Forecast endpoint not found in URL"
     
-    def test_forecast_api_response(self):
+    def test_forecast_api_response(self, api_client):
         """
         Test Case 2: Send request and verify API response status
         """
-        endpoint = f"{self.BASE_URL}{self.FORECAST_ENDPOINT}"
-        
         try:
-            response = requests.get(
-                endpoint,
+            response = api_client.get(
+                self.FORECAST_ENDPOINT,
                 headers=self.headers,
                 params=self.params
             )
@@ -124,56 +120,33 @@ class TestWeatherAPI:
             CustomLogger.print_error(f"API request failed: {str(e)}")
             raise
     
-    def test_extract_day_after_tomorrow_humidity(self):
+    def test_extract_day_after_tomorrow_humidity(self, api_client):
         """
         Test Case 3: Extract relative humidity for the day after tomorrow
         """
-        endpoint = f"{self.BASE_URL}{self.FORECAST_ENDPOINT}"
-        
         try:
             # Get current date
             today = datetime.now()
             day_after_tomorrow = today + timedelta(days=2)
             target_date = day_after_tomorrow.strftime("%Y-%m-%d")
             
-            # Send API request
-            response = requests.get(
-                endpoint,
+            # Send API request, the body is parsed and validated while it streams in
+            response = api_client.get(
+                self.FORECAST_ENDPOINT,
                 headers=self.headers,
-                params=self.params
+                params=self.params,
+                stream=True
             )
             
-            # Mock response data structure
-            mock_response = {
-                "forecast": {
-                    "daily": [
-                        {
-                            "date": target_date,
-                            "humidity": {
-                                "min": 60,
-                                "max": 85
-                            },
-                            "temperature": {
-                                "min": 20,
-                                "max": 25
-                            }
-                        }
-                    ]
-                }
-            }
-            
-            # In real scenario, use response.json() instead of mock_response
-            data = mock_response
+            assert response.status_code == 200, f"API request failed with status code: {response.status_code}"
+            forecast = ForecastResponse.from_response(response)
             
             # Extract humidity for day after tomorrow
-            target_forecast = next(
-                (day for day in data["forecast"]["daily"] if day["date"] == target_date),
-                None
-            )
+            target_forecast = forecast.get(target_date)
             
             # Verify humidity data
             assert target_forecast is not None, f"No forecast found for date: {target_date}"
-            humidity_range = f"{target_forecast['humidity']['min']} - {target_forecast['humidity']['max']}%"
+            humidity_range = target_forecast.humidity_range
             
             # Log extracted humidity
             CustomLogger.print_log(f"Relative humidity for {target_date}: {humidity_range}")
@@ -196,6 +169,28 @@ class TestWeatherAPI:
             CustomLogger.print_error(f"Unexpected error: {str(e)}")
             raise
 
+    @pytest.mark.load
+    def test_forecast_api_load(self, request, api_client, automation_config):
+        """
+        Test Case 4: Load the forecast endpoint, run with --load closed|open
+        """
+        mode = request.config.getoption('--load')
+        if not mode:
+            pytest.skip('load test only runs with --load closed|open')
+        load_config = automation_config.get('Load') or {}
+        options = {name: request.config.getoption(f'--load-{name}') for name in ('duration', 'concurrency', 'rate')}
+        options = {name: load_config.get(name) if value is None else value for name, value in options.items()}
+        driver = LoadDriver(api_client.url_for(self.FORECAST_ENDPOINT), headers=self.headers, params=self.params,
+                            timeout=load_config.get('timeout', 10))
+        result = driver.run(mode, **{name: value for name, value in options.items() if value is not None})
+
+        output = Path(__file__).parents[1] / load_config.get('output_dir', 'report/load') / f'forecast_daily_{mode}.json'
+        result.write_json(output)
+        CustomLogger.print_log(result.summary_line())
+        request.node.add_report_section('call', 'Load test', f'{result.summary_line()}\nresult: {output}')
+        violations = result.check(load_config.get('thresholds'))
+        assert not violations, f"Load thresholds exceeded: {', '.join(violations)}"
+
 
 if __name__ == "__main__":
     pytest.main(["-v", "test_api.py", "--html=report/api_test_report.html"])
@@ -0,0 +1,135 @@
+"""
+ApiClient against the local mock forecast server: retries and response cache.
+"""
+import socket
+import time
+
+import pytest
+import requests
+
+from common.api_client import ApiClient
+from test_case.fakes.forecast_server import FORECAST_PATH, ForecastServer
+from test_case import test_api
+
+HEADERS = {'Authorization': 'Bearer mock-token-123'}
+
+
+@pytest.fixture
+def server():
+    with ForecastServer() as server:
+        yield server
+
+
+def make_client(server, **kwargs):
+    kwargs.setdefault('cache', {'ttl': 60})
+    return ApiClient(server.url + '/v1', headers=HEADERS, **kwargs)
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return 'http://127.0.0.1:{}'.format(sock.getsockname()[1])
+
+
+def test_5xx_is_retried_with_backoff(server):
+    client = make_client(server, cache=None, retries=3, backoff_factor=0.05)
+    server.fail_next = 3
+    assert client.get(FORECAST_PATH).status_code == 200
+    assert server.requests_served == 4
+    call = client.drain_calls()[-1]
+    assert call.retries == 3
+    # the first retry goes out at once, then 0.1 s and 0.2 s
+    assert 300 <= call.latency_ms < 1300
+
+
+def test_5xx_retries_stop_at_the_limit(server):
+    client = make_client(server, cache=None, retries=2, backoff_factor=0)
+    server.fail_next = 10
+    assert client.get(FORECAST_PATH).status_code == 503
+    assert server.requests_served == 3
+    assert client.drain_calls()[-1].retries == 2
+
+
+def test_client_errors_are_not_retried(server):
+    client = make_client(server, cache=None, retries=3, backoff_factor=0)
+    assert client.get('/unknown').status_code == 404
+    assert server.requests_served == 1
+
+
+def test_connection_errors_are_retried_then_raised():
+    client = ApiClient(closed_port_url(), headers=HEADERS, retries=2, backoff_factor=0.05)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get(FORECAST_PATH)
+    call = client.drain_calls()[-1]
+    assert call.status is None
+    # both retries were attempted: no sleep before the first, 0.1 s before the second
+    assert 100 <= call.latency_ms < 1100
+
+
+def test_weather_api_requests_share_one_network_call(server):
+    weather_api = test_api.TestWeatherAPI()
+    weather_api.setup_method()
+    client = make_client(server)
+    first = client.get(FORECAST_PATH, headers=weather_api.headers, params=weather_api.params)
+    second = client.get(FORECAST_PATH, headers=weather_api.headers, params=weather_api.params, stream=True)
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert server.requests_served == 1
+    assert [call.source for call in client.drain_calls()] == ['network', 'cache']
+
+
+def test_cache_hits_are_independent_copies(server):
+    client = make_client(server)
+    original = client.get(FORECAST_PATH)
+    original.headers['X-Changed'] = 'original'
+    hit = client.get(FORECAST_PATH)
+    hit.headers['X-Changed'] = 'hit'
+    hit.cookies.set('session', 'changed')
+    hit.request.headers['X-Changed'] = 'hit'
+    later = client.get(FORECAST_PATH)
+    assert 'X-Changed' not in later.headers
+    assert 'session' not in later.cookies
+    assert 'X-Changed' not in later.request.headers
+    assert server.requests_served == 1
+
+
+def test_expired_entry_is_revalidated_with_etag(server):
+    client = make_client(server, cache={'ttl': 0.05})
+    first = client.get(FORECAST_PATH)
+    assert first.headers['ETag']
+    time.sleep(0.1)
+    revalidated = client.get(FORECAST_PATH)
+    # 304 Not Modified: served from the cache again, without a body transfer
+    assert revalidated.status_code == 200
+    assert revalidated.json() == first.json()
+    assert server.requests_served == 2
+    assert server.not_modified == 1
+    assert client.drain_calls()[-1].source == 'revalidated'
+    # refreshed for another ttl
+    client.get(FORECAST_PATH)
+    assert server.requests_served == 2
+
+
+def test_changed_parameters_miss_the_cache(server):
+    client = make_client(server)
+    client.get(FORECAST_PATH, params={'days': 7})
+    client.get(FORECAST_PATH, params={'days': 9})
+    client.get(FORECAST_PATH, params={'days': 7}, cache=False)
+    assert server.requests_served == 3
+
+
+def test_error_responses_are_not_cached(server):
+    client = make_client(server, retries=0)
+    server.fail_next = 1
+    assert client.get(FORECAST_PATH).status_code == 503
+    assert client.get(FORECAST_PATH).status_code == 200
+    assert server.requests_served == 2
+
+
+@pytest.mark.no_api_cache
+def test_no_api_cache_marker_bypasses_the_cache(api_client, forecast_server):
+    before = forecast_server.requests_served
+    api_client.get(FORECAST_PATH, headers=HEADERS)
+    api_client.get(FORECAST_PATH, headers=HEADERS)
+    assert forecast_server.requests_served == before + 2
+    assert {call.source for call in api_client.drain_calls()} == {'network'}
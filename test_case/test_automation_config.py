@@ -0,0 +1,112 @@
+import os
+import pickle
+
+import pytest
+
+from common.automation_config import AutomationConfig
+
+BASE = """
+Device:
+  serial_no: base-serial
+  connect_type: USB
+Wait:
+  timeouts:
+    id: 10
+  poll_interval: 0.5
+  fail_fast: true
+Logging:
+  levels: [INFO]
+"""
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    (tmp_path / 'automation_local.yaml').write_text(BASE, encoding='utf-8')
+    for name in list(os.environ):
+        if name.startswith(AutomationConfig.env_prefix):
+            monkeypatch.delenv(name)
+    monkeypatch.delenv('AUTOMATION_ENV', raising=False)
+    monkeypatch.delenv('AUTOMATION_OVERRIDE_FILE', raising=False)
+    monkeypatch.setattr(AutomationConfig, '_loaded', {})
+    return tmp_path
+
+
+def load(config_dir):
+    AutomationConfig._loaded.clear()
+    return AutomationConfig(config_dir).config
+
+
+def test_layers_override_in_order(config_dir, monkeypatch):
+    (config_dir / 'automation_ci.yaml').write_text('Device:\n  connect_type: WIFI\nWait:\n  poll_interval: 0.2\n',
+                                                   encoding='utf-8')
+    (config_dir / 'automation_override.yaml').write_text('Wait:\n  poll_interval: 0.1\n', encoding='utf-8')
+    monkeypatch.setenv('AUTOMATION_ENV', 'ci')
+    monkeypatch.setenv('AUTOMATION__Device__serial_no', 'env-serial')
+    monkeypatch.setenv('AUTOMATION__Device__connect_type', 'ADB')
+    config = load(config_dir)
+    # base < environment variables < automation_<env>.yaml < override file
+    assert config.Device.serial_no == 'env-serial'
+    assert config.Device.connect_type == 'WIFI'
+    assert config.Wait.poll_interval == 0.1
+    assert config.Wait.timeouts.id == 10
+
+
+def test_env_override_keeps_strings_and_coerces_by_replaced_type(config_dir, monkeypatch):
+    monkeypatch.setenv('AUTOMATION__DEVICE__SERIAL_NO', '0123')
+    monkeypatch.setenv('AUTOMATION__Wait__timeouts__id', '5')
+    monkeypatch.setenv('AUTOMATION__Wait__poll_interval', '1')
+    monkeypatch.setenv('AUTOMATION__Wait__fail_fast', 'off')
+    monkeypatch.setenv('AUTOMATION__Logging__levels', '[DEBUG, INFO]')
+    monkeypatch.setenv('AUTOMATION__Device__model', '007')
+    config = load(config_dir)
+    assert config.Device.serial_no == '0123'
+    assert config.Device.model == '007'
+    assert config.Wait.timeouts.id == 5
+    assert config.Wait.poll_interval == 1.0 and isinstance(config.Wait.poll_interval, float)
+    assert config.Wait.fail_fast is False
+    assert config.Logging.levels == ('DEBUG', 'INFO')
+
+
+def test_env_override_of_wrong_type_fails(config_dir, monkeypatch):
+    monkeypatch.setenv('AUTOMATION__Wait__timeouts__id', 'ten')
+    with pytest.raises(Exception, match='Wait.timeouts.id'):
+        load(config_dir)
+
+
+def test_config_is_frozen_with_attribute_access(config_dir):
+    config = load(config_dir)
+    assert config.Wait.timeouts.id == config['Wait']['timeouts']['id'] == 10
+    assert config.get('Missing') is None
+    with pytest.raises(AttributeError):
+        config.Missing
+    with pytest.raises(TypeError):
+        config.Device = {}
+    with pytest.raises(TypeError):
+        config['Device'] = {}
+    with pytest.raises(TypeError):
+        del config.Device
+    assert isinstance(config.Logging.levels, tuple)
+    plain = config.to_dict()
+    plain['Device']['serial_no'] = 'changed'
+    assert config.Device.serial_no == 'base-serial'
+    assert pickle.loads(pickle.dumps(config)) == config
+
+
+def test_cache_is_reused_and_invalidated_by_mtime(config_dir, monkeypatch):
+    assert load(config_dir).Device.serial_no == 'base-serial'
+    cache_path = config_dir / '.automation_config.cache'
+    assert cache_path.exists()
+
+    merges = []
+    merge_layers = AutomationConfig._merge_layers
+    monkeypatch.setattr(AutomationConfig, '_merge_layers', lambda self: merges.append(1) or merge_layers(self))
+    assert load(config_dir).Device.serial_no == 'base-serial'
+    assert not merges
+
+    # same size, only the content and mtime change
+    base = config_dir / 'automation_local.yaml'
+    stat = base.stat()
+    base.write_text(BASE.replace('base-serial', 'new1-serial'), encoding='utf-8')
+    os.utime(base, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load(config_dir).Device.serial_no == 'new1-serial'
+    assert merges == [1]
@@ -0,0 +1,49 @@
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from common.custom_logger import CustomLogger
+
+ROOT = Path(__file__).parents[1]
+
+SCRIPT = """
+import logging
+from common.custom_logger import setup_logger, stop_log_listener
+
+logger = setup_logger('queued', format='%(message)s', use_color=False, queued=True)
+assert [type(handler).__name__ for handler in logger.handlers] == ['DeferredQueueHandler']
+logger.info('record %s', 'before stop')
+stop_log_listener()
+assert [type(handler) for handler in logger.handlers] == [logging.StreamHandler]
+logger.info('record %s', 'after stop')
+stop_log_listener()
+logger.info('record %s', 'after second stop')
+"""
+
+
+def test_stop_log_listener_restores_direct_handlers():
+    env = {**os.environ, 'PYTHONPATH': str(ROOT)}
+    result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, env=env, capture_output=True, text=True,
+                            encoding='utf-8')
+    assert result.returncode == 0, result.stderr
+    assert result.stderr.splitlines() == ['record before stop', 'record after stop', 'record after second stop']
+
+
+@pytest.mark.parametrize('print_message', [
+    lambda: CustomLogger.print_step('step'),
+    lambda: CustomLogger.print_with_new_line('message'),
+    lambda: CustomLogger.print_start(),
+    lambda: CustomLogger.print_global_msg('message'),
+    lambda: CustomLogger.print_log('message %s', 1),
+    lambda: CustomLogger.print_debug('message', error=True),
+    lambda: CustomLogger.print_error('message'),
+])
+def test_records_report_the_calling_module(caplog, print_message):
+    with caplog.at_level(logging.INFO):
+        print_message()
+    assert caplog.records
+    assert {record.filename for record in caplog.records} == {Path(__file__).name}
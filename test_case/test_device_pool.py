@@ -0,0 +1,56 @@
+"""
+DevicePool leases are OS file locks: exclusive across processes and released when
+the holding process dies, without any pid probing.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from common.device_pool import DevicePool
+from test_case.fakes.fake_device import FakeDevice
+
+ROOT = Path(__file__).parents[1]
+DEVICES = [{'serial_no': '192.168.1.20:5555', 'connect_type': 'TCP'}]
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(DevicePool, 'connect', staticmethod(lambda serial_no, connect_type='USB': FakeDevice()))
+    return DevicePool(DEVICES, lock_dir=tmp_path)
+
+
+def test_lease_is_exclusive_until_released(pool, tmp_path):
+    lease = pool.lease('gw0', timeout=0)
+    assert lease.serial_no == '192.168.1.20:5555'
+    other_pool = DevicePool(DEVICES, lock_dir=tmp_path)
+    with pytest.raises(Exception, match='没有可用的设备'):
+        other_pool.lease('gw1', timeout=0)
+    lease.release()
+    assert other_pool.lease('gw1', timeout=0).serial_no == lease.serial_no
+
+
+def test_lock_of_dead_process_is_reclaimed(pool, tmp_path):
+    lock_path = tmp_path / '192.168.1.20_5555.lock'
+    # a worker that takes the lock and dies without releasing it
+    code = ("import os; from filelock import FileLock; "
+            f"FileLock({str(lock_path)!r}).acquire(); os._exit(1)")
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=False)
+    assert lock_path.exists()
+    assert pool.lease('gw0', timeout=0).serial_no == '192.168.1.20:5555'
+
+
+def test_unhealthy_device_is_not_leased(pool, monkeypatch):
+    healthy = False
+
+    def health_check(device):
+        if not healthy:
+            raise Exception('offline')
+
+    monkeypatch.setattr(DevicePool, 'health_check', staticmethod(health_check))
+    with pytest.raises(Exception, match='没有可用的设备'):
+        pool.lease('gw0', timeout=0)
+    # the failed health check released the lock again
+    healthy = True
+    assert pool.lease('gw0', timeout=0)
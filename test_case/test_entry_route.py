@@ -0,0 +1,64 @@
+import pytest
+
+from page.android.home_page import HomePage
+from page.android.nine_day_page import NineDayPage
+from page.common.entry_route import EntryRoute
+from page.common.readiness import ElementVisible
+from test_case.fakes.fake_device import APP_PACKAGE, RESOURCE_PREFIX, FakeDevice
+
+ROUTE = {'nine_day_forecast': {'uri': 'myobservatory://nineday'}}
+
+
+@pytest.fixture
+def fake_device():
+    return FakeDevice()
+
+
+@pytest.fixture
+def page(fake_device, monkeypatch):
+    monkeypatch.setattr(EntryRoute, 'failed', set())
+    return NineDayPage(HomePage(fake_device))
+
+
+def test_go_to_nine_page_by_route(page, fake_device, monkeypatch):
+    monkeypatch.setattr(EntryRoute, '_routes', ROUTE)
+    page.go_to_nine_page()
+    assert fake_device.shell_commands[0][-2:] == ['-d', 'myobservatory://nineday']
+    assert not fake_device.clicks
+    # one intent and one readiness dump, no drawer navigation
+    assert fake_device.rpc_count == 2
+
+
+def test_enter_by_route_not_configured(page, fake_device, monkeypatch):
+    monkeypatch.setattr(EntryRoute, '_routes', {})
+    assert not page.enter_by_route()
+    assert fake_device.rpc_count == 0
+
+
+@pytest.mark.parametrize('route', [{'activity': '.NineDayForecastActivity'}, {'url': 'myobservatory://nineday'}])
+def test_enter_by_route_bad_config_falls_back(page, fake_device, monkeypatch, route):
+    monkeypatch.setattr(EntryRoute, '_routes', {'nine_day_forecast': route})
+    assert not page.enter_by_route()
+    assert 'nine_day_forecast' in EntryRoute.failed
+    assert fake_device.rpc_count == 0
+    # not read again once it failed
+    monkeypatch.setattr(EntryRoute, 'from_config', classmethod(lambda cls, name: pytest.fail('route read again')))
+    assert not page.enter_by_route()
+
+
+def test_route_that_does_not_land_restarts_the_app(page, fake_device, monkeypatch):
+    monkeypatch.setattr(EntryRoute, '_routes', ROUTE)
+    fake_device.current_app = {'package': 'com.android.browser', 'activity': '.Browser', 'pid': 2}
+    assert not page.enter_by_route(ElementVisible({'id': RESOURCE_PREFIX + 'missing'}), timeout=0.2)
+    assert fake_device.shell_commands[0][-2:] == ['-d', 'myobservatory://nineday']
+    # back on the launch screen of the app before the UI navigation starts
+    assert fake_device.app_starts == [(APP_PACKAGE, None, True)]
+    assert fake_device.current_app['package'] == APP_PACKAGE
+    assert 'nine_day_forecast' in EntryRoute.failed
+
+
+def test_route_that_fails_to_launch_restarts_the_app(page, fake_device, monkeypatch):
+    monkeypatch.setattr(EntryRoute, '_routes', ROUTE)
+    monkeypatch.setattr(fake_device, 'shell', lambda command, timeout=60: 'Error: Activity not started')
+    assert not page.enter_by_route()
+    assert fake_device.app_starts == [(APP_PACKAGE, None, True)]
@@ -0,0 +1,84 @@
+import json
+import random
+from datetime import date
+
+import pytest
+from fastjsonschema import JsonSchemaException
+
+from common.forecast_model import ForecastResponse, iter_daily_entries
+from test_case.fakes.forecast_server import build_forecast
+
+START = date(2026, 12, 29)
+LOCATIONS = ['Hong Kong', '長洲']
+
+
+@pytest.fixture(scope='module')
+def payload():
+    forecast = build_forecast(LOCATIONS, 5, start=START)
+    # non-ascii text, so chunk boundaries also fall inside multi-byte characters
+    forecast['forecast']['daily'][0]['description'] = '大致天晴，早上有霧'
+    return forecast
+
+
+def encode(payload):
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+def split(data, boundaries):
+    edges = [0, *sorted(boundaries), len(data)]
+    return [data[start:end] for start, end in zip(edges, edges[1:])]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 1 << 20])
+def test_entries_survive_fixed_chunk_sizes(payload, chunk_size):
+    data = encode(payload)
+    chunks = [data[index:index + chunk_size] for index in range(0, len(data), chunk_size)]
+    assert list(iter_daily_entries(chunks)) == payload['forecast']['daily']
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_entries_survive_random_chunk_boundaries(payload, seed):
+    data = encode(payload)
+    rng = random.Random(seed)
+    boundaries = rng.sample(range(1, len(data)), rng.randint(1, 40))
+    assert list(iter_daily_entries(split(data, boundaries))) == payload['forecast']['daily']
+
+
+def test_truncated_or_missing_array_fails(payload):
+    data = encode(payload)
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_daily_entries([data[:len(data) // 2]]))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_daily_entries([b'{"forecast": {"hourly": []}}']))
+
+
+def test_indexes_by_date_and_location(payload):
+    forecast = ForecastResponse.parse(split(encode(payload), [5, 100, 101, 333]))
+    assert len(forecast) == 10
+    assert sorted(forecast.by_location) == sorted(LOCATIONS)
+    assert [day.date for day in forecast.by_location['長洲']] == [
+        '2026-12-29', '2026-12-30', '2026-12-31', '2027-01-01', '2027-01-02']
+    assert [day.location for day in forecast.by_date['2027-01-01']] == LOCATIONS
+    # without a location the first location of the date is returned
+    assert forecast.get('2026-12-29').location == 'Hong Kong'
+    assert forecast.get('2026-12-29').description == '大致天晴，早上有霧'
+    day = forecast.get('2026-12-31', '長洲')
+    entry = payload['forecast']['daily'][7]
+    assert (day.date, day.location) == (entry['date'], entry['location'])
+    assert (day.humidity_min, day.humidity_max) == (entry['humidity']['min'], entry['humidity']['max'])
+    assert forecast.get('2027-01-03') is None
+    assert forecast.get('2026-12-29', 'Tai O') is None
+
+
+def test_parse_keeps_only_requested_dates_and_locations(payload):
+    forecast = ForecastResponse.parse([encode(payload)], dates=['2026-12-30', '2027-01-02'], locations=['長洲'])
+    assert [(day.date, day.location) for day in forecast] == [('2026-12-30', '長洲'), ('2027-01-02', '長洲')]
+    assert list(forecast.by_location) == ['長洲']
+
+
+def test_invalid_entries_fail_validation(payload):
+    invalid = json.loads(encode(payload))
+    invalid['forecast']['daily'][3]['humidity']['max'] = 120
+    with pytest.raises(JsonSchemaException):
+        ForecastResponse.parse([encode(invalid)])
+    assert len(ForecastResponse.parse([encode(invalid)], validate=False)) == 10
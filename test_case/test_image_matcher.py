@@ -0,0 +1,61 @@
+import pytest
+
+from common.image_matcher import ImageMatcher
+from page.android.home_page import HomePage
+from test_case.fakes.fake_device import FakeDevice
+
+# the icon template of FakeDevice is cropped from (850, 50, 1030, 230)
+ICON_CENTER = (940, 140)
+
+
+@pytest.fixture
+def fake_device():
+    return FakeDevice()
+
+
+@pytest.fixture
+def template(fake_device, tmp_path):
+    return str(fake_device.save_icon_template(tmp_path / 'icon.png'))
+
+
+@pytest.fixture
+def screen(fake_device):
+    return fake_device.screenshot(format='opencv')
+
+
+@pytest.mark.parametrize('region, region_px', [
+    (None, None),
+    ((0, 0, 1, 1), None),
+    ((0.5, 0, 1, 0.2), None),
+    (None, (800, 0, 1080, 300)),
+])
+def test_match_inside_the_region(screen, template, region, region_px):
+    match = ImageMatcher().find(screen, template, region=region, region_px=region_px)
+    assert match is not None
+    assert (match.x, match.y) == ICON_CENTER
+
+
+@pytest.mark.parametrize('region, region_px', [
+    ((0, 0.5, 1, 1), None),
+    # one pixel, not the whole screen
+    (None, (0, 0, 1, 1)),
+    (None, (0, 0, 800, 2340)),
+])
+def test_no_match_outside_the_region(screen, template, region, region_px):
+    assert ImageMatcher().find(screen, template, region=region, region_px=region_px) is None
+
+
+@pytest.mark.parametrize('region, region_px', [
+    ((800, 0, 1080, 300), None),
+    ((0, 0, 1, 1), (0, 0, 1, 1)),
+])
+def test_region_unit_is_explicit(screen, template, region, region_px):
+    with pytest.raises(Exception, match='region'):
+        ImageMatcher().find(screen, template, region=region, region_px=region_px)
+
+
+def test_click_image_in_pixel_region(fake_device, template):
+    page = HomePage(fake_device)
+    assert page.click_image(template, region_px=(800, 0, 1080, 300)) == ICON_CENTER
+    assert fake_device.clicks == [ICON_CENTER]
+    assert page.find_images([template], region_px=(0, 0, 1, 1)) == {template: None}
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from common.load_driver import LatencyHistogram, LoadResult
+
+
+def exact_percentile(values_us, percent):
+    # same rank as LatencyHistogram.percentile
+    ordered = sorted(values_us)
+    return ordered[max(int(len(ordered) * percent / 100 + 0.5), 1) - 1]
+
+
+def record_all(histogram, values_us):
+    for value in values_us:
+        histogram.record(value / 1_000_000)
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    record_all(histogram, range(1, 128))
+    # every value below 2 ** 7 us has its own bucket
+    assert [histogram.percentile(value * 100 / 127) for value in range(1, 128)] == [
+        value / 1000 for value in range(1, 128)]
+    assert histogram.summary()['mean_ms'] == 0.064
+    assert histogram.summary()['min_ms'] == 0.001
+
+
+@pytest.mark.parametrize('sub_bucket_bits', [5, 7, 10])
+@pytest.mark.parametrize('seed', range(3))
+def test_percentiles_within_relative_error(sub_bucket_bits, seed):
+    rng = random.Random(seed)
+    # 1 us to several seconds, heavy tailed like request latencies
+    values = [max(1, round(rng.lognormvariate(9, 2))) for _ in range(20000)]
+    histogram = LatencyHistogram(sub_bucket_bits)
+    record_all(histogram, values)
+    error = 2 ** -(sub_bucket_bits - 1)
+    for percent in (1, 50, 90, 95, 99, 99.9, 100):
+        exact = exact_percentile(values, percent)
+        reported = histogram.percentile(percent) * 1000
+        # the highest value of the bucket: never below the exact value, at most one bucket above
+        assert exact <= round(reported) <= exact * (1 + error), percent
+
+
+def test_summary_is_exact_where_it_can_be():
+    histogram = LatencyHistogram()
+    # 249 us is 248.99999999999997 us once converted from seconds
+    values = [120, 249, 251, 4501, 98765, 2_000_000]
+    record_all(histogram, values)
+    summary = histogram.summary()
+    assert summary['count'] == 6
+    assert summary['min_ms'] == 0.12
+    assert summary['max_ms'] == 2000.0
+    assert summary['mean_ms'] == sum(values) / 6 / 1000
+    # percentiles never exceed the recorded maximum
+    assert histogram.percentile(100) == 2000.0
+
+
+def test_memory_is_bounded_by_the_range():
+    histogram = LatencyHistogram()
+    record_all(histogram, range(1, 60_000_000, 997))
+    # one bucket per value below 128 us, then 64 per power of two up to 60 s
+    assert len(histogram.counts) <= 128 + 64 * (60_000_000).bit_length()
+
+
+def test_empty_and_negative():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0.0
+    assert histogram.summary()['mean_ms'] == 0.0
+    histogram.record(-0.5)
+    assert histogram.summary()['max_ms'] == 0.0
+
+
+def test_result_check_reports_violations():
+    result = LoadResult('closed', '2 concurrent')
+    result.duration = 1.0
+    result.statuses.update({200: 99, 503: 1})
+    record_all(result.histogram, [10_000] * 90 + [300_000] * 10)
+    assert result.check({'p50_ms': 20, 'error_rate': 0.05}) == []
+    assert result.check({'p95_ms': 200, 'error_rate': 0.001}) == ['p95_ms 300.0 > 200', 'error_rate 0.01 > 0.001']
+    with pytest.raises(Exception, match='未知的压测阈值'):
+        result.check({'p42': 1})
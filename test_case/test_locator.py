@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from page.android.home_page import HomePage
+from page.android.nine_day_page import NineDayPage
+from page.common.locator import compile_locator, main
+from test_case.fakes.fake_device import RESOURCE_PREFIX, FakeDevice
+
+ROOT = Path(__file__).parents[1]
+
+
+@pytest.mark.parametrize('locator, native', [
+    ({'id': 'a:id/b'}, {'resourceId': 'a:id/b'}),
+    ({'text': ['android.widget.TextView', '九天']}, {'className': 'android.widget.TextView', 'text': '九天'}),
+    ({'accessibility_id': 'Navigate up'}, {'description': 'Navigate up'}),
+    ({'xpath': '//*[@content-desc="Navigate up"]'}, {'description': 'Navigate up'}),
+    ({'xpath': '//android.widget.TextView[@resource-id="a:id/b"]'},
+     {'className': 'android.widget.TextView', 'resourceId': 'a:id/b'}),
+])
+def test_native_locators(locator, native):
+    compiled = compile_locator(locator)
+    assert compiled.native == native
+    assert compiled.strategy == 'native' and not compiled.is_slow
+
+
+def test_slow_xpath_keeps_its_reason():
+    compiled = compile_locator({'xpath': '/hierarchy/android.widget.FrameLayout/android.widget.LinearLayout'})
+    assert compiled.is_slow and compiled.reason == 'absolute xpath with 2 steps'
+
+
+@pytest.mark.parametrize('locator', [
+    {'accessibility_id': 'Navigate up'},
+    {'id': RESOURCE_PREFIX + 'psrText'},
+    {'text_contains': ('android.widget.TextView', '°C')},
+])
+def test_find_element_routes_native_locators_through_ui_selector(locator):
+    fake_device = FakeDevice()
+    page = NineDayPage(HomePage(fake_device))
+    assert page.find_element(locator, timeout=0.2) is not None
+
+
+def test_find_element_missing_accessibility_id_returns_none():
+    page = NineDayPage(HomePage(FakeDevice()))
+    assert page.find_element({'accessibility_id': 'Open drawer'}, timeout=0.2) is None
+
+
+def test_main_lists_locators(capsys):
+    assert main(['--all']) == 0
+    output = capsys.readouterr().out
+    assert 'NATIVE  page.android.nine_day_page.NineDayPage.' in output
+    assert output.rstrip().endswith('slow locator(s)')
+
+
+@pytest.mark.parametrize('command', [['-m', 'page.common.locator'], [str(Path('page', 'common', 'locator.py'))]])
+def test_entry_points_see_compiled_page_locators(command):
+    def run(*args):
+        return subprocess.run([sys.executable, *args], cwd=ROOT, env={**os.environ, 'PYTHONPATH': str(ROOT)},
+                              capture_output=True, text=True, encoding='utf-8')
+
+    result = run(*command, '--all', '--strict')
+    assert result.stdout == run('-c', 'from page.common.locator import main; main(["--all"])').stdout
+    assert 'NATIVE  page.android.nine_day_page.NineDayPage.' in result.stdout
+    slow = int(result.stdout.rstrip().splitlines()[-1].split()[0])
+    assert result.returncode == (1 if slow else 0)
@@ -0,0 +1,56 @@
+"""
+--quiet-logs: a test's log records are written only when one of its phases fails.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+TESTS = '''
+import pytest
+
+from common.custom_logger import CustomLogger
+
+
+@pytest.fixture
+def broken_teardown():
+    CustomLogger.print_log('record of %s', 'setup')
+    yield
+    CustomLogger.print_log('record of %s', 'teardown')
+    raise Exception('teardown failed')
+
+
+def test_passes():
+    CustomLogger.print_log('record of %s', 'quiet')
+
+
+def test_broken_teardown(broken_teardown):
+    CustomLogger.print_log('record of %s', 'call')
+
+
+def test_fails():
+    CustomLogger.print_log('record of %s', 'failing call')
+    assert False
+'''
+
+
+def run_quiet(tmp_path):
+    (tmp_path / 'test_quiet.py').write_text(TESTS, encoding='utf-8')
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    return subprocess.run([sys.executable, '-m', 'pytest', '-p', 'test_case.conftest', '-p', 'no:cacheprovider',
+                           '--quiet-logs', '-rA', 'test_quiet.py'],
+                          cwd=tmp_path, env=env, capture_output=True, text=True, encoding='utf-8')
+
+
+def test_quiet_logs_written_only_for_failures(tmp_path):
+    result = run_quiet(tmp_path)
+    output = result.stdout + result.stderr
+    assert '1 failed, 2 passed, 1 error' in output, output
+    assert 'record of quiet' not in output
+    assert 'record of failing call' in output
+    # the messages are formatted from arguments so they cannot match the traceback source
+    # a failing teardown still writes what the passing setup and call buffered
+    assert 'record of setup' in output
+    assert 'record of call' in output
+    assert 'record of teardown' in output
@@ -0,0 +1,135 @@
+from datetime import date, timedelta
+
+import pytest
+
+from page.android.forecast_table import ForecastTable, format_forecast_date, parse_forecast_date, parse_range
+from page.android.home_page import HomePage
+from page.android.nine_day_page import NineDayPage
+from test_case.fakes.fake_device import FakeDevice, NineDayForecastScreen
+
+
+@pytest.fixture
+def fake_device():
+    return FakeDevice()
+
+
+@pytest.fixture
+def page(fake_device):
+    return NineDayPage(HomePage(fake_device))
+
+
+def test_get_all_days_device_calls(page, fake_device):
+    table = page.get_all_days()
+    assert len(table) == fake_device.screen.days
+    swipes = len(range(0, fake_device.screen.max_offset, int(0.3 * fake_device.height))) + 1
+    # the rows are read from the scroll snapshots, no extra dumps
+    assert fake_device.rpc_count <= 2 * swipes + 2
+
+
+@pytest.mark.parametrize('fling', [1.0, 2.0, 4.0])
+def test_scroll_until_device_calls(fling):
+    fake_device = FakeDevice(screen=NineDayForecastScreen(days=60), fling=fling)
+    page = NineDayPage(HomePage(fake_device))
+    screen = fake_device.screen
+    target = page.scroll_until(screen.date_locator(40))
+    assert target is not None and target.text == screen.row(40)['date']
+    # scrolling to the end with fixed 30% swipes would dump the hierarchy once per swipe on the way
+    fixed_swipes = (40 * screen.row_height) // int(0.3 * fake_device.height)
+    assert fake_device.rpc_count <= 2 * fixed_swipes
+    assert page.scroll_until(screen.date_locator(70)) is None
+
+
+class PlaceholderRowScreen(NineDayForecastScreen):
+    """
+    forecast list with one row still showing placeholders
+    """
+
+    def row(self, index):
+        values = super().row(index)
+        if index == 3:
+            values.update(temp='--', rh='')
+        return values
+
+
+def test_get_all_days_skips_unparsable_rows():
+    fake_device = FakeDevice(screen=PlaceholderRowScreen())
+    table = NineDayPage(HomePage(fake_device)).get_all_days()
+    screen = fake_device.screen
+    assert len(table) == screen.days - 1
+    expected = [screen.start + timedelta(days=index + 1) for index in range(screen.days) if index != 3]
+    assert table.dates == expected
+
+
+def test_get_all_days_rolls_dates_into_the_next_year():
+    fake_device = FakeDevice(screen=NineDayForecastScreen(start=date(2026, 12, 28)))
+    table = NineDayPage(HomePage(fake_device)).get_all_days()
+    assert table.dates[0] == date(2026, 12, 29)
+    assert table.dates[-1] == date(2027, 1, 6)
+
+
+@pytest.mark.parametrize('text, after, expected', [
+    ('10月18日', date(2026, 10, 1), date(2026, 10, 18)),
+    ('10月18日', date(2026, 10, 18), date(2026, 10, 18)),
+    # forecast rows after new year belong to the next year of the update date
+    ('1月2日', date(2026, 12, 28), date(2027, 1, 2)),
+    ('12月31日', date(2026, 12, 28), date(2026, 12, 31)),
+    ('更新时间: 2026年10月18日10时30分', None, date(2026, 10, 18)),
+    ('更新时间: 2025 年 1 月 5 日', date(2026, 12, 28), date(2025, 1, 5)),
+])
+def test_parse_forecast_date(text, after, expected):
+    assert parse_forecast_date(text, after=after) == expected
+
+
+def test_parse_forecast_date_without_year_uses_this_year():
+    assert parse_forecast_date('3月4日') == date(date.today().year, 3, 4)
+
+
+@pytest.mark.parametrize('text', ['', None, '--', '2026-10-18'])
+def test_parse_forecast_date_fails(text):
+    with pytest.raises(Exception, match='无法解析日期'):
+        parse_forecast_date(text)
+
+
+def test_format_forecast_date():
+    assert format_forecast_date(date(2027, 1, 2)) == '01月02日'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('20 - 26°C', (20, 26)),
+    ('55 - 85%', (55, 85)),
+    ('-2 - 5°C', (-2, 5)),
+    ('-8 - -2°C', (-8, -2)),
+    ('18~24°C', (18, 24)),
+    ('30°C', (30, 30)),
+])
+def test_parse_range(text, expected):
+    assert parse_range(text) == expected
+
+
+@pytest.mark.parametrize('text', ['', None, '--', '°C'])
+def test_parse_range_fails(text):
+    with pytest.raises(Exception, match='无法解析范围'):
+        parse_range(text)
+
+
+def test_forecast_table_keeps_one_row_per_date():
+    table = ForecastTable()
+    assert table.add(date(2026, 10, 19), '星期一', '20 - 26°C', '55 - 85%', '低', '天晴')
+    assert not table.add(date(2026, 10, 19), '星期一', '21 - 27°C', '60 - 90%', '中', '多雲')
+    assert table.add(date(2026, 10, 20), '星期二', '-2 - 5°C', '70%', '高', '有雨')
+    assert len(table) == 2
+    assert table.index_of(date(2026, 10, 20)) == 1
+    assert table.index_of(date(2026, 10, 21)) is None
+    assert table.row(0)['temp'] == (20, 26)
+    assert table.row(-1) == {'date': date(2026, 10, 20), 'day_of_week': '星期二', 'temp': (-2, 5), 'rh': (70, 70),
+                             'psr': '高', 'description': '有雨'}
+    assert list(table.rh_min) == [55, 70]
+    assert repr(table) == 'ForecastTable(2 days, 10月19日 - 10月20日)'
+
+
+def test_forecast_table_add_is_all_or_nothing():
+    table = ForecastTable()
+    with pytest.raises(Exception, match='无法解析范围'):
+        table.add(date(2026, 10, 19), '星期一', '20 - 26°C', '--', '低', '天晴')
+    assert len(table) == 0 and table.index_of(date(2026, 10, 19)) is None
+    assert repr(table) == 'ForecastTable(0 days)'
@@ -0,0 +1,81 @@
+import gzip
+import json
+import os
+from collections import namedtuple
+
+import pytest
+from uiautomator2 import ShellResponse
+
+from common.replay_device import RecordingDevice, ReplayDevice, decode, encode
+from page.android.home_page import HomePage
+from page.android.nine_day_page import NineDayPage
+from test_case.fakes.fake_device import FakeDevice
+
+
+def run_session(device):
+    page = NineDayPage(HomePage(device))
+    table = page.get_all_days()
+    return {
+        'days': list(table),
+        'ninth_day': page.get_nine_day_weather_day_info(),
+        'shell': device.shell(['echo', 'ok']),
+        'window_size': device.window_size(),
+        'app_current': device.app_current(),
+    }
+
+
+@pytest.fixture
+def session_path(tmp_path):
+    return tmp_path / 'session.jsonl.gz'
+
+
+def test_record_then_replay_returns_the_same_results(session_path):
+    fake_device = FakeDevice()
+    recording = RecordingDevice(fake_device, session_path)
+    recorded = run_session(recording)
+    recording.close()
+    assert len(recorded['days']) == fake_device.screen.days
+
+    with gzip.open(session_path, 'rt', encoding='utf-8') as session_file:
+        entries = [json.loads(line) for line in session_file]
+    assert any(key.startswith('d.dump_hierarchy(') for _, key, _ in entries)
+
+    replayed = run_session(ReplayDevice(session_path))
+    assert replayed == recorded
+    assert isinstance(replayed['shell'], ShellResponse)
+    assert replayed['shell'].output == 'ok' and replayed['shell'].exit_code == 0
+
+
+def test_replay_raises_recorded_errors(session_path):
+    fake_device = FakeDevice()
+    fake_device.shell = lambda command, timeout=60: (_ for _ in ()).throw(RuntimeError('adb offline'))
+    recording = RecordingDevice(fake_device, session_path)
+    with pytest.raises(RuntimeError):
+        recording.shell('echo ok')
+    recording.close()
+
+    with pytest.raises(Exception, match='RuntimeError: adb offline'):
+        ReplayDevice(session_path).shell('echo ok')
+
+
+def test_replay_without_recorded_call_fails(session_path):
+    recording = RecordingDevice(FakeDevice(), session_path)
+    recording.window_size()
+    recording.close()
+    with pytest.raises(Exception, match='回放会话中没有记录'):
+        ReplayDevice(session_path).app_current()
+
+
+def test_other_named_tuples_replay_as_plain_tuples():
+    Point = namedtuple('Point', 'x y')
+    assert encode(Point(1, 2)) == {'__tuple__': [1, 2]}
+    assert decode(encode(ShellResponse('ok', 0))) == ShellResponse('ok', 0)
+
+
+@pytest.mark.parametrize('name', ['os:system', 'system', 'Point'])
+def test_session_cannot_name_a_callable(session_path, monkeypatch, name):
+    monkeypatch.setattr(os, 'system', lambda command: pytest.fail('session ran os.system'))
+    with gzip.open(session_path, 'wt', encoding='utf-8') as session_file:
+        session_file.write(json.dumps(['call', "d.shell('id')", {'__namedtuple__': name, 'values': ['echo pwned']}]))
+    with pytest.raises(ValueError, match='named tuple not allowed'):
+        ReplayDevice(session_path).shell('id')
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from common.tracer import TRACER, traced
+from common.waiter import Waiter
+
+
+@pytest.fixture
+def tracing(monkeypatch):
+    monkeypatch.setattr(TRACER, 'enabled', True)
+    TRACER.reset()
+    yield TRACER
+    TRACER.reset()
+
+
+DESCRIBED = []
+
+
+def describe_first(args):
+    DESCRIBED.append(args)
+    return {'first': args[0]}
+
+
+class Action:
+    def __init__(self):
+        self.waiter = Waiter(initial_interval=0.001)
+
+    @traced(describe=describe_first)
+    def act(self, value):
+        return self.waiter.until(lambda: value, timeout=0.01, kind='id')
+
+
+def test_disabled_tracing_creates_no_spans(monkeypatch):
+    assert not TRACER.enabled
+
+    def fail(*args, **kwargs):
+        raise AssertionError('span created while tracing is disabled')
+
+    monkeypatch.setattr(TRACER, 'begin', fail)
+    monkeypatch.setattr(TRACER, 'span', fail)
+    DESCRIBED.clear()
+    assert Action().act('x') == 'x'
+    assert Action().act(None) is None
+    assert not DESCRIBED
+
+
+def test_wait_spans_nest_under_the_traced_action(tracing, tmp_path):
+    action = Action()
+    assert action.act('x') == 'x'
+    assert action.act(0) is None
+    wait_found, act_found, wait_missed, act_missed = tracing.spans
+    assert (act_found.name, act_found.cat, act_found.args) == ('act', 'action', {'first': 'x'})
+    assert wait_found.parent_id == act_found.span_id
+    assert wait_found.args == {'kind': 'id', 'timeout': 0.01, 'retries': 0, 'found': True}
+    assert wait_missed.parent_id == act_missed.span_id
+    assert wait_missed.args['found'] is False and wait_missed.args['retries'] >= 1
+    events = json.loads(tracing.export_chrome(tmp_path / 'trace.json').read_text(encoding='utf-8'))['traceEvents']
+    assert [event['name'] for event in events] == ['wait', 'act', 'wait', 'act']
+
+
+def test_end_without_a_span_is_ignored(tracing):
+    # e.g. the after-scenario hook when the before-scenario hook never ran
+    tracing.end(None)
+    tracing.end(None, error='setup failed')
+    assert tracing.spans == []
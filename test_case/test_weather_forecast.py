@@ -1,8 +1,10 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 import pytest
 from pytest_bdd import given, when, then, scenario
 
+from page.android.forecast_table import format_forecast_date, parse_forecast_date
+
 
 @pytest.fixture
 def context():
@@ -41,26 +43,30 @@ def when_check_ninth_day(nine_day_page, context, request):
         context: Test context object for storing weather information
         request: pytest request object for logging
     """
-    nine_day_temp, nine_day_rh, nine_day_date, nine_day_week_date, nine_day_psr, nine_day_description = nine_day_page.get_nine_day_weather_day_info()
+    # Every row is collected in one pass down the list; the ninth day is the last row
+    forecast = nine_day_page.get_all_days()
+    context['forecast'] = forecast
+    ninth_day = forecast.row(-1) if forecast else {}
     context['weather_info'] = {
-        'temp': nine_day_temp,
-        'rh': nine_day_rh,
-        'date': nine_day_date,
-        'week_date': nine_day_week_date,
-        'psr': nine_day_psr,
-        'description': nine_day_description
+        'temp': ninth_day.get('temp'),
+        'rh': ninth_day.get('rh'),
+        'date': ninth_day.get('date'),
+        'week_date': ninth_day.get('day_of_week'),
+        'psr': ninth_day.get('psr'),
+        'description': ninth_day.get('description')
     }
-    
+    weather_info = context['weather_info']
+
     # Add detailed information to the test report
     request.node.add_report_section(
-        "call", "When", 
-        f"Retrieved weather info:\n"
-        f"- Temperature: {nine_day_temp}\n"
-        f"- Humidity: {nine_day_rh}\n"
-        f"- Date: {nine_day_date}\n"
-        f"- Day: {nine_day_week_date}\n"
-        f"- UV Index: {nine_day_psr}\n"
-        f"- Description: {nine_day_description}"
+        "call", "When",
+        f"Retrieved weather info of {len(forecast)} days, ninth day:\n"
+        f"- Temperature: {weather_info['temp']}\n"
+        f"- Humidity: {weather_info['rh']}\n"
+        f"- Date: {weather_info['date']}\n"
+        f"- Day: {weather_info['week_date']}\n"
+        f"- UV Index: {weather_info['psr']}\n"
+        f"- Description: {weather_info['description']}"
     )
 
 
@@ -73,25 +79,22 @@ def then_verify_temperature(context, nine_day_page, request):
         nine_day_page: Nine-day forecast page object
         request: pytest request object for logging
     """
-    update_date = nine_day_page.get_update_date()
-    # Convert string to datetime object
-    date_obj = datetime.strptime(update_date, "%m月%d日")
+    update_date = parse_forecast_date(nine_day_page.get_update_date())
     # Add 9 days
-    new_date_obj = date_obj + timedelta(days=9)
-    # Convert back to string
-    new_date_str = new_date_obj.strftime("%m月%d日")
-    nineth_date = "0" + context['weather_info']['date'] if len(context['weather_info']['date']) == 5 else context['weather_info']['date']
-    
+    new_date_str = format_forecast_date(update_date + timedelta(days=9))
+    nineth_date = context['weather_info']['date']
+    nineth_date_str = format_forecast_date(nineth_date) if nineth_date else None
+
     # Add verification details to the test report
     request.node.add_report_section(
         "call", "Then",
         f"Date verification:\n"
-        f"- Update date: {update_date}\n"
+        f"- Update date: {format_forecast_date(update_date)}\n"
         f"- Expected 9th day: {new_date_str}\n"
-        f"- Actual 9th day: {nineth_date}"
+        f"- Actual 9th day: {nineth_date_str}"
     )
-    
-    assert nineth_date == new_date_str, f"Date mismatch. Expected: {new_date_str}, Got: {nineth_date}"
+
+    assert nineth_date_str == new_date_str, f"Date mismatch. Expected: {new_date_str}, Got: {nineth_date_str}"
 
 
 @then('我可以获取到温度、湿度、紫外线信息和天气描述')
@@ -127,3 +130,12 @@ def then_verify_weather_info(context, request):
     assert weather_info['week_date'] is not None, "Day of week information is missing"
     assert weather_info['psr'] is not None, "UV index information is missing"
     assert weather_info['description'] is not None, "Weather description is missing"
+
+    # Every day, checked column by column
+    forecast = context['forecast']
+    assert len(forecast) == 9, f"Expected 9 forecast days, got {len(forecast)}"
+    assert all(b - a == 1 for a, b in zip(forecast.date_ordinal, forecast.date_ordinal[1:])), \
+        f"Forecast dates are not consecutive: {forecast}"
+    assert all(low <= high for low, high in zip(forecast.temp_min, forecast.temp_max)), "Invalid temperature range"
+    assert all(0 <= low <= high <= 100 for low, high in zip(forecast.rh_min, forecast.rh_max)), "Invalid humidity range"
+    assert all(forecast.description), "Weather description is missing on some days"